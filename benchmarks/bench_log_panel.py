@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+原始数据日志面板基准测试
+
+模拟血压计以每秒数千个数据块的速度发送原始数据，比较：
+    legacy   旧实现：界面线程逐块 hex 格式化，每块 insert + see + index('end-1c') 裁剪
+    batched  LogPanel：格式化在后台线程完成，界面线程每帧只 insert / see 一次
+
+输出每帧界面线程耗时与界面线程可承受的最大块速率（块/秒）。
+需要图形环境（Tk）；没有显示器时只测试格式化吞吐量。
+
+用法示例：
+    python benchmarks/bench_log_panel.py
+    python benchmarks/bench_log_panel.py --rate 5000 --seconds 5 --chunk-size 64
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk  # noqa: E402
+
+from bpmon.gui import LogPanel, format_raw_log_line  # noqa: E402
+
+
+def make_chunks(count: int, size: int):
+    sample = b"2026/10/19 08:30:00,0,123,081,072,0,0000\r\n"
+    return [(sample * (size // len(sample) + 1))[:size] for _ in range(count)]
+
+
+def bench_format(chunks) -> float:
+    """后台线程格式化吞吐量（块/秒）"""
+    started = time.perf_counter()
+    for chunk in chunks:
+        format_raw_log_line(chunk)
+    return len(chunks) / (time.perf_counter() - started)
+
+
+def legacy_frame(text: tk.Text, chunks):
+    """旧实现：每块都在界面线程格式化并单独写入"""
+    for data in chunks:
+        decoded = data.decode('ascii', errors='replace')
+        message = f"收到: {data.hex()} | {decoded}"
+        text.insert(tk.END, f"[{time.strftime('%H:%M:%S')}] {message}\n")
+        text.see(tk.END)
+        lines = int(text.index('end-1c').split('.')[0])
+        if lines > 500:
+            text.delete('1.0', '100.0')
+
+
+def run_ui(root: tk.Tk, name: str, chunks_per_frame: int, frames: int, chunk_size: int) -> dict:
+    text = tk.Text(root, height=6, wrap=tk.WORD)
+    text.pack(fill=tk.BOTH, expand=True)
+    root.update()
+    panel = LogPanel(text)
+    durations = []
+    for _ in range(frames):
+        chunks = make_chunks(chunks_per_frame, chunk_size)
+        if name == "batched":
+            # 格式化在串口线程完成，不计入界面线程耗时
+            lines = [format_raw_log_line(chunk) for chunk in chunks]
+            started = time.perf_counter()
+            for line in lines:
+                panel.append(line)
+            panel.flush()
+        else:
+            started = time.perf_counter()
+            legacy_frame(text, chunks)
+        root.update_idletasks()
+        durations.append(time.perf_counter() - started)
+    text.destroy()
+    total = sum(durations)
+    durations.sort()
+    return {
+        "name": name,
+        "frame_ms_p50": statistics.median(durations) * 1000,
+        "frame_ms_max": durations[-1] * 1000,
+        "max_chunks_per_s": chunks_per_frame * frames / total if total else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="原始数据日志面板基准测试")
+    parser.add_argument("--rate", type=int, default=5000, help="模拟的原始数据块速率（块/秒）")
+    parser.add_argument("--seconds", type=float, default=3.0, help="模拟时长（秒）")
+    parser.add_argument("--chunk-size", type=int, default=32, help="每块字节数")
+    parser.add_argument("--frame-ms", type=float, default=16.0, help="界面帧间隔（毫秒）")
+    args = parser.parse_args()
+
+    format_rate = bench_format(make_chunks(20000, args.chunk_size))
+    print(f"格式化吞吐量（后台线程）: {format_rate:,.0f} 块/秒")
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"无法创建 Tk 窗口（{e}），跳过界面测试")
+        return
+
+    frames = max(1, int(args.seconds * 1000 / args.frame_ms))
+    chunks_per_frame = max(1, int(args.rate * args.frame_ms / 1000))
+    print(f"输入: {args.rate} 块/秒，每帧 {chunks_per_frame} 块，共 {frames} 帧\n")
+    print(f"{'实现':<10}{'帧耗时p50(ms)':>16}{'帧耗时max(ms)':>16}{'最大速率(块/秒)':>18}")
+    for name in ("legacy", "batched"):
+        result = run_ui(root, name, chunks_per_frame, frames, args.chunk_size)
+        print(f"{result['name']:<10}{result['frame_ms_p50']:>16.2f}{result['frame_ms_max']:>16.2f}"
+              f"{result['max_chunks_per_s']:>18,.0f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+端到端基准测试（Linux / macOS，需要 pyserial）：
+虚拟血压计（pty）-> SerialConnection -> DataParser -> 队列 -> WebDataStore -> BPWebServer -> HTTP 长轮询客户端
+
+每个速率单独运行一轮，统计到达 WebDataStore 的读数、丢失的帧，以及从设备端写入一帧到
+HTTP 客户端拿到该读数的延迟（长轮询在高速率下会合并多个读数，延迟只统计客户端看到的读数）
+
+用法：
+    python benchmarks/bench_serial_pipeline.py
+    python benchmarks/bench_serial_pipeline.py --rates 10,100,1000 --seconds 5 --mode async
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bpmon.ingest import SerialConnection, Simulator, serial_available  # noqa: E402
+from bpmon.storage import WebDataStore  # noqa: E402
+from bpmon.virtual_device import VirtualHBP9030, simulated_traffic  # noqa: E402
+from bpmon.web import BPWebServer  # noqa: E402
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def poll_client(port: int, stop: threading.Event, seen: list):
+    """长轮询 /data?wait=<version>，记录每个新读数的 (reading_seq, 收到时间)"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    version = -1
+    last_seq = 0
+    while not stop.is_set():
+        try:
+            conn.request("GET", f"/data?wait={version}&timeout=1")
+            body = conn.getresponse().read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            time.sleep(0.05)
+            continue
+        now = time.perf_counter()
+        data = json.loads(body)
+        version = data["version"]
+        seq = data.get("reading_seq") or 0
+        if seq > last_seq:   # 超时返回或状态变化时 reading_seq 不变
+            seen.append((seq, now))
+            last_seq = seq
+    conn.close()
+
+
+def run_rate(rate: float, seconds: float, mode: str, baudrate: int) -> dict:
+    count = max(1, int(rate * seconds))
+    write_times = []
+    store = WebDataStore()
+    data_queue = queue.Queue()
+    server = BPWebServer(store, "127.0.0.1", 0, mode=mode)
+    if not server.start():
+        raise SystemExit("Web 服务启动失败")
+
+    def consume():
+        while True:
+            reading = data_queue.get()
+            if reading is None:
+                return
+            store.update_reading(reading)
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    stop = threading.Event()
+    seen = []
+    client = threading.Thread(target=poll_client, args=(server.server_port, stop, seen), daemon=True)
+    client.start()
+
+    with VirtualHBP9030(baudrate=baudrate, on_write=lambda data, t: write_times.append(t)) as device:
+        conn = SerialConnection(on_data_received=data_queue.put)
+        if not conn.connect(device.port):
+            raise SystemExit(f"无法打开 {device.port}")
+        started = time.perf_counter()
+        # 每段正好一帧，第 n 次写入对应 reading_seq == n
+        device.play(simulated_traffic(rate, count, Simulator(seed=1)))
+        device.wait()
+        deadline = time.perf_counter() + 2.0
+        while store.snapshot().get("reading_seq", 0) < count and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        conn.disconnect()
+
+    time.sleep(0.2)
+    stop.set()
+    data_queue.put(None)
+    client.join(timeout=3)
+    server.stop()
+
+    received = store.snapshot().get("reading_seq", 0)
+    latencies = [(t - write_times[seq - 1]) * 1000 for seq, t in seen if 0 < seq <= len(write_times)]
+    return {
+        "rate": rate,
+        "frames": count,
+        "received": received,
+        "lost": count - received,
+        "throughput": received / elapsed,
+        "observed": len(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "max": max(latencies) if latencies else float("nan"),
+        "mean": statistics.mean(latencies) if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="虚拟血压计端到端基准测试")
+    parser.add_argument("--rates", default="5,50,500,2000", help="逗号分隔的速率（帧/秒）")
+    parser.add_argument("--seconds", type=float, default=3.0, help="每个速率运行的秒数")
+    parser.add_argument("--mode", choices=("thread", "async"), default="thread", help="Web 服务模式")
+    parser.add_argument("--baudrate", type=int, default=0, help="按波特率限制设备端发送速度，默认不限速")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    if not hasattr(os, "openpty"):
+        raise SystemExit("当前系统不支持伪终端（仅 Linux / macOS）")
+    if not serial_available():
+        raise SystemExit("需要 pyserial：pip install pyserial")
+    logging.getLogger("bp_monitor").setLevel(logging.WARNING)
+
+    results = []
+    print(f"{'速率':>8} {'帧数':>7} {'收到':>7} {'丢失':>5} {'吞吐/s':>8} "
+          f"{'样本':>5} {'p50(ms)':>8} {'p95(ms)':>8} {'max(ms)':>8}")
+    for rate in (float(r) for r in args.rates.split(",")):
+        result = run_rate(rate, args.seconds, args.mode, args.baudrate)
+        results.append(result)
+        print(f"{result['rate']:>8g} {result['frames']:>7} {result['received']:>7} {result['lost']:>5} "
+              f"{result['throughput']:>8.1f} {result['observed']:>5} {result['p50']:>8.2f} "
+              f"{result['p95']:>8.2f} {result['max']:>8.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+导入耗时检查：每个模块在独立子进程中用 python -X importtime 导入，
+取多次运行中累计耗时的最小值与预算比较，超出预算或导入了不该导入的模块时以非零状态退出。
+
+用法：
+    python benchmarks/check_import_time.py
+    python benchmarks/check_import_time.py --runs 10 --scale 2     # 慢速机器（如树莓派）放宽预算
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 模块 -> (预算毫秒, 不允许出现的模块)；预算按开发机实测值留约 20% 余量
+BUDGETS = {
+    "bpmon": (5, ("tkinter", "serial", "http.server", "socket", "json", "logging")),
+    "bp_monitor": (5, ("tkinter", "serial", "http.server", "socket", "json", "logging")),
+    "bpmon.parsing": (60, ("tkinter", "serial", "http.server", "socket", "json")),
+    "bpmon.storage": (60, ("tkinter", "serial", "http.server", "socket")),
+    "bpmon.web": (120, ("tkinter", "serial", "asyncio")),
+    "bpmon.headless": (120, ("tkinter", "serial", "asyncio")),
+}
+
+
+def measure(module: str):
+    """导入一次，返回 (该模块的累计耗时毫秒, 导入的全部模块名)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{proc.stderr}")
+    cumulative = None
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if not cum.strip().isdigit():
+            continue    # 表头
+        imported.add(name)
+        if name == module:
+            cumulative = int(cum) / 1000
+    if cumulative is None:
+        raise RuntimeError(f"importtime 输出中没有 {module}")
+    return cumulative, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bpmon 导入耗时检查")
+    parser.add_argument("--runs", type=int, default=5, help="每个模块运行次数，取最小值")
+    parser.add_argument("--scale", type=float, default=1.0, help="预算倍数")
+    args = parser.parse_args()
+
+    failed = False
+    for module, (budget, forbidden) in BUDGETS.items():
+        best = None
+        imported = set()
+        for _ in range(args.runs):
+            ms, imported = measure(module)
+            best = ms if best is None else min(best, ms)
+        limit = budget * args.scale
+        unexpected = sorted(m for m in forbidden if m in imported)
+        ok = best <= limit and not unexpected
+        failed |= not ok
+        note = f"  意外导入: {', '.join(unexpected)}" if unexpected else ""
+        print(f"{'OK  ' if ok else 'FAIL'} {module:<16} {best:7.1f} ms  (预算 {limit:.0f} ms){note}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,471 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+热点路径基准测试套件（只需要 Python 标准库）
+
+微基准：
+    parse_valid            DataParser.parse 有效帧
+    parse_valid_logged     同上，但按程序默认配置把 DEBUG 日志写入文件（对比日志开销）
+    parse_invalid          DataParser.parse 各类无效帧（字段数、非数字、超范围、乱码）
+    parse_format_hbp9030   DataParser._parse_format_hbp9030（已解码文本）
+    framer                 LineFramer 切分随机分段的字节流（帧/秒）
+    store_update           WebDataStore.update_reading 单线程
+    store_snapshot         WebDataStore.snapshot 单线程
+    json_data              /data 响应的 JSON 编码（WebDataStore 发布快照时每次更新编码一次）
+宏基准：
+    store_contention       多个写线程 update_reading + 多个读线程 snapshot 同时运行（读、写各自的次数/秒）
+    store_readers          一个全速写线程 + 数百个读线程取 current() 的响应体与 ETag（模拟大量 /data 请求）
+    bus_fanout             EventBus 全速发布读数，两个快的订阅者 + 一个慢的订阅者（发布次数/秒、各订阅者投递与丢弃数）
+    web_thread / web_async BPWebServer 每秒请求数（keep-alive 客户端轮询 /data）
+
+结果保存为 JSON（默认 benchmarks/results/<时间>.json），指定 --baseline 时与基线比较，
+任一项比基线慢超过 --threshold 时标记为回归并以状态 1 退出。
+
+用法：
+    python benchmarks/run_benchmarks.py                                  # 全部
+    python benchmarks/run_benchmarks.py --quick --filter parse           # 只跑名称含 parse 的项，缩短时间
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/results/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/baseline.json --threshold 0.15
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bpmon import config  # noqa: E402
+from bpmon.ingest import Simulator  # noqa: E402
+from bpmon.log import logger  # noqa: E402
+from bpmon.models import BloodPressureReading  # noqa: E402
+from bpmon.parsing import DataParser, LineFramer, format_hbp9030_frame  # noqa: E402
+from bpmon.storage import WebDataStore  # noqa: E402
+
+VALID_FRAME = format_hbp9030_frame(123, 81, 72, datetime(2026, 10, 19, 8, 30), device_id="90300000000000000001").strip()
+INVALID_FRAMES = [
+    b"2026,10,19,08,30,90300000000000000001,0,123",            # 字段数不足
+    b"2026,10,19,08,30,90300000000000000001,0,1X3,081,072,0",  # 非数字
+    b"2026,10,19,08,30,90300000000000000001,0,999,081,072,0",  # 超范围
+    bytes(range(0x20, 0x7f)).replace(b",", b""),                 # 乱码
+]
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, unit: str = "次/秒"):
+    """注册基准测试；函数接收 quick 参数，返回 {"value": ..., ...}，value 越大越好"""
+    def register(func):
+        BENCHMARKS[name] = (func, unit)
+        return func
+    return register
+
+
+def measure(loop, quick: bool, items_per_call: int = 1) -> dict:
+    """
+    微基准计时：loop(n) 执行 n 次被测操作
+    先校准 n 使单轮耗时约 min_time，再重复多轮，取中位数（用于比较）与最好成绩
+    """
+    min_time, rounds = (0.05, 3) if quick else (0.2, 7)
+    n = 1
+    while True:
+        started = time.perf_counter()
+        loop(n)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 4:
+            break
+        n *= 4
+    n = max(1, int(n * min_time / max(elapsed, 1e-9)))
+    rates = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        loop(n)
+        rates.append(n * items_per_call / (time.perf_counter() - started))
+    return {"value": statistics.median(rates), "best": max(rates), "rounds": rounds, "n": n}
+
+
+def make_reading(i: int = 0) -> BloodPressureReading:
+    return BloodPressureReading(120 + i % 20, 80, 70, datetime(2026, 10, 19, 8, 30))
+
+
+# ============== 微基准 ==============
+@benchmark("parse_valid")
+def bench_parse_valid(quick):
+    parse = DataParser.parse
+
+    def loop(n):
+        for _ in range(n):
+            parse(VALID_FRAME)
+    return measure(loop, quick)
+
+
+@benchmark("parse_valid_logged")
+def bench_parse_valid_logged(quick):
+    """与程序运行时相同：DEBUG 级别写入日志文件"""
+    parse = DataParser.parse
+    fd, path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        def loop(n):
+            for _ in range(n):
+                parse(VALID_FRAME)
+        return measure(loop, quick)
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+        handler.close()
+        os.remove(path)
+
+
+@benchmark("parse_invalid")
+def bench_parse_invalid(quick):
+    parse = DataParser.parse
+    frames = INVALID_FRAMES
+
+    def loop(n):
+        for _ in range(n):
+            for frame in frames:
+                parse(frame)
+    return measure(loop, quick, items_per_call=len(frames))
+
+
+@benchmark("parse_format_hbp9030")
+def bench_parse_format(quick):
+    parse = DataParser._parse_format_hbp9030
+    text = VALID_FRAME.decode("ascii")
+
+    def loop(n):
+        for _ in range(n):
+            parse(text)
+    return measure(loop, quick)
+
+
+@benchmark("framer", unit="帧/秒")
+def bench_framer(quick):
+    frames_per_stream = 200
+    simulator = Simulator(line_endings=(b"\r\n", b"\r", b"\n"), max_chunk=16, seed=1)
+    chunks = simulator.fragment(simulator.generate_stream(frames_per_stream, datetime(2026, 10, 19, 8, 30)))
+
+    def loop(n):
+        framer = LineFramer()
+        feed = framer.feed
+        for _ in range(n):
+            for chunk in chunks:
+                feed(chunk)
+    return measure(loop, quick, items_per_call=frames_per_stream)
+
+
+@benchmark("store_update")
+def bench_store_update(quick):
+    store = WebDataStore()
+    readings = [make_reading(i) for i in range(64)]
+
+    def loop(n):
+        update = store.update_reading
+        for i in range(n):
+            update(readings[i & 63])
+    return measure(loop, quick)
+
+
+@benchmark("store_snapshot")
+def bench_store_snapshot(quick):
+    store = WebDataStore()
+    store.update_reading(make_reading())
+
+    def loop(n):
+        snapshot = store.snapshot
+        for _ in range(n):
+            snapshot()
+    return measure(loop, quick)
+
+
+@benchmark("json_data")
+def bench_json_data(quick):
+    store = WebDataStore()
+    store.set_status("已连接到 /dev/ttyUSB0")
+    store.update_reading(make_reading())
+    data = store.snapshot()
+    dumps = json.dumps
+
+    def loop(n):
+        for _ in range(n):
+            dumps(data, ensure_ascii=False).encode("utf-8")
+    return measure(loop, quick)
+
+
+# ============== 宏基准 ==============
+def run_threads(targets, seconds: float):
+    """
+    同时运行多个 target(stop_event) -> 次数，返回 (各线程的次数, 实际耗时)
+    线程很多时主线程要等 GIL 才能醒来，实际运行时间可能比 seconds 长得多，速率须按实际耗时计算
+    """
+    stop = threading.Event()
+    counts = [0] * len(targets)
+
+    def wrap(index, target):
+        counts[index] = target(stop)
+
+    threads = [threading.Thread(target=wrap, args=(i, t), daemon=True) for i, t in enumerate(targets)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return counts, time.perf_counter() - started
+
+
+@benchmark("store_contention", unit="读次/秒")
+def bench_store_contention(quick, writers: int = 2, readers: int = 8):
+    store = WebDataStore()
+    readings = [make_reading(i) for i in range(64)]
+    seconds = 1.0 if quick else 3.0
+
+    def writer(stop):
+        count = 0
+        update = store.update_reading
+        while not stop.is_set():
+            update(readings[count & 63])
+            count += 1
+        return count
+
+    def reader(stop):
+        count = 0
+        snapshot = store.snapshot
+        while not stop.is_set():
+            snapshot()
+            count += 1
+        return count
+
+    counts, elapsed = run_threads([writer] * writers + [reader] * readers, seconds)
+    return {
+        "value": sum(counts[writers:]) / elapsed,
+        "writes_per_sec": sum(counts[:writers]) / elapsed,
+        "writers": writers,
+        "readers": readers,
+        "seconds": round(elapsed, 3),
+    }
+
+
+@benchmark("store_readers", unit="读次/秒")
+def bench_store_readers(quick):
+    """读取不加锁：读线程再多也不应拖慢写线程"""
+    readers = 50 if quick else 200
+    store = WebDataStore()
+    readings = [make_reading(i) for i in range(64)]
+    seconds = 1.0 if quick else 3.0
+
+    def writer(stop):
+        count = 0
+        update = store.update_reading
+        while not stop.is_set():
+            update(readings[count & 63])
+            count += 1
+        return count
+
+    def reader(stop):
+        count = 0
+        current = store.current
+        while not stop.is_set():
+            snapshot = current()
+            snapshot.body, snapshot.etag
+            count += 1
+        return count
+
+    counts, elapsed = run_threads([writer] + [reader] * readers, seconds)
+    return {
+        "value": sum(counts[1:]) / elapsed,
+        "writes_per_sec": counts[0] / elapsed,
+        "readers": readers,
+        "seconds": round(elapsed, 3),
+    }
+
+
+@benchmark("bus_fanout", unit="事件/秒")
+def bench_bus_fanout(quick):
+    """慢的订阅者只丢弃自己队列里最旧的事件，不拖慢发布者和其它订阅者"""
+    from bpmon.bus import EventBus
+    bus = EventBus()
+    readings = [make_reading(i) for i in range(64)]
+    seconds = 1.0 if quick else 3.0
+    bus.subscribe("fast-1", {"reading": lambda reading: None})
+    bus.subscribe("fast-2", {"reading": lambda reading: None})
+    bus.subscribe("slow", {"reading": lambda reading: time.sleep(0.001)}, overflow="drop_oldest")
+
+    def publisher(stop):
+        count = 0
+        publish = bus.publish
+        while not stop.is_set():
+            publish("reading", readings[count & 63])
+            count += 1
+        return count
+
+    counts, elapsed = run_threads([publisher], seconds)
+    stats = bus.stats()
+    bus.close()
+    return {
+        "value": counts[0] / elapsed,
+        "subscribers": {name: {key: entry[key] for key in ("delivered", "dropped")} for name, entry in stats.items()},
+        "seconds": round(elapsed, 3),
+    }
+
+
+def bench_web(mode: str, quick: bool, clients: int = 8) -> dict:
+    from bpmon.web import BPWebServer
+    store = WebDataStore()
+    store.update_reading(make_reading())
+    server = BPWebServer(store, "127.0.0.1", 0, mode=mode)
+    if not server.start():
+        raise RuntimeError("Web 服务启动失败")
+    seconds = 1.0 if quick else 3.0
+    errors = []
+
+    def client(stop):
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+        count = 0
+        while not stop.is_set():
+            try:
+                conn.request("GET", "/data")
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                count += 1
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(str(e))
+                conn.close()
+        conn.close()
+        return count
+
+    # 后台不断更新数据，避免只测到缓存命中
+    def updater(stop):
+        count = 0
+        while not stop.wait(0.01):
+            store.update_reading(make_reading(count))
+            count += 1
+        return count
+
+    try:
+        counts, elapsed = run_threads([client] * clients + [updater], seconds)
+    finally:
+        server.stop()
+    return {"value": sum(counts[:clients]) / elapsed, "clients": clients,
+            "errors": len(errors), "seconds": round(elapsed, 3)}
+
+
+@benchmark("web_thread", unit="请求/秒")
+def bench_web_thread(quick):
+    return bench_web("thread", quick)
+
+
+@benchmark("web_async", unit="请求/秒")
+def bench_web_async(quick):
+    return bench_web("async", quick)
+
+
+# ============== 结果 ==============
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """与基线比较，返回回归项 [(名称, 基线值, 本次值, 变化比例)]"""
+    regressions = []
+    print(f"\n与基线比较（{baseline['environment'].get('time', '?')}，提交 {baseline['environment'].get('commit') or '?'}）：")
+    for name, result in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if not base:
+            print(f"  {name:<22} 基线中没有该项")
+            continue
+        change = result["value"] / base["value"] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  <-- 回归"
+            regressions.append((name, base["value"], result["value"], change))
+        elif change > threshold:
+            flag = "  (提升)"
+        print(f"  {name:<22} {base['value']:>12,.0f} -> {result['value']:>12,.0f}  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="热点路径基准测试套件")
+    parser.add_argument("--filter", help="只运行名称包含该字符串的项（逗号分隔多个）")
+    parser.add_argument("--quick", action="store_true", help="缩短每项运行时间（结果波动更大）")
+    parser.add_argument("--output", help="结果 JSON 路径，默认 benchmarks/results/<时间>.json")
+    parser.add_argument("--baseline", help="与该基线 JSON 比较")
+    parser.add_argument("--threshold", type=float, default=0.15, help="比基线慢超过该比例时视为回归，默认 0.15")
+    parser.add_argument("--save-baseline", metavar="PATH", help="同时把结果保存为基线")
+    parser.add_argument("--list", action="store_true", help="列出所有基准测试")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_func, unit) in BENCHMARKS.items():
+            print(f"{name:<22} {unit}")
+        return 0
+
+    # 与程序运行时不同，基准测试默认不输出日志（parse_valid_logged 单独测试日志开销）
+    logger.setLevel(logging.WARNING)
+    config.WEB_AUTH_ENABLED = False
+    random.seed(1)
+
+    patterns = [p.strip() for p in args.filter.split(",")] if args.filter else None
+    results = {"environment": environment(), "quick": args.quick, "benchmarks": {}}
+    for name, (func, unit) in BENCHMARKS.items():
+        if patterns and not any(p in name for p in patterns):
+            continue
+        result = func(args.quick)
+        result["unit"] = unit
+        results["benchmarks"][name] = result
+        print(f"{name:<22} {result['value']:>14,.0f} {unit}")
+
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    for path in filter(None, (output, args.save_baseline)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存: {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} 项比基线慢超过 {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+长时间稳定性（soak）测试：采集站要连续运行数周，这里用高速率模拟数据 + 大量 HTTP 客户端连续运行数小时，
+定时采样进程与程序内部的各项大小，发现随时间持续增长的指标（队列、日志面板、每连接线程等泄漏）即判定失败
+
+    目标          headless：进程内运行 HeadlessRunner（与 --headless 相同）
+                  gui：     隐藏窗口运行 BloodPressureMonitorGUI（需要图形环境）
+    数据源        模拟器（--rate 帧/秒）
+    客户端        --pollers 个线程，轮流使用 长轮询 /data?wait= / 带 ETag 的定时 /data / SSE /events，
+                  每 --reconnect-every 次请求（或 SSE 消息）断开重连一次，覆盖连接的建立与回收
+    采样          RSS、线程数、打开的文件描述符、活动连接数、数据队列长度（headless 为事件总线各队列之和）；
+                  gui 目标另有 log_text 行数、readings 与历史列表长度、趋势图历史点数
+
+判定：去掉预热阶段后把样本按时间分为前、中、后三段，某指标的后段比前段高出容差、且中段也高于前段时
+视为无界增长（RSS 用各段中位数，其余用最大值）。趋势图历史（HistoryStore）按设计在内存中保存全部读数，
+RSS 的容差按其增加的点数放宽。另外请求错误率超过 1% 或读数停止增长也判定失败。
+
+用法：
+    python benchmarks/soak_test.py --hours 4
+    python benchmarks/soak_test.py --target gui --hours 8 --rate 20 --pollers 100
+    python benchmarks/soak_test.py --minutes 5 --sample-interval 5      # 快速检查
+    python benchmarks/soak_test.py --hours 12 --json soak.json
+
+退出码：0 通过，1 失败
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bpmon import config  # noqa: E402
+
+HISTORY_POINT_BYTES = 64  # HistoryStore 每个点约占的内存（时间 float + 4 个列表槽位）
+MAX_ERROR_RATIO = 0.01
+STARTUP_TIMEOUT = 30.0  # Web 服务启动的最长等待（秒），超时判定失败，不无限等待
+
+
+# ============== 采样 ==============
+def process_stats() -> dict:
+    """RSS（KiB）、线程数、打开的文件描述符数（不支持的系统为 None）"""
+    rss_kb = None
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss_kb = int(line.split()[1])
+                    break
+    except OSError:
+        try:
+            import resource
+            # macOS 的 ru_maxrss 单位为字节，且是峰值，只能近似
+            rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if sys.platform == "darwin":
+                rss_kb //= 1024
+        except Exception:
+            pass
+    fds = None
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        try:
+            fds = len(os.listdir(fd_dir))
+            break
+        except OSError:
+            continue
+    return {"rss_kb": rss_kb, "threads": threading.active_count(), "fds": fds}
+
+
+# ============== HTTP 客户端 ==============
+class Poller(threading.Thread):
+    """一个模拟的 Web 客户端；连接被服务端关闭（keep-alive 超时）时重连一次再计为错误"""
+
+    KINDS = ("longpoll", "poll", "sse")
+
+    def __init__(self, port: int, kind: str, stop: threading.Event,
+                 poll_interval: float, reconnect_every: int):
+        super().__init__(daemon=True, name=f"soak-{kind}")
+        self.port = port
+        self.kind = kind
+        self.stop_event = stop
+        self.poll_interval = poll_interval
+        self.reconnect_every = reconnect_every
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._version = -1
+        self._etag = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=config.WEB_LONG_POLL_MAX + 10)
+            self.connections += 1
+        return self._conn
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def run(self):
+        handled = 0
+        while not self.stop_event.is_set():
+            try:
+                if self.kind == "sse":
+                    self._sse()
+                    handled = 0
+                else:
+                    if not self._request():
+                        self._close()
+                        if not self._request():
+                            self.errors += 1
+                            self._close()
+                            self.stop_event.wait(1.0)
+                            continue
+                    handled += 1
+                    if handled >= self.reconnect_every:
+                        self._close()
+                        handled = 0
+                    if self.kind == "poll":
+                        self.stop_event.wait(self.poll_interval)
+            except Exception:
+                self.errors += 1
+                self._close()
+                self.stop_event.wait(1.0)
+        self._close()
+
+    def _request(self) -> bool:
+        headers = {}
+        if self.kind == "longpoll":
+            path = f"/data?wait={self._version}&timeout=5"
+        else:
+            path = "/data"
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+        try:
+            conn = self._connect()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            return False
+        self.requests += 1
+        if response.status == 200:
+            self._etag = response.getheader("ETag")
+            self._version = json.loads(body)["version"]
+        elif response.status != 304:
+            self.errors += 1
+        return True
+
+    def _sse(self):
+        """读取 reconnect_every 条消息后断开，重连时用 Last-Event-ID 续传"""
+        conn = self._connect()
+        headers = {"Last-Event-ID": str(self._version)} if self._version >= 0 else {}
+        conn.request("GET", "/events", headers=headers)
+        response = conn.getresponse()
+        self.requests += 1
+        if response.status != 200:
+            self.errors += 1
+            response.read()
+            self._close()
+            self.stop_event.wait(1.0)
+            return
+        events = 0
+        while events < self.reconnect_every and not self.stop_event.is_set():
+            line = response.fp.readline()
+            if not line:
+                break
+            if line.startswith(b"id: "):
+                self._version = int(line[4:])
+                events += 1
+        self._close()
+
+
+# ============== 被测目标 ==============
+# 被测程序（HeadlessTarget / GUITarget）：run(on_started) 在主线程运行直到结束（Web 服务就绪后以端口调用
+# on_started），probe() 返回程序内部的各项大小，finish() 结束运行；启动失败时 run() 返回前设置 error
+
+
+class HeadlessTarget:
+    def __init__(self, args):
+        from bpmon.app import parse_args
+        from bpmon.headless import HeadlessRunner, load_settings
+        argv = ["--headless", "--simulate", "--sim-rate", str(args.rate), "--web-host", "127.0.0.1",
+                "--web-port", "0", "--web-mode", args.mode, "--no-discovery",
+                "--max-connections", str(max(config.WEB_MAX_CONNECTIONS, args.pollers * 2))]
+        if args.max_chunk:
+            argv += ["--sim-max-chunk", str(args.max_chunk)]
+        if args.corrupt_ratio:
+            argv += ["--sim-corrupt-ratio", str(args.corrupt_ratio)]
+        settings = load_settings(parse_args(argv))
+        self.runner = HeadlessRunner(settings)
+        self.error: Optional[str] = None
+
+    def run(self, on_started: Callable[[int], None]):
+        """在主线程运行（HeadlessRunner 需要注册信号处理），返回时已退出"""
+        exited = threading.Event()
+
+        def wait_for_server():
+            deadline = time.monotonic() + STARTUP_TIMEOUT
+            while not exited.wait(0.05):
+                server = self.runner.web_server
+                if server is not None and server.is_running and server.server_port:
+                    on_started(server.server_port)
+                    return
+                if time.monotonic() >= deadline:
+                    self.error = f"Web 服务 {STARTUP_TIMEOUT:g} 秒内未启动（端口绑定失败？）"
+                    self.runner.stop()
+                    return
+            self.error = "无界面程序在 Web 服务就绪前退出"
+        threading.Thread(target=wait_for_server, daemon=True).start()
+        try:
+            self.runner.run()
+        finally:
+            exited.set()
+
+    def probe(self) -> dict:
+        return {
+            "connections": self.runner.web_server.active_connections() if self.runner.web_server else None,
+            "published": self.runner.data_store.snapshot().get("reading_seq", 0),
+            "queue": sum(entry["depth"] for entry in self.runner.bus.stats().values()),
+        }
+
+    def finish(self):
+        self.runner.stop()
+
+
+class GUITarget:
+    def __init__(self, args):
+        config.WEB_SERVER_HOST = "127.0.0.1"
+        config.WEB_SERVER_PORT = 0
+        config.WEB_SERVER_MODE = args.mode
+        config.WEB_MAX_CONNECTIONS = max(config.WEB_MAX_CONNECTIONS, args.pollers * 2)
+        config.DISCOVERY_ENABLED = False
+        config.MULTICAST_ENABLED = False
+        from bpmon.gui import BloodPressureMonitorGUI
+        self.app = BloodPressureMonitorGUI()
+        self.app.root.withdraw()
+        self.app.simulator.max_chunk = args.max_chunk
+        self.app.simulator.corrupt_ratio = args.corrupt_ratio
+        self.rate = args.rate
+        self.error: Optional[str] = None
+
+    def run(self, on_started: Callable[[int], None]):
+        """在主线程运行 Tk 事件循环；采样通过 root.after 在界面线程进行"""
+        server = self.app.web_server
+        if server is None or not server.is_running:
+            # 构造时已同步启动 Web 服务，失败不会再重试
+            self.error = "Web 服务启动失败（端口绑定失败？）"
+            self.app._on_closing()
+            return
+        self.app.simulation_mode = True
+        self.app.simulator.start(1.0, self.rate)
+        on_started(server.server_port)
+        self.app.run()
+
+    def probe(self) -> dict:
+        app = self.app
+        return {
+            "connections": app.web_server.active_connections() if app.web_server else None,
+            "published": app.web_data_store.snapshot().get("reading_seq", 0),
+            "queue": app.data_queue.qsize(),
+            "log_lines": int(app.log_text.index("end-1c").split(".")[0]),
+            "readings": len(app.readings),
+            "listbox": app.history_listbox.size(),
+            "history_points": len(app.history_store.times),
+        }
+
+    def call_soon(self, func: Callable[[], None]):
+        """在界面线程执行（采样线程只等待结果，不直接访问 Tk）"""
+        self.app.root.after(0, func)
+
+    def finish(self):
+        self.call_soon(self.app._on_closing)
+
+
+# ============== 判定 ==============
+def tolerances(args) -> Dict[str, float]:
+    """各指标允许的增长（后段 - 前段）"""
+    per_connection = max(4, args.pollers // 10)
+    return {
+        "threads": per_connection,
+        "fds": per_connection,
+        "connections": per_connection,
+        "queue": max(50, args.rate * 2),
+        "log_lines": 0,
+        "readings": 0,
+        "listbox": 0,
+    }
+
+
+def find_growth(samples: List[dict], args) -> List[str]:
+    """返回失败原因列表"""
+    steady = [s for s in samples if s["t"] >= args.warmup]
+    if len(steady) < 6:
+        return [f"稳定阶段只有 {len(steady)} 个样本（至少 6 个），请加长运行时间或缩短 --sample-interval"]
+    third = len(steady) // 3
+    first, middle, last = steady[:third], steady[third:-third], steady[-third:]
+    failures = []
+
+    def values(part, name):
+        return [s[name] for s in part if s.get(name) is not None]
+
+    for name, tolerance in tolerances(args).items():
+        a, b, c = values(first, name), values(middle, name), values(last, name)
+        if not (a and b and c):
+            continue
+        if max(c) > max(a) + tolerance and max(b) > max(a):
+            failures.append(f"{name} 持续增长：前段最大 {max(a)}，中段 {max(b)}，后段 {max(c)}（容差 {tolerance:g}）")
+
+    a, b, c = values(first, "rss_kb"), values(middle, "rss_kb"), values(last, "rss_kb")
+    if a and b and c:
+        base, mid, end = statistics.median(a), statistics.median(b), statistics.median(c)
+        allowance = max(args.rss_tolerance * 1024, base * 0.05)
+        points = values(steady, "history_points")
+        if points:
+            allowance += (points[-1] - points[0]) * HISTORY_POINT_BYTES / 1024
+        if end > base + allowance and mid > base:
+            failures.append(f"RSS 持续增长：{base / 1024:.1f} → {mid / 1024:.1f} → {end / 1024:.1f} MiB"
+                            f"（容差 {allowance / 1024:.1f} MiB）")
+
+    published = values(last, "published")
+    if published and published[-1] <= published[0]:
+        failures.append("最后阶段读数不再增加（数据源或处理线程停止）")
+    requests, errors = samples[-1]["requests"], samples[-1]["errors"]
+    if requests and errors / requests > MAX_ERROR_RATIO:
+        failures.append(f"请求错误率 {errors / requests:.2%}（{errors}/{requests}）")
+    return failures
+
+
+# ============== 主流程 ==============
+COLUMNS = ("rss_kb", "threads", "fds", "connections", "queue", "log_lines", "readings", "listbox", "published")
+
+
+def format_sample(sample: dict) -> str:
+    cells = [f"{sample['t']:>8.0f}"]
+    for name in COLUMNS:
+        value = sample.get(name)
+        cells.append(f"{'-' if value is None else value:>11}")
+    cells.append(f"{sample['requests']:>10} {sample['errors']:>6}")
+    return " ".join(cells)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长时间稳定性（soak）测试")
+    parser.add_argument("--target", choices=("headless", "gui"), default="headless", help="被测程序")
+    duration = parser.add_mutually_exclusive_group()
+    duration.add_argument("--hours", type=float, default=2.0, help="运行时长（小时），默认 2")
+    duration.add_argument("--minutes", type=float, help="运行时长（分钟）")
+    parser.add_argument("--rate", type=float, default=50.0, help="模拟数据速率（帧/秒）")
+    parser.add_argument("--max-chunk", type=int, default=0, help="把模拟字节流切成不超过该长度的分段")
+    parser.add_argument("--corrupt-ratio", type=float, default=0.0, help="损坏帧比例（0~1）")
+    parser.add_argument("--pollers", type=int, default=60, help="HTTP 客户端数")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="定时轮询客户端的间隔（秒）")
+    parser.add_argument("--reconnect-every", type=int, default=50, help="每多少次请求 / SSE 消息重连一次")
+    parser.add_argument("--mode", choices=("thread", "async"), default=config.WEB_SERVER_MODE, help="Web 服务模式")
+    parser.add_argument("--sample-interval", type=float, default=30.0, help="采样间隔（秒）")
+    parser.add_argument("--warmup", type=float, help="预热时长（秒），不参与判定，默认运行时长的 10%%（至少 60 秒）")
+    parser.add_argument("--rss-tolerance", type=float, default=4.0, help="RSS 允许的增长（MiB），默认 4，至少 5%%")
+    parser.add_argument("--log", action="store_true", help="写入 bp_monitor.log（长时间高速率运行时日志文件很大）")
+    parser.add_argument("--json", help="把全部样本与结论写入 JSON 文件")
+    args = parser.parse_args()
+
+    seconds = args.minutes * 60 if args.minutes is not None else args.hours * 3600
+    if args.warmup is None:
+        args.warmup = min(max(60.0, seconds * 0.1), seconds / 2)
+    config.WEB_AUTH_ENABLED = False
+    if args.log:
+        from bpmon.log import setup_logging
+        setup_logging()
+
+    target = GUITarget(args) if args.target == "gui" else HeadlessTarget(args)
+    stop = threading.Event()
+    pollers: List[Poller] = []
+    samples: List[dict] = []
+    started = time.monotonic()
+
+    def take_sample():
+        sample = {"t": time.monotonic() - started}
+        sample.update(process_stats())
+        if isinstance(target, GUITarget):
+            # Tk 控件只能在界面线程访问
+            done = threading.Event()
+            result = {}
+
+            def probe():
+                result.update(target.probe())
+                done.set()
+            target.call_soon(probe)
+            if not done.wait(30):
+                print("警告：界面线程 30 秒未响应", flush=True)
+            sample.update(result)
+        else:
+            sample.update(target.probe())
+        sample["requests"] = sum(p.requests for p in pollers)
+        sample["errors"] = sum(p.errors for p in pollers)
+        samples.append(sample)
+        print(format_sample(sample), flush=True)
+
+    def drive(port: int):
+        for index in range(args.pollers):
+            poller = Poller(port, Poller.KINDS[index % len(Poller.KINDS)], stop,
+                            args.poll_interval, args.reconnect_every)
+            poller.start()
+            pollers.append(poller)
+        print(f"目标 {args.target}（{args.mode}），{args.rate:g} 帧/秒，{args.pollers} 个客户端，"
+              f"运行 {seconds / 3600:.2f} 小时，预热 {args.warmup:.0f} 秒，端口 {port}", flush=True)
+        print(f"{'秒':>8} " + " ".join(f"{name:>11}" for name in COLUMNS) + f" {'请求':>10} {'错误':>6}", flush=True)
+        deadline = started + seconds
+        try:
+            while not stop.wait(max(0.0, min(args.sample_interval, deadline - time.monotonic()))):
+                take_sample()
+                if time.monotonic() >= deadline:
+                    break
+        finally:
+            stop.set()
+            target.finish()
+
+    try:
+        target.run(lambda port: threading.Thread(target=drive, args=(port,), daemon=True).start())
+    finally:
+        stop.set()
+
+    failures = [f"启动失败：{target.error}"] if target.error else find_growth(samples, args)
+    print()
+    if failures:
+        print("失败：")
+        for failure in failures:
+            print(f"  - {failure}")
+    else:
+        print(f"通过：{len(samples)} 个样本内未发现持续增长的指标")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "samples": samples, "failures": failures}, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
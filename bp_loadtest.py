@@ -0,0 +1,566 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+BPWebServer 压力测试工具
+
+在子进程中启动一个本地 BPWebServer（由 Simulator 持续产生数据），
+再用 N 个并发客户端线程模拟病房浏览器 / B端程序轮询 `/`、`/data` 等接口，
+最后输出吞吐量、p50/p95/p99 延迟、错误率以及服务端进程的 CPU / 内存占用。
+
+--push 改为压测推送接口：
+    longpoll  每个客户端记住 version，反复请求 /data?wait=<version>
+    sse       每个客户端保持一个 /events 流，按流统计收到的事件数（流断开后带 Last-Event-ID 重连）
+推送模式报告推送延迟（服务端发布新 version 到客户端收到的时间，压测本地服务端时才有）。
+
+用法示例：
+    python bp_loadtest.py --clients 200 --duration 30
+    python bp_loadtest.py --clients 500 --mode async --interval 1.0 --json result_async.json
+    python bp_loadtest.py --url http://192.168.1.20:8080 --clients 50   # 压测已运行的A端
+    python bp_loadtest.py --push sse --clients 500 --mode async --sim-rate 10
+
+结果可用 --json 保存，便于在不同版本之间对比容量变化。
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# ============== 服务端（子进程） ==============
+def _process_stats() -> dict:
+    """当前进程累计 CPU 时间与常驻内存（RSS）"""
+    times = os.times()
+    rss_kb = None
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss_kb = int(line.split()[1])
+                    break
+    except OSError:
+        try:
+            import resource
+            rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        except Exception:
+            pass
+    return {
+        "cpu_user": times.user,
+        "cpu_system": times.system,
+        "rss_kb": rss_kb,
+        "threads": threading.active_count(),
+    }
+
+
+def run_server(args):
+    """子进程入口：启动 BPWebServer + Simulator，并通过 stdin/stdout 与父进程通信"""
+    import logging
+    from bpmon import config
+    from bpmon.ingest import Simulator
+    from bpmon.storage import WebDataStore
+    from bpmon.web import BPWebServer
+
+    logging.getLogger().setLevel(logging.WARNING)
+    config.WEB_AUTH_ENABLED = bool(args.password)
+    config.WEB_AUTH_PASSWORD = args.password or ""
+
+    store = WebDataStore()
+    server = BPWebServer(store, "127.0.0.1", args.port, mode=args.mode,
+                         max_connections=args.max_connections)
+    if not server.start():
+        print("ERROR 服务启动失败", flush=True)
+        return 1
+
+    simulator = Simulator(
+        on_data_received=store.update_reading,
+        on_status_change=store.set_status,
+    )
+    # 各 version 的发布时间（time.time()，与客户端同一台机器），父进程据此计算推送延迟
+    published: Dict[int, float] = {}
+    store.add_listener(lambda event, data: published.__setitem__(data["version"], time.time()))
+    simulator.start(args.sim_interval, args.sim_rate)
+
+    print(f"PORT {server.server_port}", flush=True)
+    for line in sys.stdin:
+        command = line.strip()
+        if command == "stats":
+            print("STATS " + json.dumps(_process_stats()), flush=True)
+        elif command == "published":
+            print("PUBLISHED " + json.dumps(published), flush=True)
+
+    simulator.stop()
+    server.stop()
+    return 0
+
+
+class ServerProcess:
+    """管理服务端子进程"""
+
+    def __init__(self, args):
+        cmd = [
+            sys.executable, os.path.abspath(__file__), "--serve",
+            "--mode", args.mode,
+            "--port", "0",
+            "--sim-interval", str(args.sim_interval),
+            "--sim-rate", str(args.sim_rate),
+            "--max-connections", str(args.max_connections),
+        ]
+        if args.password:
+            cmd += ["--password", args.password]
+        self.proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        line = self.proc.stdout.readline().strip()
+        if not line.startswith("PORT "):
+            self.proc.kill()
+            raise RuntimeError(f"服务端启动失败: {line!r}")
+        self.port = int(line.split()[1])
+
+    def _command(self, command: str, reply: str):
+        self.proc.stdin.write(command + "\n")
+        self.proc.stdin.flush()
+        line = self.proc.stdout.readline().strip()
+        return json.loads(line[len(reply) + 1:])
+
+    def stats(self) -> dict:
+        return self._command("stats", "STATS")
+
+    def published(self) -> Dict[int, float]:
+        """{version: 发布时间}"""
+        return {int(version): t for version, t in self._command("published", "PUBLISHED").items()}
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+
+
+# ============== 客户端 ==============
+class ClientWorker(threading.Thread):
+    """模拟一个轮询客户端（保持一个 HTTP 连接，按间隔依次请求各路径）"""
+
+    def __init__(self, host: str, port: int, paths: List[str], interval: float,
+                 stop_at: float, keep_alive: bool, auth_header: Optional[str]):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.paths = paths
+        self.interval = interval
+        self.stop_at = stop_at
+        self.keep_alive = keep_alive
+        self.headers = {"Authorization": auth_header} if auth_header else {}
+        if not keep_alive:
+            self.headers["Connection"] = "close"
+        self.latencies: Dict[str, List[float]] = {p: [] for p in paths}
+        self.errors: Dict[str, int] = {p: 0 for p in paths}
+
+    def run(self):
+        conn = None
+        i = 0
+        while time.monotonic() < self.stop_at:
+            path = self.paths[i % len(self.paths)]
+            i += 1
+            started = time.monotonic()
+            try:
+                if conn is None:
+                    conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+                conn.request("GET", path, headers=self.headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    self.errors[path] += 1
+                else:
+                    self.latencies[path].append(time.monotonic() - started)
+                if not self.keep_alive or resp.will_close:
+                    conn.close()
+                    conn = None
+            except Exception:
+                self.errors[path] += 1
+                if conn is not None:
+                    conn.close()
+                conn = None
+                time.sleep(0.05)
+            if self.interval > 0:
+                delay = self.interval - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+        if conn is not None:
+            conn.close()
+
+
+class LongPollWorker(threading.Thread):
+    """模拟一个使用长轮询的客户端（B端的做法）：记住 version，反复请求 /data?wait=<version>"""
+
+    PATH = "/data?wait"
+
+    def __init__(self, host: str, port: int, wait: float, stop_at: float, auth_header: Optional[str]):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.wait = wait
+        self.stop_at = stop_at
+        self.headers = {"Authorization": auth_header} if auth_header else {}
+        self.requests = 0
+        self.errors = 0
+        self.received: List[Tuple[int, float]] = []  # (新 version, 收到的时间)
+
+    def run(self):
+        conn = None
+        version = None
+        while True:
+            remaining = self.stop_at - time.monotonic()
+            if remaining <= 0:
+                break
+            if version is None:
+                path = "/data"
+            else:
+                path = f"/data?wait={version}&timeout={min(self.wait, remaining):.1f}"
+            self.requests += 1
+            try:
+                if conn is None:
+                    conn = http.client.HTTPConnection(self.host, self.port, timeout=self.wait + 10)
+                conn.request("GET", path, headers=self.headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                received_at = time.time()
+                if resp.status != 200:
+                    self.errors += 1
+                else:
+                    new_version = json.loads(body)["version"]
+                    if version is not None and new_version != version:
+                        self.received.append((new_version, received_at))
+                    version = new_version
+                if resp.will_close:
+                    conn.close()
+                    conn = None
+            except Exception:
+                self.errors += 1
+                if conn is not None:
+                    conn.close()
+                conn = None
+                time.sleep(0.05)
+        if conn is not None:
+            conn.close()
+
+
+class SSEWorker(threading.Thread):
+    """模拟一个 SSE 客户端：保持一个 /events 流，流断开后带 Last-Event-ID 重连"""
+
+    PATH = "/events"
+
+    def __init__(self, host: str, port: int, stop_at: float, auth_header: Optional[str]):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.stop_at = stop_at
+        self.headers = {"Accept": "text/event-stream"}
+        if auth_header:
+            self.headers["Authorization"] = auth_header
+        self.requests = 0
+        self.errors = 0
+        self.streams: List[int] = []  # 每个流收到的事件数
+        self.received: List[Tuple[int, float]] = []
+
+    def run(self):
+        last_id = None
+        while time.monotonic() < self.stop_at:
+            self.requests += 1
+            self.streams.append(0)
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+            try:
+                headers = dict(self.headers)
+                if last_id is not None:
+                    headers["Last-Event-ID"] = str(last_id)
+                conn.request("GET", self.PATH, headers=headers)
+                sock = conn.sock  # 流式响应（Connection: close）由响应接管连接，conn.sock 会被置空
+                resp = conn.getresponse()
+                if resp.status != 200:
+                    resp.read()
+                    self.errors += 1
+                    time.sleep(0.05)
+                    continue
+                first = last_id is None  # 新连接的第一条是当前数据，不是推送
+                while True:
+                    remaining = self.stop_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    # 只等到测试结束；超时即表示测试已结束
+                    sock.settimeout(remaining + 0.5)
+                    line = resp.readline()
+                    if not line:
+                        break  # 服务端关闭了流，重连
+                    if line.startswith(b"id:"):
+                        received_at = time.time()
+                        last_id = int(line[3:].strip())
+                        self.streams[-1] += 1
+                        if not first:
+                            self.received.append((last_id, received_at))
+                        first = False
+            except socket.timeout:
+                if time.monotonic() < self.stop_at:
+                    self.errors += 1
+            except Exception:
+                self.errors += 1
+                time.sleep(0.05)
+            finally:
+                conn.close()
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def _summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies.sort()
+    total = len(latencies) + errors
+    ms = lambda v: None if v is None else round(v * 1000, 3)
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": ms(_percentile(latencies, 50)),
+        "p95_ms": ms(_percentile(latencies, 95)),
+        "p99_ms": ms(_percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+    }
+
+
+def _summarize_push(workers, published: Optional[Dict[int, float]], started_wall: float, elapsed: float) -> dict:
+    """
+    推送模式的统计：收到的推送数、每个客户端平均收到的比例（长轮询在高速率下只拿最新数据，比例小于 1 属正常）、
+    推送延迟（本地服务端才有发布时间）；SSE 另按流统计事件数
+    """
+    requests = sum(w.requests for w in workers)
+    errors = sum(w.errors for w in workers)
+    received = [item for w in workers for item in w.received]
+    ms = lambda v: None if v is None else round(v * 1000, 3)
+    summary = {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "deliveries": len(received),
+        "deliveries_per_second": round(len(received) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    if published:
+        in_window = sum(1 for t in published.values() if t >= started_wall)
+        summary["published"] = in_window
+        if in_window and workers:
+            summary["coverage"] = round(len(received) / (in_window * len(workers)), 4)
+        delays = sorted(max(0.0, t - published[v]) for v, t in received if v in published)
+        summary.update({
+            "latency_p50_ms": ms(_percentile(delays, 50)),
+            "latency_p95_ms": ms(_percentile(delays, 95)),
+            "latency_p99_ms": ms(_percentile(delays, 99)),
+            "latency_max_ms": ms(delays[-1] if delays else None),
+        })
+    streams = [n for w in workers for n in getattr(w, "streams", ())]
+    if streams:
+        summary["streams"] = len(streams)
+        summary["events_per_stream"] = {
+            "min": min(streams),
+            "mean": round(sum(streams) / len(streams), 1),
+            "max": max(streams),
+        }
+    return summary
+
+
+def _login(host: str, port: int, password: str) -> str:
+    """通过 /login 获取会话令牌，返回 Authorization 头"""
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("POST", "/login", body=json.dumps({"password": password}),
+                 headers={"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    if resp.status == 200:
+        return "Bearer " + json.loads(body)["token"]
+    # 旧版本没有 /login，退回 Basic 认证
+    return "Basic " + base64.b64encode(f"loadtest:{password}".encode("utf-8")).decode("ascii")
+
+
+def run_load(args) -> dict:
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        server = ServerProcess(args)
+        host, port = "127.0.0.1", server.port
+
+    try:
+        auth_header = _login(host, port, args.password) if args.password else None
+        paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+
+        stats_before = server.stats() if server else None
+        started = time.monotonic()
+        started_wall = time.time()
+        stop_at = started + args.duration
+        if args.push == "longpoll":
+            workers = [LongPollWorker(host, port, args.wait, stop_at, auth_header) for _ in range(args.clients)]
+        elif args.push == "sse":
+            workers = [SSEWorker(host, port, stop_at, auth_header) for _ in range(args.clients)]
+        else:
+            workers = [
+                ClientWorker(host, port, paths, args.interval, stop_at, not args.no_keepalive, auth_header)
+                for _ in range(args.clients)
+            ]
+        for w in workers:
+            w.start()
+            if args.ramp > 0:
+                time.sleep(args.ramp / args.clients)
+
+        peak_threads = None
+        while any(w.is_alive() for w in workers):
+            time.sleep(0.5)
+            if server:
+                peak_threads = max(peak_threads or 0, server.stats()["threads"])
+        elapsed = time.monotonic() - started
+        stats_after = server.stats() if server else None
+        published = server.published() if server and args.push else None
+    finally:
+        if server:
+            server.close()
+
+    result = {
+        "version": 1,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "platform": f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+        "config": {
+            "target": args.url or "local",
+            "mode": None if args.url else args.mode,
+            "clients": args.clients,
+            "duration": args.duration,
+            "interval": args.interval,
+            "paths": [workers[0].PATH] if args.push else paths,
+            "keep_alive": not args.no_keepalive,
+            "push": args.push,
+        },
+        "paths": {},
+    }
+
+    if args.push:
+        result["push"] = _summarize_push(workers, published, started_wall, elapsed)
+    else:
+        all_latencies: List[float] = []
+        all_errors = 0
+        for path in paths:
+            lat = [v for w in workers for v in w.latencies[path]]
+            err = sum(w.errors[path] for w in workers)
+            all_latencies.extend(lat)
+            all_errors += err
+            result["paths"][path] = _summarize(lat, err, elapsed)
+        result["total"] = _summarize(all_latencies, all_errors, elapsed)
+
+    if stats_before and stats_after:
+        cpu = (stats_after["cpu_user"] + stats_after["cpu_system"]
+               - stats_before["cpu_user"] - stats_before["cpu_system"])
+        result["server"] = {
+            "cpu_seconds": round(cpu, 3),
+            "cpu_percent": round(cpu / elapsed * 100, 1),
+            "rss_kb": stats_after["rss_kb"],
+            "peak_threads": peak_threads,
+        }
+    return result
+
+
+def print_push_report(push: dict):
+    fmt = lambda v: "-" if v is None else f"{v:.2f}"
+    print(f"请求数 {push['requests']}  错误率 {push['error_rate'] * 100:.2f}%  "
+          f"收到推送 {push['deliveries']}（{push['deliveries_per_second']}/s）")
+    if "published" in push:
+        coverage = push.get("coverage")
+        print(f"服务端发布 {push['published']} 次  每个客户端收到的比例 "
+              f"{'-' if coverage is None else f'{coverage * 100:.1f}%'}")
+        print(f"推送延迟(ms): p50 {fmt(push['latency_p50_ms'])}  p95 {fmt(push['latency_p95_ms'])}  "
+              f"p99 {fmt(push['latency_p99_ms'])}  max {fmt(push['latency_max_ms'])}")
+    if "streams" in push:
+        per = push["events_per_stream"]
+        print(f"SSE 流 {push['streams']} 个  每流事件数: 最少 {per['min']}  平均 {per['mean']}  最多 {per['max']}")
+
+
+def print_report(result: dict):
+    cfg = result["config"]
+    if cfg.get("push"):
+        print(f"\n目标: {cfg['target']}  模式: {cfg['mode']}  客户端: {cfg['clients']}  "
+              f"时长: {cfg['duration']}s  推送: {cfg['push']}（{cfg['paths'][0]}）")
+        print_push_report(result["push"])
+        print_server_report(result)
+        return
+    print(f"\n目标: {cfg['target']}  模式: {cfg['mode']}  客户端: {cfg['clients']}  "
+          f"时长: {cfg['duration']}s  间隔: {cfg['interval']}s  keep-alive: {cfg['keep_alive']}")
+    header = f"{'路径':<12}{'请求数':>10}{'错误率':>9}{'RPS':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = list(result["paths"].items()) + [("合计", result["total"])]
+    for path, s in rows:
+        fmt = lambda v: "-" if v is None else f"{v:.2f}"
+        print(f"{path:<12}{s['requests']:>10}{s['error_rate'] * 100:>8.2f}%{s['rps']:>10.1f}"
+              f"{fmt(s['p50_ms']):>10}{fmt(s['p95_ms']):>10}{fmt(s['p99_ms']):>10}")
+    print_server_report(result)
+
+
+def print_server_report(result: dict):
+    if "server" in result:
+        srv = result["server"]
+        rss = "-" if srv["rss_kb"] is None else f"{srv['rss_kb'] / 1024:.1f} MB"
+        print(f"\n服务端: CPU {srv['cpu_percent']}% ({srv['cpu_seconds']} s)  RSS {rss}  "
+              f"峰值线程数 {srv['peak_threads']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BPWebServer 压力测试工具")
+    parser.add_argument("--clients", type=int, default=50, help="并发客户端数量")
+    parser.add_argument("--duration", type=float, default=20.0, help="测试时长（秒）")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="每个客户端的请求间隔（秒），0 表示不间断请求")
+    parser.add_argument("--paths", default="/data", help="轮流请求的路径，逗号分隔，例如 /,/data")
+    parser.add_argument("--push", choices=["longpoll", "sse"],
+                        help="改为压测推送接口（忽略 --paths / --interval）：长轮询 /data?wait= 或 SSE /events")
+    parser.add_argument("--wait", type=float, default=30.0, help="长轮询单次最长等待（秒）")
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread", help="本地服务端模式")
+    parser.add_argument("--max-connections", type=int, default=2000, help="本地服务端最大连接数")
+    parser.add_argument("--sim-interval", type=float, default=1.0, help="模拟器产生数据的间隔（秒）")
+    parser.add_argument("--sim-rate", type=float, default=0.0, help="模拟器速率（帧/秒），大于 0 时忽略 --sim-interval")
+    parser.add_argument("--password", default="", help="Web 认证密码（启用认证时）")
+    parser.add_argument("--no-keepalive", action="store_true", help="每次请求都新建连接")
+    parser.add_argument("--ramp", type=float, default=0.0, help="在多少秒内逐步启动所有客户端")
+    parser.add_argument("--url", help="压测已运行的A端，例如 http://192.168.1.20:8080")
+    parser.add_argument("--json", help="将结果保存为 JSON 文件")
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return run_server(args)
+    if not args.push:
+        push_paths = [p for p in args.paths.split(",") if p.split("?", 1)[0].strip() == "/events" or "wait=" in p]
+        if push_paths:
+            parser.error(f"推送接口 {', '.join(push_paths)} 请使用 --push sse / --push longpoll")
+
+    result = run_load(args)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
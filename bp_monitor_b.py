@@ -1,13 +1,52 @@
 import tkinter as tk
 from tkinter import font
-import requests
+import json
+import math
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+# 启动计时起点（尽量靠前，用于检查首条数据显示耗时）
+_LAUNCHED = time.perf_counter()
 
 # 配置
-IP = "  " # 接血压计的电脑的IP
+IP = "  " # 接血压计的电脑的IP（留空则在局域网中自动查找）
 DATA_URL = f"http://{IP}:8080/data"
-REFRESH_RATE = 1000  # 刷新频率 (毫秒)
+# 多站点看板：填写多个A端地址（"IP" 或 "IP:端口"，可写成 ("名称", "IP") 指定显示名称），
+# 也可以通过命令行传入：python bp_monitor_b.py 192.168.1.20 192.168.1.21
+STATIONS = []
+DASHBOARD_COLUMNS = 3  # 看板每行的站点数
+REFRESH_RATE = 1000  # 轮询间隔 (毫秒)，仅在A端不支持推送时使用
+LONG_POLL_TIMEOUT = 10  # 长轮询单次最长等待 (秒)，超时后立即发起下一次
+UI_POLL_MS = 50      # 界面检查后台结果的间隔 (毫秒)
+REQUEST_TIMEOUT = (1.0, 2.0)  # (连接超时, 读取超时) 秒，只影响后台线程，不会卡住界面
 AUTH_USERNAME = "user"   # 用户名任意
 AUTH_PASSWORD = "" # 网页认证密码
+STARTUP_BUDGET_MS = 300  # 启动到显示首条数据的预算 (毫秒)，超出时在控制台提示
+
+# 自动发现：IP 留空时广播探测A端，记住上次找到的地址，连续失败后自动重新查找（应对 DHCP 换 IP）
+AUTO_DISCOVERY = True
+DISCOVERY_PORT = 9031
+DISCOVERY_TIMEOUT = 1.5   # 单次探测等待回复的时间 (秒)
+REDISCOVER_AFTER = 3      # 连续失败多少次后重新探测
+STATION_CACHE_FILE = "bp_monitor_b_station.json"
+
+# 本地读数缓存：保存最近的读数用于趋势小图，断线时继续显示上次读数（标灰）
+CACHE_FILE = "bp_monitor_b_cache.json"
+CACHE_SIZE = 120          # 本地保留的最近读数条数
+SPARKLINE_POINTS = 40     # 趋势小图显示的读数条数
+STALE_MAX_SECONDS = 300   # 断线后继续显示上次读数的最长时间 (秒)，超过后显示 --
+
+# 组播接收（需A端开启 MULTICAST_ENABLED），开启后不再向A端发 HTTP 请求
+MULTICAST_ENABLED = False
+MULTICAST_GROUP = "239.255.90.30"
+MULTICAST_PORT = 9030
+MULTICAST_OFFLINE_AFTER = 6.0  # 超过该秒数收不到任何数据报（含心跳）视为A端离线
 
 # 颜色定义
 COLORS = {
@@ -16,24 +55,566 @@ COLORS = {
     'text': '#ffffff',      # 普通文本
     'success': '#4ecca3',   # 正常 (绿色)
     'warning': '#ffd369',   # 异常 (黄色)
-    'offline': '#ff6b6b'    # 断开 (红色)
+    'offline': '#ff6b6b',   # 断开 (红色)
+    'stale': '#6c7a96',     # 断线时的上次读数 (灰色)
+    'spark_sys': '#4ecca3', # 趋势小图：收缩压
+    'spark_dia': '#7fa7ff'  # 趋势小图：舒张压
 }
 
+class StationResponse:
+    """ StationClient.get 的结果：status_code / headers / json()，用法与 requests 相同 """
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+class StationClient:
+    """
+    基于标准库 http.client 的最小 HTTP 客户端（替代 requests，打包体积小、冷启动快）
+    对同一个A端复用一条持久连接；复用的连接已被A端关闭（空闲超时、A端重启）时自动重连重试一次
+    设置了密码时先 POST /login 换取会话令牌，之后的请求只带 Bearer 令牌（A端只需查一次缓存）；
+    令牌过期或A端重启后收到 401 时重新登录一次；A端为不支持 /login 的旧版本时退回 Basic 认证
+    http.client 在第一次请求时才导入，不拖慢窗口显示
+    """
+
+    def __init__(self, auth=None):
+        self.auth_header = None
+        if auth:
+            import base64
+            token = base64.b64encode(f"{auth[0]}:{auth[1]}".encode("utf-8")).decode("ascii")
+            self.auth_header = f"Basic {token}"
+        self._conn = None
+        self._address = None
+        self._session = None  # (A端地址, "Bearer <令牌>" 或旧版A端的 Basic 认证头)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._address = None
+
+    def get(self, url, params=None, headers=None, timeout=REQUEST_TIMEOUT):
+        """ timeout 为 (连接超时, 读取超时) 秒 """
+        from urllib.parse import urlencode, urlsplit
+
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        query = parts.query
+        if params:
+            query = f"{query}&{urlencode(params)}" if query else urlencode(params)
+        if query:
+            target = f"{target}?{query}"
+        request_headers = {"Accept": "application/json"}
+        if headers:
+            request_headers.update(headers)
+
+        address = (parts.hostname, parts.port or 80)
+        if self.auth_header is None:
+            return self._request(address, "GET", target, request_headers, timeout)
+        for attempt in range(2):
+            request_headers["Authorization"] = self._authorization(address, timeout)
+            resp = self._request(address, "GET", target, request_headers, timeout)
+            if resp.status_code != 401 or attempt:
+                return resp
+            # 令牌已失效（过期 / A端重启换了密钥）：重新登录后重试一次
+            self._session = None
+        return resp
+
+    def _authorization(self, address, timeout):
+        """ 返回该A端要用的认证头，没有会话时 POST /login 换取令牌 """
+        if self._session is not None and self._session[0] == address:
+            return self._session[1]
+        login_headers = {"Accept": "application/json", "Authorization": self.auth_header}
+        resp = self._request(address, "POST", "/login", login_headers, timeout, body=b"")
+        if resp.status_code == 200:
+            value = f"Bearer {resp.json()['token']}"
+        elif resp.status_code in (404, 405):
+            value = self.auth_header  # 旧版A端没有 /login
+        else:
+            # 密码错误等：仍用 Basic 认证发请求，由该请求返回 401 交给调用方处理
+            return self.auth_header
+        self._session = (address, value)
+        return value
+
+    def _request(self, address, method, target, request_headers, timeout, body=None):
+        import http.client
+
+        while True:
+            reused = self._conn is not None and self._address == address
+            if not reused:
+                self.close()
+                conn = http.client.HTTPConnection(address[0], address[1], timeout=timeout[0])
+                conn.connect()
+                self._conn, self._address = conn, address
+            try:
+                self._conn.sock.settimeout(timeout[1])
+                self._conn.request(method, target, body=body, headers=request_headers)
+                resp = self._conn.getresponse()
+                data = resp.read()
+            except (http.client.HTTPException, OSError) as e:
+                self.close()
+                if reused and not isinstance(e, (socket.timeout, TimeoutError)):
+                    # 旧连接已失效，换新连接重试
+                    continue
+                raise
+            if resp.will_close:
+                self.close()
+            return StationResponse(resp.status, resp.msg, data)
+
+
+class DataFetcher(threading.Thread):
+    """
+    后台抓取线程：复用一个 StationClient 持久连接（keep-alive），结果通过队列交给界面
+    优先使用A端的长轮询（/data?wait=<version>）：有新数据立即返回，没有数据时挂起不占流量；
+    A端为旧版本（返回的数据中没有 version）时退回按 REFRESH_RATE 轮询
+    每次请求都带上 If-None-Match，数据未变化时A端返回 304，不传输数据也不唤醒界面
+    传入 history=(boot, seq) 时同步读数历史（见 sync_history），结果以 "history" 放入队列
+    """
+
+    def __init__(self, url, auth, interval, result_queue, key=0, history=None):
+        super().__init__(daemon=True)
+        self.key = key  # 结果标识（多站点看板中为站点序号）
+        self.url = url
+        self.auth = auth
+        self.interval = interval
+        self.result_queue = result_queue
+        self.failures = 0  # 连续失败次数
+        self.history = history  # 已同步到的 (A端启动标识, reading_seq)，None 表示不同步
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def resolve_url(self):
+        """ 每次请求前调用，返回要请求的地址（子类可在此重新查找A端） """
+        return self.url
+
+    def run(self):
+        session = StationClient(self.auth)
+        version = None
+        etag = None
+        last_url = None
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            url = self.resolve_url()
+            if url != last_url:
+                # 换了A端地址，version / ETag 不再有效
+                version = None
+                etag = None
+                last_url = url
+            headers = {"If-None-Match": etag} if etag else {}
+            try:
+                if url is None:
+                    raise ConnectionError("未找到A端")
+                if version is None:
+                    resp = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+                else:
+                    resp = session.get(
+                        url,
+                        params={"wait": version, "timeout": LONG_POLL_TIMEOUT},
+                        headers=headers,
+                        timeout=(REQUEST_TIMEOUT[0], LONG_POLL_TIMEOUT + REQUEST_TIMEOUT[1]),
+                    )
+                self.failures = 0
+                if resp.status_code == 304:
+                    # 数据未变化：不放入队列
+                    if version is not None:
+                        continue
+                else:
+                    data = resp.json()
+                    etag = resp.headers.get("ETag")
+                    self.result_queue.put((self.key, "data", data))
+                    if self.history is not None:
+                        self.sync_history(session, url, data, etag)
+                    version = data.get("version")
+                    if version is not None:
+                        # 支持推送：立即挂起等待下一次变化
+                        continue
+            except Exception as e:
+                # 连接失败时丢弃旧连接，下次重新建立；离线后恢复要重新渲染，清空 ETag
+                session.close()
+                version = None
+                etag = None
+                self.failures += 1
+                self.result_queue.put((self.key, "error", e))
+
+            elapsed = time.monotonic() - started
+            self._stop_event.wait(max(0.0, self.interval - elapsed))
+        session.close()
+
+    def sync_history(self, session, url, data, etag):
+        """
+        新读数紧接上一条时直接取自 /data；刚启动、断线恢复或中间漏了读数时，
+        只向A端补取 /history?since=<seq> 之后的读数。A端重启（ETag 中的启动标识变化）时 seq 重新计数
+        """
+        seq = data.get("reading_seq")
+        if seq is None:
+            return  # 旧版A端，没有读数序号
+        boot, last_seq = self.history
+        current_boot = etag.strip('"').split("-")[0] if etag else None
+        if current_boot == boot and seq == last_seq:
+            return
+        if current_boot == boot and seq == last_seq + 1:
+            readings = [{"seq": seq, "sys": data.get("sys"), "dia": data.get("dia"),
+                         "pulse": data.get("pulse"), "timestamp": data.get("timestamp")}]
+        else:
+            params = {"since": last_seq}
+            if boot:
+                params["boot"] = boot
+            resp = session.get(station_history_url(url), params=params, timeout=REQUEST_TIMEOUT)
+            if resp.status_code != 200:
+                self.history = None  # A端不支持 /history，不再尝试
+                return
+            payload = resp.json()
+            boot, seq, readings = payload["boot"], payload["seq"], payload["readings"]
+            current_boot = boot
+        self.history = (current_boot, seq)
+        if readings:
+            self.result_queue.put((self.key, "history", {"boot": current_boot, "readings": readings}))
+
+
+class ReadingCache:
+    """
+    本地读数环形缓冲（最近 CACHE_SIZE 条），保存到 CACHE_FILE，重启后仍能立即显示上次读数与趋势
+    boot / seq 记录已同步到A端的哪一条读数，重连后只补取之后的读数
+    """
+
+    def __init__(self, path, size=CACHE_SIZE):
+        self.path = path
+        self.readings = deque(maxlen=size)
+        self.boot = None
+        self.seq = 0
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            self.readings.extend(cached["readings"])
+            self.boot = cached.get("boot")
+            self.seq = int(cached.get("seq", 0))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def save(self):
+        """ 先写临时文件再替换，程序中途退出也不会留下半个文件 """
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"boot": self.boot, "seq": self.seq, "readings": list(self.readings)},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def merge(self, boot, readings):
+        """ 合并A端的读数，返回是否有新读数 """
+        if boot != self.boot:
+            # A端重启或换了A端：序号重新计数，已缓存的读数保留
+            self.boot = boot
+            self.seq = 0
+        added = False
+        for entry in readings:
+            seq = entry.get("seq", 0)
+            if seq <= self.seq:
+                continue
+            self.readings.append({key: entry.get(key) for key in ("sys", "dia", "pulse", "timestamp")})
+            self.seq = seq
+            added = True
+        return added
+
+    def latest(self):
+        return self.readings[-1] if self.readings else None
+
+
+def app_dir():
+    """ 程序所在目录（兼容 PyInstaller 打包后的 exe） """
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def load_cached_station():
+    """ 读取上次找到的A端 (名称, 地址)，没有则返回 None """
+    try:
+        with open(os.path.join(app_dir(), STATION_CACHE_FILE), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        return cached["name"], cached["host"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_cached_station(name, host):
+    try:
+        with open(os.path.join(app_dir(), STATION_CACHE_FILE), "w", encoding="utf-8") as f:
+            json.dump({"name": name, "host": host}, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def discover_stations(timeout=DISCOVERY_TIMEOUT):
+    """
+    在局域网广播探测A端，返回 [(名称, "IP:端口"), ...]（按回复先后排序）
+    探测报文在等待期间每 0.5 秒重发一次，避免单个 UDP 包丢失
+    """
+    probe = json.dumps({"svc": "bp-monitor", "type": "probe"}).encode("utf-8")
+    found = []
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.bind(("", 0))
+        deadline = time.monotonic() + timeout
+        next_probe = 0.0
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now >= next_probe:
+                try:
+                    sock.sendto(probe, ("255.255.255.255", DISCOVERY_PORT))
+                except OSError:
+                    pass
+                next_probe = now + 0.5
+            sock.settimeout(max(0.01, min(deadline, next_probe) - now))
+            try:
+                payload, addr = sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            try:
+                message = json.loads(payload.decode("utf-8"))
+            except ValueError:
+                continue
+            if not isinstance(message, dict) or message.get("svc") != "bp-monitor" or message.get("type") != "announce":
+                continue
+            station = (str(message.get("name") or addr[0]), f"{addr[0]}:{int(message.get('port', 8080))}")
+            if station not in found:
+                found.append(station)
+            # 已收到回复，再稍等片刻收集其它A端即可
+            deadline = min(deadline, time.monotonic() + 0.2)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+    return found
+
+
+class DiscoveringFetcher(DataFetcher):
+    """ 自动发现模式：没有地址或连续失败 REDISCOVER_AFTER 次时重新探测A端 """
+
+    def __init__(self, auth, interval, result_queue, key=0, history=None):
+        cached = load_cached_station()
+        self.station_name = cached[0] if cached else None
+        super().__init__(station_data_url(cached[1]) if cached else None, auth, interval, result_queue, key, history)
+
+    def resolve_url(self):
+        if self.url is not None and self.failures < REDISCOVER_AFTER:
+            return self.url
+
+        found = discover_stations()
+        if found:
+            # 优先选择上次连接的主机名（DHCP 换 IP 后主机名通常不变）
+            name, host = next((st for st in found if st[0] == self.station_name), found[0])
+            self.station_name = name
+            self.url = station_data_url(host)
+            self.failures = 0
+            save_cached_station(name, host)
+        elif self.url is not None:
+            # 没找到就继续尝试旧地址，再失败几次后重新探测
+            self.failures = 0
+        return self.url
+
+
+class MulticastListener(threading.Thread):
+    """
+    组播接收线程：A端每次有新读数/状态变化都会发送一个数据报，另有定期心跳
+    数据报字段与 /data 相同，另含 type / seq / boot；seq 跳变说明中间有数据报丢失，
+    但每个数据报都带完整的最新数据，直接显示即可；seq 比已收到的小说明是乱序的旧数据报，丢弃
+    """
+
+    def __init__(self, group, port, result_queue):
+        super().__init__(daemon=True)
+        self.group = group
+        self.port = port
+        self.result_queue = result_queue
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _open_socket(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("", self.port))
+            membership = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton("0.0.0.0"))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+            sock.settimeout(0.5)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def run(self):
+        # 端口被占用、没有组播路由等：在界面上显示错误，每隔 MULTICAST_OFFLINE_AFTER 秒重试
+        while True:
+            try:
+                sock = self._open_socket()
+                break
+            except OSError as e:
+                self.result_queue.put((0, "error", e))
+                if self._stop_event.wait(MULTICAST_OFFLINE_AFTER):
+                    return
+
+        last_seq = None
+        last_boot = None
+        last_seen = time.monotonic()
+        offline = False
+        while not self._stop_event.is_set():
+            try:
+                payload = sock.recv(4096)
+            except socket.timeout:
+                if not offline and time.monotonic() - last_seen > MULTICAST_OFFLINE_AFTER:
+                    offline = True
+                    self.result_queue.put((0, "error", TimeoutError("未收到A端组播心跳")))
+                continue
+            except OSError as e:
+                self.result_queue.put((0, "error", e))
+                self._stop_event.wait(1.0)
+                continue
+
+            try:
+                message = json.loads(payload.decode("utf-8"))
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            if "status" not in message:
+                # A端刚启动、尚无数据时的心跳，只用于在线检测
+                last_seen = time.monotonic()
+                offline = False
+                continue
+            last_seen = time.monotonic()
+            seq = message.get("seq", 0)
+            if not isinstance(seq, int):
+                continue
+            if message.get("boot") != last_boot:
+                # A端重启，序号重新计数
+                last_boot = message.get("boot")
+                last_seq = None
+            elif last_seq is not None and seq < last_seq:
+                continue
+            # 心跳只在离线恢复或发现丢包时刷新界面
+            if message.get("type") != "heartbeat" or offline or seq != last_seq:
+                self.result_queue.put((0, "data", message))
+            if message.get("type") == "reading" and "reading_seq" in message:
+                # 组播无法补取历史，只记录收到的读数
+                reading = dict(message, seq=message["reading_seq"])
+                self.result_queue.put((0, "history", {"boot": message.get("boot"), "readings": [reading]}))
+            offline = False
+            last_seq = seq
+        sock.close()
+
+
+class WidgetCache:
+    """ 记录每个控件当前显示的内容，只有值真正变化时才调用 Tk（低配瘦客户端上减少重绘） """
+
+    def __init__(self):
+        self._state = {}
+
+    def config(self, widget, **options):
+        key = str(widget)
+        current = self._state.setdefault(key, {})
+        changed = {name: value for name, value in options.items() if current.get(name) != value}
+        if changed:
+            widget.config(**changed)
+            current.update(changed)
+
+    def set(self, var, value):
+        key = str(var)
+        if self._state.get(key) != value:
+            var.set(value)
+            self._state[key] = value
+
+
+def station_data_url(host):
+    """ "IP" 或 "IP:端口" -> /data 地址 """
+    host = host.strip()
+    if ":" not in host:
+        host = f"{host}:8080"
+    return f"http://{host}/data"
+
+
+def station_history_url(data_url):
+    """ /data 地址 -> 同一A端的 /history 地址 """
+    return data_url.rsplit("/", 1)[0] + "/history"
+
+
+def get_bp_color(value, bp_type):
+    """ 根据用户要求的逻辑返回颜色 """
+    if value is None:
+        return COLORS['text']
+        
+    val = int(value)
+    
+    if bp_type == 'sys':
+        if val < 90:
+            return COLORS['warning']
+        elif val < 140:
+            return COLORS['success']
+        else:
+            return COLORS['warning']
+    else: # dia
+        if val < 60:
+            return COLORS['warning']
+        elif val < 90:
+            return COLORS['success']
+        else:
+            return COLORS['warning']
+
+
 class BPMonitorApp:
-    def __init__(self, root):
+    def __init__(self, root, discover=False):
         self.root = root
         self.root.title("BP Monitor")
-        self.root.geometry("380x160") # 小巧的窗口尺寸
+        self.root.geometry("380x190") # 小巧的窗口尺寸
         self.root.configure(bg=COLORS['bg'])
         
         # --- 核心功能：窗口永远置顶 ---
         self.root.attributes('-topmost', True)
         
+        self.widgets = WidgetCache()
+        self.last_data = None
+        self.startup_ms = None  # 启动到显示首条数据的耗时
+        self.offline_since = None  # 本次断线开始的时间
+
+        # 本地读数缓存：启动时先显示上次的读数（标灰），连上后只补取缺失的读数
+        self.cache = ReadingCache(os.path.join(app_dir(), CACHE_FILE))
+        self.cache.load()
+        history = (self.cache.boot, self.cache.seq)
+
+        # 后台线程轮询数据，界面线程只从队列取结果
+        # 先启动后台线程再搭界面，连接A端与创建控件同时进行
+        self.result_queue = queue.Queue()
+        if MULTICAST_ENABLED:
+            self.fetcher = MulticastListener(MULTICAST_GROUP, MULTICAST_PORT, self.result_queue)
+        elif discover:
+            self.fetcher = DiscoveringFetcher((AUTH_USERNAME, AUTH_PASSWORD), REFRESH_RATE / 1000.0,
+                                              self.result_queue, history=history)
+        else:
+            self.fetcher = DataFetcher(DATA_URL, (AUTH_USERNAME, AUTH_PASSWORD), REFRESH_RATE / 1000.0,
+                                       self.result_queue, history=history)
+        self.fetcher.start()
+
         # 初始化UI布局
         self.setup_ui()
-        
-        # 开始轮询数据
-        self.update_data()
+        if self.cache.latest():
+            self.update_data(self.cache.latest(), stale=True)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.poll_results()
 
     def setup_ui(self):
         # 顶部状态栏
@@ -60,6 +641,13 @@ class BPMonitorApp:
         self.dia_label = self.create_value_card(grid_frame, 1, "DIA")
         self.pul_label = self.create_value_card(grid_frame, 2, "PULSE")
 
+        # 趋势小图：最近 SPARKLINE_POINTS 条读数的收缩压/舒张压
+        self.sparkline = tk.Canvas(self.root, height=26, bg=COLORS['bg'], highlightthickness=0)
+        self.sparkline.pack(fill='x', padx=14, pady=(0, 6))
+        self.spark_sys = self.sparkline.create_line(0, 0, 0, 0, fill=COLORS['spark_sys'], width=1.5)
+        self.spark_dia = self.sparkline.create_line(0, 0, 0, 0, fill=COLORS['spark_dia'], width=1.5)
+        self.sparkline.bind("<Configure>", lambda _event: self.draw_sparkline())
+
     def create_value_card(self, parent, col, title):
         frame = tk.Frame(parent, bg=COLORS['card_bg'], bd=0)
         frame.grid(row=0, column=col, sticky="nsew", padx=4, pady=4)
@@ -73,37 +661,45 @@ class BPMonitorApp:
         return lbl
 
     def get_bp_color(self, value, bp_type):
-        """ 根据用户要求的逻辑返回颜色 """
-        if value is None:
-            return COLORS['text']
-            
-        val = int(value)
-        
-        if bp_type == 'sys':
-            if val < 90:
-                return COLORS['warning']
-            elif val < 140:
-                return COLORS['success']
-            else:
-                return COLORS['warning']
-        else: # dia
-            if val < 60:
-                return COLORS['warning']
-            elif val < 90:
-                return COLORS['success']
+        return get_bp_color(value, bp_type)
+
+    def poll_results(self):
+        """ 取出后台线程的结果，只渲染最新的一条；读数历史全部并入本地缓存 """
+        latest = None
+        history_changed = False
+        try:
+            while True:
+                item = self.result_queue.get_nowait()
+                if item[1] == "history":
+                    history_changed |= self.cache.merge(item[2]["boot"], item[2]["readings"])
+                else:
+                    latest = item
+        except queue.Empty:
+            pass
+
+        if history_changed:
+            self.cache.save()
+            self.draw_sparkline()
+
+        if latest is not None:
+            _key, kind, payload = latest
+            if kind == "data":
+                self.offline_since = None
+                # 旧版A端不支持 304 时，内容相同的数据也直接跳过
+                if payload != self.last_data:
+                    self.last_data = payload
+                    self.update_data(payload)
+                    if self.startup_ms is None:
+                        self.report_startup()
             else:
-                return COLORS['warning']
+                self.last_data = None
+                self.show_offline()
 
-    def update_data(self):
+        self.root.after(UI_POLL_MS, self.poll_results)
+
+    def update_data(self, data, stale=False):
+        """ stale=True 时显示的是断线前/上次运行时的读数，数值标灰 """
         try:
-            # 发起请求
-            resp = requests.get(
-                DATA_URL,
-                auth=(AUTH_USERNAME, AUTH_PASSWORD),
-                timeout=1
-            )
-            data = resp.json()
-            
             # 解析数据
             sys_val = data.get("sys")
             dia_val = data.get("dia")
@@ -111,37 +707,205 @@ class BPMonitorApp:
             ts = data.get("timestamp")
             status = data.get("status")
 
-            # 1. 更新数值
-            self.sys_label.config(text=str(sys_val) if sys_val else "--")
-            self.dia_label.config(text=str(dia_val) if dia_val else "--")
-            self.pul_label.config(text=str(pul_val) if pul_val else "--")
-
-            # 2. 更新颜色
-            self.sys_label.config(fg=self.get_bp_color(sys_val, 'sys'))
-            self.dia_label.config(fg=self.get_bp_color(dia_val, 'dia'))
-            
+            # 1. 更新数值与颜色（WidgetCache 只在值变化时才真正调用 Tk）
             # 心率通常没有特定逻辑，暂定为白色，或您可以自己加
-            self.pul_label.config(fg=COLORS['success'] if pul_val else COLORS['text'])
+            self.widgets.config(self.sys_label, text=str(sys_val) if sys_val else "--",
+                                fg=COLORS['stale'] if stale else self.get_bp_color(sys_val, 'sys'))
+            self.widgets.config(self.dia_label, text=str(dia_val) if dia_val else "--",
+                                fg=COLORS['stale'] if stale else self.get_bp_color(dia_val, 'dia'))
+            self.widgets.config(self.pul_label, text=str(pul_val) if pul_val else "--",
+                                fg=COLORS['stale'] if stale else (COLORS['success'] if pul_val else COLORS['text']))
 
-            # 3. 更新顶部状态
-            self.status_var.set(f"状态: {status}")
+            # 2. 更新顶部状态
+            if not stale:
+                self.widgets.set(self.status_var, f"状态: {status}")
             if ts:
                 # 假设时间戳格式为 "YYYY-MM-DD HH:MM:SS"，只取后面时间
                 time_part = ts.split(" ")[1] if " " in ts else ts
-                self.time_var.set(time_part)
+                self.widgets.set(self.time_var, time_part)
             else:
-                self.time_var.set("--:--:--")
+                self.widgets.set(self.time_var, "--:--:--")
 
         except Exception as e:
-            self.status_var.set("连接断开")
-            self.sys_label.config(text="--", fg=COLORS['offline'])
-            self.dia_label.config(text="--", fg=COLORS['offline'])
-            self.pul_label.config(text="--", fg=COLORS['offline'])
-        
-        # 设定下一次刷新
-        self.root.after(REFRESH_RATE, self.update_data)
+            self.show_offline()
+
+    def report_startup(self):
+        """ 记录启动到首条数据显示的耗时，超出 STARTUP_BUDGET_MS 时提示（打包为窗口程序时无控制台，不影响使用） """
+        self.root.update_idletasks()
+        self.startup_ms = (time.perf_counter() - _LAUNCHED) * 1000
+        if self.startup_ms > STARTUP_BUDGET_MS:
+            print(f"首条数据显示耗时 {self.startup_ms:.0f} ms，超出预算 {STARTUP_BUDGET_MS} ms", file=sys.stderr)
+
+    def show_offline(self):
+        """ 短时间断线继续显示上次读数（标灰），超过 STALE_MAX_SECONDS 才清空为 -- """
+        now = time.monotonic()
+        if self.offline_since is None:
+            self.offline_since = now
+        last = self.cache.latest()
+        if last is not None and now - self.offline_since < STALE_MAX_SECONDS:
+            self.update_data(last, stale=True)
+            self.widgets.set(self.status_var, "连接断开 · 显示上次读数")
+            return
+        self.widgets.set(self.status_var, "连接断开")
+        for lbl in (self.sys_label, self.dia_label, self.pul_label):
+            self.widgets.config(lbl, text="--", fg=COLORS['offline'])
+
+    def draw_sparkline(self):
+        """ 只更新两条折线的坐标，不重建画布项目 """
+        points = [r for r in list(self.cache.readings)[-SPARKLINE_POINTS:]
+                  if r.get("sys") is not None and r.get("dia") is not None]
+        width = self.sparkline.winfo_width()
+        height = int(self.sparkline.cget("height"))
+        if len(points) < 2 or width < 10:
+            self.sparkline.coords(self.spark_sys, 0, 0, 0, 0)
+            self.sparkline.coords(self.spark_dia, 0, 0, 0, 0)
+            return
+        low = min(r["dia"] for r in points)
+        high = max(r["sys"] for r in points)
+        span = max(high - low, 1)
+        step = (width - 4) / (len(points) - 1)
+
+        def coords(field):
+            flat = []
+            for index, r in enumerate(points):
+                flat.append(2 + index * step)
+                flat.append(2 + (height - 4) * (high - r[field]) / span)
+            return flat
+
+        self.sparkline.coords(self.spark_sys, *coords("sys"))
+        self.sparkline.coords(self.spark_dia, *coords("dia"))
+
+    def on_close(self):
+        self.fetcher.stop()
+        self.root.destroy()
+
+class DashboardApp:
+    """ 多站点看板：每个A端一个后台线程独立抓取，某个站点断开不会拖慢其它站点 """
+
+    def __init__(self, root, stations):
+        self.root = root
+        self.root.title("BP Monitor - 多站点")
+        self.root.configure(bg=COLORS['bg'])
+        self.root.attributes('-topmost', True)
+
+        # stations: [(名称, 地址), ...]
+        self.stations = stations
+        self.tiles = []
+        self.widgets = WidgetCache()
+        self.setup_ui()
+
+        self.result_queue = queue.Queue()
+        self.fetchers = []
+        for key, (_name, host) in enumerate(self.stations):
+            fetcher = DataFetcher(station_data_url(host), (AUTH_USERNAME, AUTH_PASSWORD),
+                                  REFRESH_RATE / 1000.0, self.result_queue, key=key)
+            fetcher.start()
+            self.fetchers.append(fetcher)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.poll_results()
+
+    def setup_ui(self):
+        columns = min(DASHBOARD_COLUMNS, len(self.stations))
+        rows = math.ceil(len(self.stations) / columns)
+        self.root.geometry(f"{columns * 250}x{rows * 110 + 10}")
+
+        grid_frame = tk.Frame(self.root, bg=COLORS['bg'])
+        grid_frame.pack(expand=True, fill='both', padx=5, pady=5)
+        for col in range(columns):
+            grid_frame.columnconfigure(col, weight=1)
+
+        for index, (name, _host) in enumerate(self.stations):
+            self.tiles.append(self.create_station_tile(grid_frame, index // columns, index % columns, name))
+
+    def create_station_tile(self, parent, row, col, title):
+        frame = tk.Frame(parent, bg=COLORS['card_bg'], bd=0)
+        frame.grid(row=row, column=col, sticky="nsew", padx=4, pady=4)
+
+        # 标题行：在线状态点 + 站点名称 + 测量时间
+        header = tk.Frame(frame, bg=COLORS['card_bg'])
+        header.pack(fill='x', padx=8, pady=(6, 0))
+        dot = tk.Label(header, text="●", fg=COLORS['offline'], bg=COLORS['card_bg'], font=("Arial", 9))
+        dot.pack(side='left')
+        tk.Label(header, text=title, fg="#888888", bg=COLORS['card_bg'], font=("Arial", 9)).pack(side='left', padx=(4, 0))
+        time_lbl = tk.Label(header, text="--:--:--", fg="#888888", bg=COLORS['card_bg'], font=("Arial", 8))
+        time_lbl.pack(side='right')
+
+        # 数值行：SYS / DIA / PULSE
+        values = tk.Frame(frame, bg=COLORS['card_bg'])
+        values.pack(fill='both', expand=True, padx=4, pady=(0, 6))
+        labels = {}
+        for col_index, (key, text) in enumerate((("sys", "SYS"), ("dia", "DIA"), ("pulse", "PULSE"))):
+            values.columnconfigure(col_index, weight=1)
+            cell = tk.Frame(values, bg=COLORS['card_bg'])
+            cell.grid(row=0, column=col_index, sticky="nsew")
+            tk.Label(cell, text=text, fg="#888888", bg=COLORS['card_bg'], font=("Arial", 7)).pack()
+            lbl = tk.Label(cell, text="--", fg=COLORS['text'], bg=COLORS['card_bg'], font=("Arial", 20, "bold"))
+            lbl.pack()
+            labels[key] = lbl
+        return {"dot": dot, "time": time_lbl, **labels}
+
+    def poll_results(self):
+        """ 每个站点只渲染最新的一条结果 """
+        latest = {}
+        try:
+            while True:
+                key, kind, payload = self.result_queue.get_nowait()
+                latest[key] = (kind, payload)
+        except queue.Empty:
+            pass
+
+        for key, (kind, payload) in latest.items():
+            if kind == "data":
+                self.update_tile(self.tiles[key], payload)
+            else:
+                self.show_tile_offline(self.tiles[key])
+
+        self.root.after(UI_POLL_MS, self.poll_results)
+
+    def update_tile(self, tile, data):
+        sys_val = data.get("sys")
+        dia_val = data.get("dia")
+        pul_val = data.get("pulse")
+        ts = data.get("timestamp")
+
+        config = self.widgets.config
+        config(tile["sys"], text=str(sys_val) if sys_val else "--", fg=get_bp_color(sys_val, 'sys'))
+        config(tile["dia"], text=str(dia_val) if dia_val else "--", fg=get_bp_color(dia_val, 'dia'))
+        config(tile["pulse"], text=str(pul_val) if pul_val else "--",
+               fg=COLORS['success'] if pul_val else COLORS['text'])
+        config(tile["time"], text=ts.split(" ")[1] if ts and " " in ts else (ts or "--:--:--"))
+        config(tile["dot"], fg=COLORS['success'])
+
+    def show_tile_offline(self, tile):
+        self.widgets.config(tile["dot"], fg=COLORS['offline'])
+        for key in ("sys", "dia", "pulse"):
+            self.widgets.config(tile[key], text="--", fg=COLORS['offline'])
+
+    def on_close(self):
+        for fetcher in self.fetchers:
+            fetcher.stop()
+        self.root.destroy()
+
+
+def parse_stations(items):
+    """ STATIONS / 命令行参数 -> [(名称, 地址), ...] """
+    stations = []
+    for item in items:
+        if isinstance(item, (tuple, list)):
+            stations.append((str(item[0]), str(item[1])))
+        else:
+            stations.append((str(item), str(item)))
+    return stations
+
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = BPMonitorApp(root)
+    stations = parse_stations(sys.argv[1:] or STATIONS)
+    if len(stations) > 1:
+        app = DashboardApp(root, stations)
+    elif stations:
+        DATA_URL = station_data_url(stations[0][1])
+        app = BPMonitorApp(root)
+    else:
+        app = BPMonitorApp(root, discover=AUTO_DISCOVERY and not IP.strip())
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+OMRON HBP-9030 血压计数据监测程序
+
+子模块（按需导入，导入本包本身几乎不花时间）：
+    config           可修改的配置项
+    log              日志（setup_logging 由入口调用）
+    models           BloodPressureReading
+    parsing          DataParser
+    ingest           SerialConnection / Simulator（pyserial 按需导入）
+    bus              EventBus：读数 / 原始数据 / 状态的发布订阅，每个订阅者有界队列
+    storage          WebDataStore / HistoryStore
+    web, web_async   BPWebServer（async 模式才导入 asyncio）
+    broadcast        DiscoveryResponder / MulticastPublisher
+    metrics          METRICS
+    tracing          读数各阶段延迟追踪（/latency）
+    profiling        现场性能分析：全线程栈采样与 tracemalloc（/admin/profile）
+    gui              图形界面（tkinter）
+    headless         无界面模式
+    app              程序入口 main()
+    virtual_device   伪终端上的虚拟血压计（端到端测试，python -m bpmon.virtual_device）
+
+常用类也可直接从包中取得，如 bpmon.DataParser，第一次访问时才导入对应子模块。
+"""
+
+import importlib
+
+_EXPORTS = {
+    "BloodPressureReading": "models",
+    "DataParser": "parsing",
+    "SerialConnection": "ingest",
+    "Simulator": "ingest",
+    "serial_available": "ingest",
+    "EventBus": "bus",
+    "WebDataStore": "storage",
+    "HistoryStore": "storage",
+    "downsample_minmax": "storage",
+    "BPWebServer": "web",
+    "SessionTokenManager": "web",
+    "AsyncHTTPServer": "web_async",
+    "DiscoveryResponder": "broadcast",
+    "MulticastPublisher": "broadcast",
+    "MetricsRegistry": "metrics",
+    "METRICS": "metrics",
+    "PlatformConfig": "platform_config",
+    "get_platform": "platform_config",
+    "logger": "log",
+    "setup_logging": "log",
+    "get_app_dir": "config",
+    "HeadlessRunner": "headless",
+    "main": "app",
+    "VirtualHBP9030": "virtual_device",
+    "Profiler": "profiling",
+    "PROFILER": "profiling",
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        config = importlib.import_module(".config", __name__)
+        if name.isupper() and hasattr(config, name):
+            return getattr(config, name)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""python -m bpmon [--headless ...]"""
+
+from .app import main
+
+main()
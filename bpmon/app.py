@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+程序入口：解析命令行参数，启动图形界面或无界面模式
+各模块在这里按需导入：无界面模式不导入 tkinter，图形界面模式不导入无界面模式的代码
+"""
+
+from typing import List, Optional
+
+from . import config
+from .log import logger, setup_logging
+
+
+def _line_endings(value: str):
+    import argparse
+    from .ingest import parse_line_endings
+    try:
+        return parse_line_endings(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    """命令行参数；未指定的选项使用配置文件或 bpmon/config.py 中的默认值"""
+    import argparse
+    parser = argparse.ArgumentParser(description="OMRON HBP-9030 血压监测程序")
+    parser.add_argument("--headless", action="store_true", help="无界面运行（不导入 tkinter），适合树莓派采集端 / systemd")
+    parser.add_argument("--config", help="INI 配置文件，见 README「无界面模式」")
+    parser.add_argument("--serial-port", help="串口，如 COM3、/dev/ttyUSB0（不指定时使用第一个可用串口）")
+    parser.add_argument("--baudrate", type=int, help="波特率，默认 9600")
+    parser.add_argument("--simulate", action="store_true", help="使用模拟数据代替串口")
+    parser.add_argument("--sim-interval", type=float, help="模拟数据间隔（秒），默认 5")
+    parser.add_argument("--sim-rate", type=float, help="模拟数据速率（帧/秒，可达数千），指定时忽略 --sim-interval")
+    parser.add_argument("--sim-line-endings", type=_line_endings, help="模拟数据的行结束符，逗号分隔：crlf,cr,lf（多个时随机混用）")
+    parser.add_argument("--sim-max-chunk", type=int, help="把模拟字节流随机切成不超过该长度的分段（模拟串口分段到达）")
+    parser.add_argument("--sim-corrupt-ratio", type=float, help="模拟损坏帧的比例（0~1）")
+    parser.add_argument("--sim-devices", type=int, help="模拟的血压计（设备 ID）数量")
+    parser.add_argument("--web-host", help=f"Web 服务监听地址，默认 {config.WEB_SERVER_HOST}")
+    parser.add_argument("--web-port", type=int, help=f"Web 服务端口，默认 {config.WEB_SERVER_PORT}")
+    parser.add_argument("--web-mode", choices=("thread", "async"), help="Web 服务模式")
+    parser.add_argument("--max-connections", type=int, help="Web 最大并发连接数")
+    parser.add_argument("--web-password", help="启用 Web 认证并设置密码")
+    parser.add_argument("--no-web", action="store_true", help="不启动 Web 服务")
+    parser.add_argument("--multicast", action="store_true", help="开启组播广播")
+    parser.add_argument("--no-discovery", action="store_true", help="不响应B端的局域网自动发现")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    args = parse_args(argv)
+    setup_logging()
+    if args.headless:
+        from .headless import HeadlessRunner, load_settings
+        logger.info("启动 OMRON HBP-9030 血压监测程序（无界面模式）")
+        HeadlessRunner(load_settings(args)).run()
+        return
+
+    logger.info("启动 OMRON HBP-9030 血压监测程序")
+    from .gui import LoginDialog, BloodPressureMonitorGUI
+    from .ingest import serial_available
+    
+    # ========== 授权验证 ==========
+    login = LoginDialog()
+    if not login.run():
+        logger.info("用户取消授权或验证失败，程序退出")
+        return
+    
+    # ========== 启动主程序 ==========
+    # 检查环境
+    if not serial_available():
+        logger.warning("pyserial库未安装，将只能使用模拟模式")
+    
+    app = BloodPressureMonitorGUI()
+    app.run()
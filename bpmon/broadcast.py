@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""局域网自动发现与 UDP 组播广播"""
+
+import json
+import socket
+import threading
+import time
+from typing import Optional
+
+from .log import logger
+
+
+class DiscoveryResponder:
+    """
+    局域网自动发现应答（类似 mDNS 的轻量实现）
+    B端向 DISCOVERY_PORT 广播探测报文 {"svc": "bp-monitor", "type": "probe"}，
+    本机单播回复 {"svc": "bp-monitor", "type": "announce", "name": 主机名, "port": Web端口}；
+    B端以回复的源地址作为A端 IP，因此 DHCP 更换 IP 后重新探测即可找到
+    """
+
+    SERVICE = "bp-monitor"
+
+    def __init__(self, port: int, web_port: int):
+        self.port = port
+        self.web_port = web_port
+        self.name = socket.gethostname()
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> bool:
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("", self.port))
+            sock.settimeout(0.5)
+            self._sock = sock
+        except OSError as e:
+            logger.warning(f"自动发现应答启动失败（端口 {self.port}）: {e}")
+            return False
+
+        self._running = True
+        self._thread = threading.Thread(target=self._serve_loop, daemon=True)
+        self._thread.start()
+        logger.info(f"自动发现应答已启动: UDP {self.port}")
+        return True
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+    def _serve_loop(self):
+        reply = json.dumps({
+            "svc": self.SERVICE,
+            "type": "announce",
+            "v": 1,
+            "name": self.name,
+            "port": self.web_port,
+        }).encode("utf-8")
+        while self._running:
+            try:
+                payload, addr = self._sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            try:
+                message = json.loads(payload.decode("utf-8"))
+            except ValueError:
+                continue
+            if not isinstance(message, dict) or message.get("svc") != self.SERVICE or message.get("type") != "probe":
+                continue
+            try:
+                self._sock.sendto(reply, addr)
+            except OSError as e:
+                logger.debug(f"自动发现应答发送失败: {e}")
+
+
+# ============== UDP 组播广播（局域网零负载分发） ==============
+class MulticastPublisher:
+    """
+    将每个新读数与状态变化以 UDP 组播数据报发送到局域网
+    数据报为紧凑 JSON（UTF-8），字段：
+        v      协议版本（1）
+        type   "reading" / "status" / "heartbeat"
+        seq    序号，每条 reading/status 加 1，heartbeat 携带当前序号（不递增），接收端据此发现丢包
+        boot   发送端本次启动的标识，A端重启后 seq 从头计数，接收端据此重置
+        station 发送端主机名
+        sys/dia/pulse/timestamp/status  与 /data 接口字段相同
+    heartbeat 定期发送，接收端可区分"暂无新数据"与"A端离线"
+    """
+
+    PROTOCOL_VERSION = 1
+
+    def __init__(self, group: str, port: int, ttl: int = 1, heartbeat_interval: float = 2.0):
+        self.group = group
+        self.port = port
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.station = socket.gethostname()
+        self.boot = int(time.time())
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._last_snapshot: dict = {}
+        self._sock: Optional[socket.socket] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """创建组播套接字并启动心跳线程"""
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.ttl)
+            sock.setblocking(False)
+            self._sock = sock
+        except OSError as e:
+            logger.warning(f"组播发布启动失败: {e}")
+            return False
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self._thread.start()
+        logger.info(f"组播发布已启动: {self.group}:{self.port}")
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+    def on_store_change(self, event: str, snapshot: dict):
+        """WebDataStore 监听回调：event 为 "reading" 或 "status" """
+        # 加锁发送，保证心跳不会带着旧序号/旧数据插到新数据之后
+        with self._seq_lock:
+            self._seq += 1
+            self._last_snapshot = snapshot
+            self._send(event, self._seq, snapshot)
+
+    def _heartbeat_loop(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            with self._seq_lock:
+                self._send("heartbeat", self._seq, self._last_snapshot)
+
+    def _send(self, msg_type: str, seq: int, snapshot: dict):
+        sock = self._sock
+        if sock is None:
+            return
+        message = {"v": self.PROTOCOL_VERSION, "type": msg_type, "seq": seq,
+                   "boot": self.boot, "station": self.station}
+        message.update(snapshot)
+        payload = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        try:
+            sock.sendto(payload, (self.group, self.port))
+        except OSError as e:
+            # 网络暂时不可用（如网线拔出）时不影响主流程
+            logger.debug(f"组播发送失败: {e}")
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+进程内事件总线：数据源（串口 / 模拟器）只负责 publish，界面、WebDataStore、读数历史等消费者各自订阅，
+每个订阅者有自己的有界队列和投递线程，慢的消费者不会拖住串口读取线程，也不会拖住其它订阅者
+
+主题：
+    reading   BloodPressureReading
+    raw       串口收到的原始字节（bytes）
+    status    状态文字（str）
+
+队列满时的处理（overflow）：
+    drop_oldest   丢弃最旧的事件（默认，适合只关心最新数据的显示类消费者）
+    block         发布者等待队列有空位（会拖慢数据源，只用于不能丢数据且足够快的消费者）
+
+batch=True 的订阅者一次取走队列中全部事件，连续的同一主题合并为一个列表调用一次处理函数，
+适合写文件等每次调用开销大、积压时合并处理更快的消费者（与 block 搭配时发布者最多等一批）
+
+指标（/metrics，按订阅者）：
+    bp_bus_queue_depth          队列中等待投递的事件数
+    bp_bus_lag_seconds          最旧的未投递事件已等待的秒数
+    bp_bus_delivery_seconds     事件从发布到开始投递的耗时（直方图）
+    bp_bus_dropped_total        因队列满被丢弃的事件数
+    bp_bus_events_total         发布的事件数（按主题）
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from . import config
+from .log import logger
+from .metrics import METRICS
+
+TOPICS = ("reading", "raw", "status")
+OVERFLOW_POLICIES = ("drop_oldest", "block")
+DROP_LOG_INTERVAL = 10.0  # 持续丢弃事件时，每个订阅者最多每隔多少秒记录一次警告日志
+
+# 所有投递中的订阅（各总线共用，供指标采集）
+_LIVE: Dict[int, "Subscription"] = {}
+
+
+class Subscription:
+    """
+    一个订阅者：有界队列 + 投递线程，按发布顺序调用 handlers[主题](数据)
+    batch 为 True 时调用 handlers[主题]([数据, ...])
+    """
+
+    def __init__(self, name: str, handlers: Dict[str, Callable[[object], None]],
+                 maxsize: int = None, overflow: str = None, batch: bool = False):
+        unknown = set(handlers) - set(TOPICS)
+        if unknown:
+            raise ValueError(f"未知的主题: {', '.join(sorted(unknown))}（可选 {' / '.join(TOPICS)}）")
+        overflow = overflow or config.BUS_OVERFLOW_POLICY
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"未知的队列满处理方式: {overflow}（可选 {' / '.join(OVERFLOW_POLICIES)}）")
+        self.name = name
+        self.handlers = dict(handlers)
+        self.maxsize = max(1, maxsize or config.BUS_QUEUE_SIZE)
+        self.overflow = overflow
+        self.batch = batch
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self._labels = (("subscriber", name),)
+        self._events: deque = deque()  # (主题, 数据, 发布时的 time.perf_counter())
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+        self._drop_logged_at: Optional[float] = None
+        self.thread = threading.Thread(target=self._run, name=f"bus-{name}", daemon=True)
+
+    @property
+    def depth(self) -> int:
+        return len(self._events)
+
+    def lag(self) -> float:
+        """最旧的未投递事件已等待的秒数，队列为空时为 0"""
+        try:
+            published_at = self._events[0][2]
+        except IndexError:
+            return 0.0
+        return max(0.0, time.perf_counter() - published_at)
+
+    def put(self, topic: str, payload, published_at: float):
+        """发布者线程调用"""
+        dropped = False
+        with self._lock:
+            if self._closed:
+                return
+            if len(self._events) >= self.maxsize:
+                if self.overflow == "block":
+                    self._not_full.wait_for(lambda: len(self._events) < self.maxsize or self._closed)
+                    if self._closed:
+                        return
+                else:
+                    self._events.popleft()
+                    self.dropped += 1
+                    dropped = True
+            self._events.append((topic, payload, published_at))
+            self._not_empty.notify()
+        if dropped:
+            METRICS.inc("bp_bus_dropped_total", labels=self._labels)
+            now = time.monotonic()
+            if self._drop_logged_at is None or now - self._drop_logged_at >= DROP_LOG_INTERVAL:
+                self._drop_logged_at = now
+                logger.warning(f"事件总线订阅者 {self.name} 处理过慢，队列已满（{self.maxsize}），"
+                               f"累计丢弃 {self.dropped} 个事件")
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._not_empty.wait_for(lambda: self._events or self._closed)
+                if not self._events:
+                    return
+                if self.batch:
+                    events, self._events = self._events, deque()
+                    self._not_full.notify_all()
+                else:
+                    events = (self._events.popleft(),)
+                    self._not_full.notify()
+            now = time.perf_counter()
+            for _, _, published_at in events:
+                METRICS.observe("bp_bus_delivery_seconds", now - published_at, self._labels)
+            if self.batch:
+                self._deliver_batches(events)
+            else:
+                topic, payload, _ = events[0]
+                self._deliver(topic, payload, 1)
+
+    def _deliver_batches(self, events):
+        """连续的同一主题合并为一次调用"""
+        topic, payloads = None, []
+        for event_topic, payload, _ in events:
+            if event_topic != topic and payloads:
+                self._deliver(topic, payloads, len(payloads))
+                payloads = []
+            topic = event_topic
+            payloads.append(payload)
+        if payloads:
+            self._deliver(topic, payloads, len(payloads))
+
+    def _deliver(self, topic: str, payload, count: int):
+        try:
+            self.handlers[topic](payload)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"事件总线订阅者 {self.name} 处理 {topic} 出错: {e}", exc_info=True)
+        self.delivered += count
+
+    def close(self, drain: bool = True):
+        """停止投递；drain 为 True 时先投递完队列中剩余的事件"""
+        with self._lock:
+            self._closed = True
+            if not drain:
+                self._events.clear()
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "lag": round(self.lag(), 6),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "maxsize": self.maxsize,
+            "overflow": self.overflow,
+            "batch": self.batch,
+        }
+
+
+class EventBus:
+    """
+    发布 / 订阅：publish 只把事件放入各订阅者的队列，不在发布者线程调用任何处理函数
+    订阅者列表是不可变元组，订阅 / 退订时整体替换，publish 不加锁
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Tuple[Subscription, ...] = ()
+
+    def subscribe(self, name: str, handlers: Dict[str, Callable[[object], None]],
+                  maxsize: int = None, overflow: str = None, batch: bool = False) -> Subscription:
+        """
+        订阅 handlers 中的主题，如 {"reading": on_reading, "status": on_status}
+        maxsize / overflow 默认为 BUS_QUEUE_SIZE / BUS_OVERFLOW_POLICY；batch 见模块说明
+        """
+        subscription = Subscription(name, handlers, maxsize, overflow, batch)
+        subscription.thread.start()
+        with self._lock:
+            self._subscribers = self._subscribers + (subscription,)
+        _LIVE[id(subscription)] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, drain: bool = False):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+        subscription.close(drain)
+        _LIVE.pop(id(subscription), None)
+
+    def publish(self, topic: str, payload):
+        published_at = time.perf_counter()
+        METRICS.inc("bp_bus_events_total", labels=(("topic", topic),))
+        for subscription in self._subscribers:
+            if topic in subscription.handlers:
+                subscription.put(topic, payload, published_at)
+
+    def stats(self) -> Dict[str, dict]:
+        """{订阅者: {"depth", "lag", "delivered", "dropped", "errors", "maxsize", "overflow", "batch"}}"""
+        return {subscription.name: subscription.stats() for subscription in self._subscribers}
+
+    def close(self, timeout: float = 2.0):
+        """退订全部订阅者，等待各自投递完剩余事件（最多 timeout 秒）"""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, ()
+        deadline = time.monotonic() + timeout
+        for subscription in subscribers:
+            subscription.close()
+        for subscription in subscribers:
+            subscription.thread.join(max(0.0, deadline - time.monotonic()))
+            _LIVE.pop(id(subscription), None)
+
+
+def _per_subscriber(value: Callable[[Subscription], float]) -> Callable[[], Optional[dict]]:
+    return lambda: {(("subscriber", s.name),): value(s) for s in list(_LIVE.values())} or None
+
+
+METRICS.gauge("bp_bus_queue_depth", "事件总线各订阅者队列中等待投递的事件数", _per_subscriber(lambda s: s.depth))
+METRICS.gauge("bp_bus_lag_seconds", "事件总线各订阅者最旧的未投递事件已等待的秒数",
+              _per_subscriber(lambda s: round(s.lag(), 6)))
+METRICS.histogram("bp_bus_delivery_seconds", "事件从发布到开始投递的耗时（按订阅者）")
+METRICS.counter("bp_bus_dropped_total", "事件总线因订阅者队列满而丢弃的事件数（按订阅者）")
+METRICS.counter("bp_bus_events_total", "事件总线发布的事件数（按主题）")
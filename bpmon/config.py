@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+可修改的配置项（原 bp_monitor.py 顶部的常量）
+其它模块通过 config.XXX 读取，运行时修改（如无界面模式的命令行参数）对之后的读取立即生效
+"""
+
+import os
+import sys
+
+
+def get_app_dir() -> str:
+    """程序所在目录（日志、历史数据等文件保存在这里），处理打包后的路径问题"""
+    if getattr(sys, 'frozen', False):
+        # 打包后的exe
+        return os.path.dirname(sys.executable)
+    # 普通Python脚本：bpmon 包的上一级目录（bp_monitor.py 所在目录）
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ============== Web 服务 ==============
+WEB_SERVER_ENABLED = True
+WEB_SERVER_HOST = "0.0.0.0"
+WEB_SERVER_PORT = 8080
+# Web 服务模式：
+#   "thread" - 标准库 ThreadingHTTPServer（每个连接一个线程，适合少量客户端）
+#   "async"  - asyncio 事件循环（单线程处理所有连接，适合大量轮询客户端/树莓派）
+WEB_SERVER_MODE = "thread"
+WEB_MAX_CONNECTIONS = 600       # 最大并发连接数，超出时直接返回 503
+WEB_KEEPALIVE_TIMEOUT = 15.0    # HTTP/1.1 keep-alive 空闲连接超时（秒）
+
+WEB_AUTH_ENABLED = False
+WEB_AUTH_PASSWORD = ""
+WEB_SESSION_TTL = 12 * 3600        # 会话令牌有效期（秒）
+WEB_SESSION_COOKIE = "bp_session"  # 会话 Cookie 名称
+
+# UDP 组播广播：每个新读数/状态变化发送一个数据报，接收端数量不影响A端负载
+MULTICAST_ENABLED = False
+MULTICAST_GROUP = "239.255.90.30"
+MULTICAST_PORT = 9030
+MULTICAST_TTL = 1                # 1 = 仅本网段
+MULTICAST_HEARTBEAT = 2.0        # 心跳间隔（秒）
+
+# 局域网自动发现：B端广播探测，A端回复自己的 Web 端口（B端无需手动填写 IP）
+DISCOVERY_ENABLED = True
+DISCOVERY_PORT = 9031
+
+# 推送接口：/data?wait=<version> 长轮询、/events（Server-Sent Events）
+WEB_LONG_POLL_MAX = 60.0         # 长轮询最长等待（秒）
+WEB_SSE_PING_INTERVAL = 15.0     # SSE 空闲时的保活注释间隔（秒）
+WEB_HISTORY_SIZE = 500           # /history 保留的最近读数条数（B端断线恢复后补齐缺失的读数）
+
+# 读数各阶段延迟（串口读到字节 -> 解析 -> 显示 / Web 客户端）的摘要写入日志的间隔（秒），0 = 不写
+# 随时可通过 GET /latency（JSON）或 /metrics 查看
+LATENCY_LOG_INTERVAL = 60.0
+
+# ============== 读数历史 ==============
+HISTORY_FILE = "bp_history.csv"  # 读数历史文件（保存在程序目录，每行：时间,收缩压,舒张压,脉搏）
+
+# ============== 模拟器 ==============
+# 模拟器生成与血压计相同的 HBP-9030 数据帧，经与串口相同的分帧/解析流程处理
+SIM_LINE_ENDINGS = (b"\r\n",)  # 行结束符，多个时每帧随机选用（可含 b"\r\n" / b"\r" / b"\n"）
+SIM_MAX_CHUNK = 0              # >0 时把字节流随机切成不超过该长度的分段（模拟串口分多次读到）
+SIM_CORRUPT_RATIO = 0.0        # 损坏帧比例（0~1）
+SIM_DEVICE_COUNT = 1           # 模拟的血压计（设备 ID）数量
+
+# ============== 事件总线 ==============
+# 串口 / 模拟器把读数、原始数据、状态发布到事件总线，界面、Web 数据等订阅者各自有有界队列和投递线程
+BUS_QUEUE_SIZE = 1000               # 每个订阅者的队列长度
+BUS_OVERFLOW_POLICY = "drop_oldest"  # 队列满时：drop_oldest 丢弃最旧的事件 / block 等待（会拖慢串口读取）
+
+# ============== 性能分析（管理员） ==============
+# 现场排查卡顿：通过 /admin/profile 或界面日志区右键菜单，在固定时间窗口内对所有线程栈采样并跟踪内存分配，
+# 结果文件保存在 bp_monitor.log 旁；管理员密码为空时禁用
+ADMIN_PASSWORD = ""
+PROFILE_DEFAULT_SECONDS = 30.0   # 默认窗口（秒）
+PROFILE_MAX_SECONDS = 600.0      # 最长窗口（秒）
+PROFILE_SAMPLE_INTERVAL = 0.005  # 栈采样间隔（秒）
+PROFILE_TRACEMALLOC_FRAMES = 10  # tracemalloc 每个分配保留的栈帧数
+PROFILE_REPORT_LINES = 40        # CPU 报告每种排序列出的函数数
+PROFILE_TOP_ALLOCATIONS = 30     # 内存报告列出的分配位置数
+
+# ============== 无界面模式 ==============
+SERIAL_RETRY_INTERVAL = 5.0  # 串口未连接或读取出错后重新连接的间隔（秒）
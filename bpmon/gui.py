@@ -0,0 +1,1487 @@
+# -*- coding: utf-8 -*-
+"""
+图形界面（主窗口、趋势图、日志面板、登录对话框）
+由 bpmon.app.main() 在图形模式下导入；无界面模式（--headless）不会导入本模块，也不会导入 tkinter
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox, simpledialog
+import threading
+import time
+import os
+import queue
+from datetime import datetime
+from typing import Optional, List, Tuple
+
+from . import config, tracing
+from .broadcast import DiscoveryResponder, MulticastPublisher
+from .bus import EventBus
+from .ingest import SerialConnection, Simulator, serial_available
+from .log import logger
+from .metrics import METRICS
+from .models import BloodPressureReading
+from .platform_config import get_platform
+from .storage import HistoryStore, WebDataStore, downsample_minmax
+from .web import BPWebServer
+
+# 全局平台配置
+PLATFORM = get_platform()
+
+
+# ============== 图形界面 ==============
+def format_raw_log_line(data: bytes, now: datetime = None) -> str:
+    """原始数据 -> 日志行（hex | ascii），在串口线程中调用，不占用界面线程"""
+    timestamp = (now or datetime.now()).strftime('%H:%M:%S')
+    return f"[{timestamp}] 收到: {data.hex()} | {data.decode('ascii', errors='replace')}\n"
+
+
+class LogPanel:
+    """
+    日志文本框的批量写入：日志行先放入缓冲，每帧 flush 一次，只调用一次 insert / see
+    用行计数代替 index('end-1c') 解析来判断是否需要裁剪
+    """
+
+    def __init__(self, text_widget: tk.Text, max_lines: int = 500, trim_lines: int = 100):
+        self.text = text_widget
+        self.max_lines = max_lines
+        self.trim_lines = trim_lines
+        self.line_count = 0
+        self._pending: List[str] = []
+
+    def append(self, line: str):
+        """line 须以换行结尾"""
+        self._pending.append(line)
+
+    def flush(self):
+        if not self._pending:
+            return
+        lines = self._pending
+        self._pending = []
+        if len(lines) > self.max_lines:
+            # 一帧内的日志超过上限时，前面的行写入后也会立即被裁掉，直接丢弃
+            lines = lines[-self.max_lines:]
+        chunk = "".join(lines)
+        self.text.insert(tk.END, chunk)
+        self.line_count += chunk.count("\n")
+        if self.line_count > self.max_lines:
+            # 一次删到 max_lines - trim_lines 行，避免每帧都做删除
+            excess = self.line_count - (self.max_lines - self.trim_lines)
+            self.text.delete('1.0', f'{excess + 1}.0')
+            self.line_count -= excess
+        self.text.see(tk.END)
+
+
+class TrendChart:
+    """
+    SYS/DIA/PR 趋势图（Tk Canvas）
+    - 跟随模式下新读数只追加一小段线段，不重画整张图；超出右边界或纵轴范围时才整体重画
+    - 可见范围内点数多于画布宽度时做 min/max 分桶降采样（downsample_minmax）
+    - 滚轮缩放、左键拖动平移，双击回到跟随最新读数
+    """
+
+    DEFAULT_SPAN = 8 * 3600       # 默认显示时长（秒）
+    MIN_SPAN = 10 * 60
+    MAX_SPAN = 2 * 365 * 86400
+    Y_RANGE = (40, 200)           # 默认纵轴范围 (mmHg / bpm)，数据超出时自动扩展
+    GRID_VALUES = (60, 90, 120, 140, 180)
+    MARGIN_LEFT = 34
+    MARGIN_BOTTOM = 16
+    MARGIN_TOP = 6
+
+    def __init__(self, parent, store: HistoryStore, colors: dict, height: int = 180):
+        self.store = store
+        self.colors = colors
+        self.canvas = tk.Canvas(parent, height=height, bg=colors['bg_dark'], highlightthickness=0)
+        self.series = (
+            ("sys", store.sys, colors['accent_light']),
+            ("dia", store.dia, colors['success']),
+            ("pulse", store.pulse, colors['text_secondary']),
+        )
+        self.follow = True
+        self.span = float(self.DEFAULT_SPAN)
+        self.view_end = time.time()
+        self.y_range = self.Y_RANGE
+        self.downsampled = False
+        self._last_points = {}          # 跟随模式：每条折线最后一个点的画布坐标
+        self._redraw_scheduled = False
+        self._drag_x = None
+
+        self.canvas.bind('<Configure>', lambda e: self.schedule_redraw())
+        self.canvas.bind('<MouseWheel>', self._on_wheel)
+        self.canvas.bind('<Button-4>', self._on_wheel)
+        self.canvas.bind('<Button-5>', self._on_wheel)
+        self.canvas.bind('<ButtonPress-1>', self._on_drag_start)
+        self.canvas.bind('<B1-Motion>', self._on_drag)
+        self.canvas.bind('<Double-Button-1>', lambda e: self.reset_view())
+
+    # ---------- 坐标换算 ----------
+    @property
+    def view_start(self) -> float:
+        return self.view_end - self.span
+
+    def _plot_area(self) -> Tuple[int, int, int, int]:
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(self.canvas.winfo_height(), 1)
+        return self.MARGIN_LEFT, self.MARGIN_TOP, width - 4, height - self.MARGIN_BOTTOM
+
+    def _to_canvas(self, t: float, value: float) -> Tuple[float, float]:
+        left, top, right, bottom = self._plot_area()
+        y_low, y_high = self.y_range
+        x = left + (t - self.view_start) / self.span * (right - left)
+        y = bottom - (value - y_low) / (y_high - y_low) * (bottom - top)
+        return x, y
+
+    # ---------- 视图控制 ----------
+    def reset_view(self):
+        """回到跟随模式：显示最近 DEFAULT_SPAN 的数据"""
+        self.follow = True
+        self.span = float(self.DEFAULT_SPAN)
+        latest = self.store.times[-1] if self.store.times else time.time()
+        self.view_end = max(latest, time.time()) + self.span * 0.05
+        self.schedule_redraw()
+
+    def _on_wheel(self, event):
+        if getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0:
+            factor = 0.8
+        else:
+            factor = 1.25
+        left, _top, right, _bottom = self._plot_area()
+        # 以鼠标所在时间点为中心缩放
+        ratio = min(max((event.x - left) / max(right - left, 1), 0.0), 1.0)
+        anchor = self.view_start + ratio * self.span
+        self.span = min(max(self.span * factor, self.MIN_SPAN), self.MAX_SPAN)
+        self.view_end = anchor + (1 - ratio) * self.span
+        self.follow = False
+        self.schedule_redraw()
+        return "break"
+
+    def _on_drag_start(self, event):
+        self._drag_x = event.x
+
+    def _on_drag(self, event):
+        if self._drag_x is None:
+            return
+        left, _top, right, _bottom = self._plot_area()
+        self.view_end -= (event.x - self._drag_x) / max(right - left, 1) * self.span
+        self._drag_x = event.x
+        self.follow = False
+        self.schedule_redraw()
+
+    # ---------- 绘制 ----------
+    def schedule_redraw(self):
+        """合并同一帧内的多次重画请求（拖动、缩放、窗口尺寸变化）"""
+        if not self._redraw_scheduled:
+            self._redraw_scheduled = True
+            self.canvas.after_idle(self.redraw)
+
+    def redraw(self):
+        self._redraw_scheduled = False
+        if not self.canvas.winfo_ismapped():
+            return
+        self.store.load()
+        canvas = self.canvas
+        canvas.delete('all')
+        left, top, right, bottom = self._plot_area()
+        lo, hi = self.store.range_indexes(self.view_start, self.view_end)
+
+        # 纵轴：默认范围，可见数据超出时扩展
+        y_low, y_high = self.Y_RANGE
+        for _name, values, _color in self.series:
+            if hi > lo:
+                y_low = min(y_low, min(values[lo:hi]) - 5)
+                y_high = max(y_high, max(values[lo:hi]) + 5)
+        self.y_range = (y_low, y_high)
+
+        for value in self.GRID_VALUES:
+            _x, y = self._to_canvas(self.view_start, value)
+            canvas.create_line(left, y, right, y, fill=self.colors['bg_light'])
+            canvas.create_text(left - 4, y, text=str(value), anchor='e',
+                               fill=self.colors['text_secondary'], font=PLATFORM.get_font(7))
+        time_format = '%m-%d %H:%M' if self.span > 86400 else '%H:%M'
+        for t, anchor in ((self.view_start, 'w'), (self.view_end, 'e')):
+            canvas.create_text(left if anchor == 'w' else right, bottom + 2, anchor='n' + anchor,
+                               text=datetime.fromtimestamp(t).strftime(time_format),
+                               fill=self.colors['text_secondary'], font=PLATFORM.get_font(7))
+
+        buckets = max(right - left, 1)
+        self.downsampled = hi - lo > buckets * 2
+        self._last_points = {}
+        for name, values, color in self.series:
+            points = downsample_minmax(self.store.times, values, lo, hi,
+                                       self.view_start, self.view_end, buckets)
+            coords = []
+            for t, value in points:
+                coords.extend(self._to_canvas(t, value))
+            if len(points) >= 2:
+                canvas.create_line(*coords, fill=color, width=1.5, tags=(name,))
+            elif points:
+                x, y = coords
+                canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill=color, outline=color, tags=(name,))
+            if points:
+                self._last_points[name] = (coords[-2], coords[-1])
+
+    def append_latest(self):
+        """store 中新增了最新一条读数后调用"""
+        if not self.store.loaded or not self.canvas.winfo_ismapped():
+            return
+        t = self.store.times[-1]
+        if not self.follow:
+            # 回看历史时不移动视图，新读数在视图范围内才需要重画
+            if self.view_start <= t <= self.view_end:
+                self.schedule_redraw()
+            return
+        values = {name: values[-1] for name, values, _color in self.series}
+        y_low, y_high = self.y_range
+        if (t > self.view_end or self.downsampled or not self._last_points
+                or any(not y_low <= v <= y_high for v in values.values())):
+            if t > self.view_end:
+                # 右侧预留一段，之后的读数可继续增量追加
+                self.view_end = t + self.span * 0.25
+            self.schedule_redraw()
+            return
+        for name, _values, color in self.series:
+            x, y = self._to_canvas(t, values[name])
+            last = self._last_points.get(name)
+            if last:
+                self.canvas.create_line(last[0], last[1], x, y, fill=color, width=1.5, tags=(name,))
+            self._last_points[name] = (x, y)
+
+
+class BloodPressureMonitorGUI:
+    """血压监测图形界面"""
+    
+    # 颜色主题
+    COLORS = {
+        'bg_dark': '#1a1a2e',
+        'bg_medium': '#16213e',
+        'bg_light': '#0f3460',
+        'accent': '#e94560',
+        'accent_light': '#ff6b6b',
+        'text_primary': '#ffffff',
+        'text_secondary': '#a0a0a0',
+        'success': '#4ecca3',
+        'warning': '#ffd369',
+        'danger': '#ff6b6b',
+        'simulation': '#9d4edd',
+    }
+
+    # 数据队列：后台线程放入数据后通过 <<DataQueued>> 虚拟事件唤醒界面，不再定时空转轮询
+    QUEUE_FRAME_BUDGET = 0.008      # 每次处理队列最多占用界面线程的时间（秒），超出则让出后继续
+    QUEUE_SAFETY_POLL_MS = 1000     # 兜底轮询间隔（毫秒），防止唤醒事件丢失
+    QUEUE_FALLBACK_POLL_MS = 100    # Tcl 不支持多线程时退回的轮询间隔（毫秒）
+    
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.title("邵逸夫医院大运河 OMRON HBP-9030 血压监测")
+        self.root.geometry(PLATFORM.window_size)
+        self.root.configure(bg=self.COLORS['bg_dark'])
+        self.root.resizable(True, True)
+        self.root.minsize(*PLATFORM.window_min)
+        
+        # 树莓派默认全屏
+        if PLATFORM.fullscreen:
+            self.root.attributes('-fullscreen', True)
+            # 按Escape退出全屏
+            self.root.bind('<Escape>', lambda e: self.root.attributes('-fullscreen', False))
+        
+        # 数据
+        self.readings: List[BloodPressureReading] = []
+        self.data_queue = queue.Queue()
+        self._drain_pending = threading.Event()  # 已请求界面处理队列、尚未开始处理
+        self._log_flush_scheduled = False
+        self._closing = False
+        self.simulation_mode = False
+        self.connection_expanded = tk.BooleanVar(value=False)
+        self.history_expanded = tk.BooleanVar(value=False)
+        self.web_data_store = WebDataStore()
+        self.history_store = HistoryStore(os.path.join(config.get_app_dir(), config.HISTORY_FILE))
+        self.web_server: Optional[BPWebServer] = None
+        self.multicast: Optional[MulticastPublisher] = None
+        self.discovery: Optional[DiscoveryResponder] = None
+        METRICS.gauge("bp_data_queue_depth", "GUI 数据队列中等待处理的消息数", self.data_queue.qsize)
+        
+        # 事件总线：串口读取线程只发布事件，放入界面队列在总线的投递线程进行；
+        # 原始数据单独订阅，高速率时丢弃的是最旧的原始数据日志，不会挤掉读数；
+        # Web 数据单独订阅，HTTP / SSE / 组播客户端不用等界面线程处理队列
+        self.bus = EventBus()
+        self.bus.subscribe("web", {"reading": self.web_data_store.update_reading,
+                                   "status": self.web_data_store.set_status})
+        # 读数历史文件与无界面模式相同：不丢读数（队列满时等待），积压的读数合并为一次写入，不在界面线程做文件 I/O
+        self.bus.subscribe("history", {"reading": self._persist_history}, overflow="block", batch=True)
+        self.bus.subscribe("gui", {"reading": self._on_data_received, "status": self._on_status_change})
+        self.bus.subscribe("gui-raw", {"raw": self._on_raw_data})
+
+        # 串口连接
+        self.serial_conn = SerialConnection(bus=self.bus)
+        
+        # 模拟器
+        self.simulator = Simulator(bus=self.bus)
+        
+        # 创建界面
+        self._create_styles()
+        self._create_widgets()
+
+        # 启动 Web 服务（院内网其它电脑可访问）
+        if config.WEB_SERVER_ENABLED:
+            self.web_server = BPWebServer(self.web_data_store, config.WEB_SERVER_HOST, config.WEB_SERVER_PORT)
+            if self.web_server.start() and config.DISCOVERY_ENABLED:
+                self.discovery = DiscoveryResponder(config.DISCOVERY_PORT, self.web_server.server_port)
+                self.discovery.start()
+
+        # 组播广播（可选）
+        if config.MULTICAST_ENABLED:
+            self.multicast = MulticastPublisher(config.MULTICAST_GROUP, config.MULTICAST_PORT, config.MULTICAST_TTL, config.MULTICAST_HEARTBEAT)
+            if self.multicast.start():
+                self.web_data_store.add_listener(self.multicast.on_store_change)
+        
+        # 更新串口列表
+        self._refresh_ports()
+        
+        # 显示平台信息
+        self._log(f"运行平台: {PLATFORM}")
+        
+        # 检查pyserial是否可用
+        if not serial_available():
+            self._log("警告: pyserial库未安装，仅可使用模拟模式")
+            self._log("安装命令: pip install pyserial")
+        
+        # 队列唤醒：多线程版 Tcl 才能从后台线程安全地 event_generate
+        self._threaded_tk = bool(int(self.root.tk.eval('info exists tcl_platform(threaded)')))
+        self.root.bind('<<DataQueued>>', lambda e: self._process_queue())
+        self._queue_safety_poll()
+
+        # 定时把各阶段延迟摘要写入日志
+        self._latency_logged_count = 0
+        if config.LATENCY_LOG_INTERVAL > 0:
+            self.root.after(int(config.LATENCY_LOG_INTERVAL * 1000), self._log_latency)
+        
+        # 绑定关闭事件
+        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+    
+    def _create_styles(self):
+        """创建自定义样式"""
+        style = ttk.Style()
+        style.theme_use('clam')
+        
+        style.configure('Custom.TCombobox',
+                       fieldbackground=self.COLORS['bg_light'],
+                       background=self.COLORS['bg_light'],
+                       foreground=self.COLORS['text_primary'])
+    
+    def _create_widgets(self):
+        """创建界面组件"""
+        # 树莓派使用更紧凑的边距
+        pad = 10 if PLATFORM.is_raspberry_pi else 20
+        
+        # ========== 主界面滚动容器（Canvas + Scrollbar）==========
+        outer_frame = tk.Frame(self.root, bg=self.COLORS['bg_dark'])
+        outer_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.main_canvas = tk.Canvas(
+            outer_frame,
+            bg=self.COLORS['bg_dark'],
+            highlightthickness=0
+        )
+        self.main_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.main_scrollbar = tk.Scrollbar(
+            outer_frame,
+            orient=tk.VERTICAL,
+            command=self.main_canvas.yview
+        )
+        self.main_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.main_canvas.configure(yscrollcommand=self.main_scrollbar.set)
+        
+        content_frame = tk.Frame(self.main_canvas, bg=self.COLORS['bg_dark'])
+        content_frame.configure(padx=pad, pady=pad)
+        self.content_frame = content_frame
+        
+        self.main_canvas_window = self.main_canvas.create_window(
+            (0, 0),
+            window=content_frame,
+            anchor='nw'
+        )
+        
+        def _on_frame_configure(_event):
+            self.main_canvas.configure(scrollregion=self.main_canvas.bbox('all'))
+        
+        def _on_canvas_configure(event):
+            # 让内部Frame宽度始终跟随Canvas宽度
+            self.main_canvas.itemconfigure(self.main_canvas_window, width=event.width)
+        
+        content_frame.bind('<Configure>', _on_frame_configure)
+        self.main_canvas.bind('<Configure>', _on_canvas_configure)
+        
+        # 绑定滚轮（Windows / Linux）
+        # 说明：对 Text/Listbox/Combobox 等组件，优先让组件自身处理滚动；
+        #       其余情况滚动主界面。
+        self.root.bind_all('<MouseWheel>', self._on_main_mousewheel, add='+')
+        self.root.bind_all('<Button-4>', self._on_main_mousewheel, add='+')
+        self.root.bind_all('<Button-5>', self._on_main_mousewheel, add='+')
+        
+        # 默认显示最顶端
+        self.root.after_idle(lambda: self.main_canvas.yview_moveto(0.0))
+        
+        # 标题
+        title_label = tk.Label(
+            content_frame,
+            text="邵逸夫医院大运河",
+            font=PLATFORM.get_font(15, 'bold'),
+            fg=self.COLORS['text_primary'],
+            bg=self.COLORS['bg_dark']
+        )
+        title_label.pack(pady=(0, pad))
+        
+        
+        # 血压显示区
+        self._create_display_frame(content_frame)
+
+        # 连接摘要区（折叠控制区）
+        self._create_connection_summary(content_frame)
+        self._create_connection_frame(content_frame)
+        
+        # 历史记录摘要区（折叠历史记录）
+        self._create_history_summary(content_frame)
+        self._create_history_frame(content_frame)
+
+        # 趋势图（折叠）
+        self._create_trend_frame(content_frame)
+        
+        # 日志区
+        self._create_log_frame(content_frame)
+
+    def _on_main_mousewheel(self, event):
+        """主界面滚轮滚动（Canvas 容器）"""
+        # 让Text/Listbox/Combobox/Entry等控件保留自己的滚动/交互
+        if isinstance(event.widget, (tk.Text, tk.Listbox, ttk.Combobox, tk.Entry)):
+            return None
+        
+        if not hasattr(self, 'main_canvas'):
+            return None
+        
+        # Linux: Button-4/5
+        if getattr(event, 'num', None) == 4:
+            self.main_canvas.yview_scroll(-1, 'units')
+            return "break"
+        if getattr(event, 'num', None) == 5:
+            self.main_canvas.yview_scroll(1, 'units')
+            return "break"
+        
+        # Windows: MouseWheel
+        delta = getattr(event, 'delta', 0)
+        if delta:
+            self.main_canvas.yview_scroll(int(-1 * (delta / 120)), 'units')
+            return "break"
+        
+        return None
+    
+    def _create_connection_summary(self, parent):
+        """创建连接摘要区（仅显示状态点与连接按钮）"""
+        frame = tk.Frame(parent, bg=self.COLORS['bg_dark'])
+        frame.pack(fill=tk.X, pady=(0, 10))
+        self.connection_summary_frame = frame
+              
+        self.summary_connect_btn = tk.Button(
+            frame,
+            text="连接",
+            font=PLATFORM.get_font(9),
+            bg=self.COLORS['success'],
+            fg=self.COLORS['text_primary'],
+            activebackground=self.COLORS['accent'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            width=6,
+            command=self._toggle_connection
+        )
+        self.summary_connect_btn.pack(side=tk.RIGHT)
+        
+        self.summary_indicator = tk.Canvas(
+            frame,
+            width=10,
+            height=10,
+            bg=self.COLORS['bg_dark'],
+            highlightthickness=0
+        )
+        self.summary_indicator.pack(side=tk.RIGHT, padx=(0, 6))
+        self.summary_indicator.create_oval(2, 2, 8, 8, fill=self.COLORS['danger'], outline='')
+
+        self.toggle_connection_btn = tk.Button(
+            frame,
+            text="▶ 显示连接设置",
+            font=PLATFORM.get_font(9),
+            bg=self.COLORS['bg_dark'],
+            fg=self.COLORS['text_secondary'],
+            activebackground=self.COLORS['bg_dark'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            command=self._toggle_connection_panel
+        )
+        self.toggle_connection_btn.pack(side=tk.LEFT)
+    
+    def _create_connection_frame(self, parent):
+        """创建连接控制区"""
+        frame = tk.Frame(parent, bg=self.COLORS['bg_medium'], padx=15, pady=15)
+        self.connection_frame = frame
+        
+        # 第一行：端口和波特率选择
+        port_frame = tk.Frame(frame, bg=self.COLORS['bg_medium'])
+        port_frame.pack(fill=tk.X)
+        
+        tk.Label(
+            port_frame,
+            text="串口:",
+            font=PLATFORM.get_font(11),
+            fg=self.COLORS['text_primary'],
+            bg=self.COLORS['bg_medium']
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.port_var = tk.StringVar()
+        self.port_combo = ttk.Combobox(
+            port_frame,
+            textvariable=self.port_var,
+            state='readonly',
+            width=15,
+            font=PLATFORM.get_mono_font(10)
+        )
+        self.port_combo.pack(side=tk.LEFT, padx=(0, 10))
+        
+        refresh_btn = tk.Button(
+            port_frame,
+            text="刷新",
+            font=PLATFORM.get_font(10),
+            bg=self.COLORS['bg_light'],
+            fg=self.COLORS['text_primary'],
+            activebackground=self.COLORS['accent'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            command=self._refresh_ports
+        )
+        refresh_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        tk.Label(
+            port_frame,
+            text="波特率:",
+            font=PLATFORM.get_font(11),
+            fg=self.COLORS['text_primary'],
+            bg=self.COLORS['bg_medium']
+        ).pack(side=tk.LEFT, padx=(20, 10))
+        
+        self.baudrate_var = tk.StringVar(value='9600')
+        baudrate_combo = ttk.Combobox(
+            port_frame,
+            textvariable=self.baudrate_var,
+            values=['9600', '19200', '38400', '57600', '115200'],
+            state='readonly',
+            width=10,
+            font=PLATFORM.get_mono_font(10)
+        )
+        baudrate_combo.pack(side=tk.LEFT, padx=(0, 20))
+        
+        # 连接按钮
+        self.connect_btn = tk.Button(
+            port_frame,
+            text="连接",
+            font=PLATFORM.get_font(11, 'bold'),
+            bg=self.COLORS['success'],
+            fg=self.COLORS['text_primary'],
+            activebackground=self.COLORS['accent'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            width=8,
+            command=self._toggle_connection
+        )
+        self.connect_btn.pack(side=tk.LEFT)
+        
+        # 第二行：模拟模式和状态
+        mode_frame = tk.Frame(frame, bg=self.COLORS['bg_medium'])
+        mode_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        # 模拟模式按钮
+        self.sim_btn = tk.Button(
+            mode_frame,
+            text="启动模拟模式",
+            font=PLATFORM.get_font(10),
+            bg=self.COLORS['simulation'],
+            fg=self.COLORS['text_primary'],
+            activebackground=self.COLORS['accent'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            command=self._toggle_simulation
+        )
+        self.sim_btn.pack(side=tk.LEFT, padx=(0, 15))
+        
+        # 模拟间隔
+        tk.Label(
+            mode_frame,
+            text="间隔(秒):",
+            font=PLATFORM.get_font(10),
+            fg=self.COLORS['text_secondary'],
+            bg=self.COLORS['bg_medium']
+        ).pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.sim_interval_var = tk.StringVar(value='5')
+        sim_interval_entry = tk.Entry(
+            mode_frame,
+            textvariable=self.sim_interval_var,
+            width=5,
+            font=PLATFORM.get_mono_font(10),
+            bg=self.COLORS['bg_light'],
+            fg=self.COLORS['text_primary'],
+            insertbackground=self.COLORS['text_primary'],
+            relief=tk.FLAT
+        )
+        sim_interval_entry.pack(side=tk.LEFT, padx=(0, 20))
+        
+        # 状态指示器
+        self.status_indicator = tk.Canvas(
+            mode_frame,
+            width=12,
+            height=12,
+            bg=self.COLORS['bg_medium'],
+            highlightthickness=0
+        )
+        self.status_indicator.pack(side=tk.LEFT)
+        self.status_indicator.create_oval(2, 2, 10, 10, fill=self.COLORS['danger'], outline='')
+        
+        self.status_label = tk.Label(
+            mode_frame,
+            text="未连接",
+            font=PLATFORM.get_font(10),
+            fg=self.COLORS['text_secondary'],
+            bg=self.COLORS['bg_medium']
+        )
+        self.status_label.pack(side=tk.LEFT, padx=(8, 0))
+    
+    def _toggle_connection_panel(self):
+        """切换连接控制区显示"""
+        if self.connection_expanded.get():
+            self.connection_frame.pack_forget()
+            self.toggle_connection_btn.config(text="▶ 显示连接设置")
+            self.connection_expanded.set(False)
+        else:
+            self.connection_frame.pack(
+                fill=tk.X,
+                pady=(0, 15),
+                before=self.history_summary_frame
+            )
+            self.toggle_connection_btn.config(text="▼ 隐藏连接设置")
+            self.connection_expanded.set(True)
+    
+    def _create_display_frame(self, parent):
+        """创建血压显示区"""
+        frame = tk.Frame(parent, bg=self.COLORS['bg_medium'], padx=20, pady=15)
+        frame.pack(fill=tk.X, pady=(0, 15))
+        
+        display_container = tk.Frame(frame, bg=self.COLORS['bg_medium'])
+        display_container.pack(fill=tk.X)
+        
+        display_container.columnconfigure(0, weight=1)
+        display_container.columnconfigure(1, weight=1)
+        display_container.columnconfigure(2, weight=1)
+        
+        # 收缩压
+        sys_frame = tk.Frame(display_container, bg=self.COLORS['bg_medium'])
+        sys_frame.grid(row=0, column=0, sticky='nsew', padx=10)
+        
+        # tk.Label(
+        #     sys_frame,
+        #     text="收缩压",
+        #     font=PLATFORM.get_font(12),
+        #     fg=self.COLORS['text_secondary'],
+        #     bg=self.COLORS['bg_medium']
+        # ).pack()
+        
+        self.sys_value = tk.Label(
+            sys_frame,
+            text="---",
+            font=PLATFORM.get_font(40, 'bold'),
+            fg=self.COLORS['accent'],
+            bg=self.COLORS['bg_medium']
+        )
+        self.sys_value.pack()
+        
+        # tk.Label(
+        #     sys_frame,
+        #     text="mmHg",
+        #     font=PLATFORM.get_font(12),
+        #     fg=self.COLORS['text_secondary'],
+        #     bg=self.COLORS['bg_medium']
+        # ).pack()
+        
+        # 舒张压
+        dia_frame = tk.Frame(display_container, bg=self.COLORS['bg_medium'])
+        dia_frame.grid(row=0, column=1, sticky='nsew', padx=10)
+        
+        # tk.Label(
+        #     dia_frame,
+        #     text="舒张压",
+        #     font=PLATFORM.get_font(12),
+        #     fg=self.COLORS['text_secondary'],
+        #     bg=self.COLORS['bg_medium']
+        # ).pack()
+        
+        self.dia_value = tk.Label(
+            dia_frame,
+            text="---",
+            font=PLATFORM.get_font(40, 'bold'),
+            fg=self.COLORS['accent_light'],
+            bg=self.COLORS['bg_medium']
+        )
+        self.dia_value.pack()
+        
+        # tk.Label(
+        #     dia_frame,
+        #     text="mmHg",
+        #     font=PLATFORM.get_font(12),
+        #     fg=self.COLORS['text_secondary'],
+        #     bg=self.COLORS['bg_medium']
+        # ).pack()
+        
+        # 心率
+        pr_frame = tk.Frame(display_container, bg=self.COLORS['bg_medium'])
+        pr_frame.grid(row=0, column=2, sticky='nsew', padx=10)
+        
+        # tk.Label(
+        #     pr_frame,
+        #     text="心率",
+        #     font=PLATFORM.get_font(12),
+        #     fg=self.COLORS['text_secondary'],
+        #     bg=self.COLORS['bg_medium']
+        # ).pack()
+        
+        self.pr_value = tk.Label(
+            pr_frame,
+            text="---",
+            font=PLATFORM.get_font(40, 'bold'),
+            fg=self.COLORS['success'],
+            bg=self.COLORS['bg_medium']
+        )
+        self.pr_value.pack()
+        
+        # tk.Label(
+        #     pr_frame,
+        #     text="bpm",
+        #     font=PLATFORM.get_font(12),
+        #     fg=self.COLORS['text_secondary'],
+        #     bg=self.COLORS['bg_medium']
+        # ).pack()
+        
+        self.update_time_label = tk.Label(
+            frame,
+            text="等待测量数据...",
+            font=PLATFORM.get_font(10),
+            fg=self.COLORS['text_secondary'],
+            bg=self.COLORS['bg_medium']
+        )
+        self.update_time_label.pack(pady=(10, 0))
+    
+    def _create_history_frame(self, parent):
+        """创建历史记录区"""
+        frame = tk.Frame(parent, bg=self.COLORS['bg_medium'], padx=10, pady=6)
+        self.history_frame = frame
+        
+        list_frame = tk.Frame(frame, bg=self.COLORS['bg_dark'])
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        
+        self.history_listbox = tk.Listbox(
+            list_frame,
+            font=PLATFORM.get_mono_font(11),
+            bg=self.COLORS['bg_dark'],
+            fg=self.COLORS['text_primary'],
+            selectbackground=self.COLORS['accent'],
+            selectforeground=self.COLORS['text_primary'],
+            highlightthickness=0,
+            relief=tk.FLAT,
+            yscrollcommand=scrollbar.set,
+            height=5
+        )
+        self.history_listbox.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.history_listbox.yview)
+    
+    def _create_history_summary(self, parent):
+        """创建历史记录摘要区（仅显示清空按钮）"""
+        frame = tk.Frame(parent, bg=self.COLORS['bg_dark'])
+        frame.pack(fill=tk.X)
+        self.history_summary_frame = frame
+        
+        self.clear_history_btn = tk.Button(
+            frame,
+            text="清空",
+            font=PLATFORM.get_font(9),
+            bg=self.COLORS['bg_light'],
+            fg=self.COLORS['text_secondary'],
+            activebackground=self.COLORS['danger'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            width=6,
+            command=self._clear_history
+        )
+        self.clear_history_btn.pack(side=tk.RIGHT)
+        
+        self.toggle_history_btn = tk.Button(
+            frame,
+            text="▶ 显示历史记录",
+            font=PLATFORM.get_font(9),
+            bg=self.COLORS['bg_dark'],
+            fg=self.COLORS['text_secondary'],
+            activebackground=self.COLORS['bg_dark'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            command=self._toggle_history
+        )
+        self.toggle_history_btn.pack(side=tk.LEFT)
+    
+    def _create_trend_frame(self, parent):
+        """创建趋势图区（展开时才读取历史文件并绘制）"""
+        self.trend_expanded = tk.BooleanVar(value=False)
+
+        toggle_frame = tk.Frame(parent, bg=self.COLORS['bg_dark'])
+        toggle_frame.pack(fill=tk.X)
+        self.trend_toggle_frame = toggle_frame
+
+        self.toggle_trend_btn = tk.Button(
+            toggle_frame,
+            text="▶ 显示趋势图",
+            font=PLATFORM.get_font(9),
+            bg=self.COLORS['bg_dark'],
+            fg=self.COLORS['text_secondary'],
+            activebackground=self.COLORS['bg_dark'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            command=self._toggle_trend
+        )
+        self.toggle_trend_btn.pack(side=tk.LEFT)
+
+        tk.Label(
+            toggle_frame,
+            text="滚轮缩放 · 拖动平移 · 双击回到最新",
+            font=PLATFORM.get_font(8),
+            fg=self.COLORS['text_secondary'],
+            bg=self.COLORS['bg_dark']
+        ).pack(side=tk.RIGHT)
+
+        self.trend_frame = tk.Frame(parent, bg=self.COLORS['bg_medium'], padx=6, pady=6)
+        self.trend_chart = TrendChart(self.trend_frame, self.history_store, self.COLORS)
+        self.trend_chart.canvas.pack(fill=tk.BOTH, expand=True)
+
+    def _toggle_trend(self):
+        """切换趋势图显示"""
+        if self.trend_expanded.get():
+            self.trend_frame.pack_forget()
+            self.toggle_trend_btn.config(text="▶ 显示趋势图")
+            self.trend_expanded.set(False)
+        else:
+            self.trend_frame.pack(fill=tk.X, pady=(0, 15), before=self.log_toggle_frame)
+            self.toggle_trend_btn.config(text="▼ 隐藏趋势图")
+            self.trend_expanded.set(True)
+            self.trend_chart.reset_view()
+
+    def _create_log_frame(self, parent):
+        """创建日志区"""
+        self.log_expanded = tk.BooleanVar(value=False)
+        
+        toggle_frame = tk.Frame(parent, bg=self.COLORS['bg_dark'])
+        toggle_frame.pack(fill=tk.X)
+        self.log_toggle_frame = toggle_frame
+        
+        self.toggle_log_btn = tk.Button(
+            toggle_frame,
+            text="▶ 显示数据日志",
+            font=PLATFORM.get_font(9),
+            bg=self.COLORS['bg_dark'],
+            fg=self.COLORS['text_secondary'],
+            activebackground=self.COLORS['bg_dark'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            command=self._toggle_log
+        )
+        self.toggle_log_btn.pack(side=tk.LEFT)
+        
+        self.log_frame = tk.Frame(parent, bg=self.COLORS['bg_dark'])
+        
+        log_scrollbar = tk.Scrollbar(self.log_frame)
+        log_scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        
+        self.log_text = tk.Text(
+            self.log_frame,
+            font=PLATFORM.get_mono_font(9),
+            bg=self.COLORS['bg_dark'],
+            fg=self.COLORS['text_secondary'],
+            height=6,
+            wrap=tk.WORD,
+            highlightthickness=0,
+            relief=tk.FLAT,
+            yscrollcommand=log_scrollbar.set
+        )
+        self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        log_scrollbar.config(command=self.log_text.yview)
+        self.log_panel = LogPanel(self.log_text)
+
+        # 右键菜单：现场性能分析（管理员，见 profiling.py）
+        self.log_menu = tk.Menu(self.log_text, tearoff=0)
+        self.log_menu.add_command(label="开始性能分析…", command=self._start_profiling)
+        self.log_menu.add_command(label="停止性能分析", command=self._stop_profiling)
+        self.log_text.bind('<Button-3>', self._show_log_menu)
+        self._profile_polling = False
+
+    def _show_log_menu(self, event):
+        from .profiling import PROFILER
+        running = PROFILER.status()["running"]
+        enabled = PROFILER.enabled()
+        self.log_menu.entryconfig(0, state=tk.NORMAL if enabled and not running else tk.DISABLED)
+        self.log_menu.entryconfig(1, state=tk.NORMAL if enabled and running else tk.DISABLED)
+        self.log_menu.tk_popup(event.x_root, event.y_root)
+
+    def _ask_admin_password(self) -> bool:
+        from .profiling import PROFILER
+        password = simpledialog.askstring("管理员", "请输入管理员密码：", show='●', parent=self.root)
+        if password is None:
+            return False
+        if not PROFILER.check_password(password):
+            messagebox.showerror("授权失败", "管理员密码错误")
+            return False
+        return True
+
+    def _start_profiling(self):
+        """在固定时间窗口内采样调用栈并跟踪内存分配，结果写入 bp_monitor.log 所在目录"""
+        from .profiling import PROFILER
+        if not self._ask_admin_password():
+            return
+        seconds = simpledialog.askfloat(
+            "性能分析", "分析时长（秒）：", parent=self.root,
+            initialvalue=config.PROFILE_DEFAULT_SECONDS, minvalue=1.0, maxvalue=config.PROFILE_MAX_SECONDS)
+        if seconds is None:
+            return
+        if not PROFILER.start(seconds):
+            messagebox.showwarning("警告", "性能分析已在进行中")
+            return
+        self._log(f"[性能分析] 开始，时长 {seconds:g} 秒")
+        if not self._profile_polling:
+            self._profile_polling = True
+            self.root.after(1000, self._poll_profiling)
+
+    def _stop_profiling(self):
+        from .profiling import PROFILER
+        if self._ask_admin_password() and PROFILER.stop():
+            # 只通知分析线程，结果文件写完后由 _poll_profiling 写入日志
+            self._log("[性能分析] 已请求提前结束，正在写出结果")
+
+    def _poll_profiling(self):
+        """窗口结束后把结果文件写入日志"""
+        from .profiling import PROFILER
+        status = PROFILER.status()
+        if status["running"]:
+            self.root.after(1000, self._poll_profiling)
+            return
+        self._profile_polling = False
+        if status.get("error"):
+            self._log(f"[性能分析] 出错: {status['error']}")
+        for path in status["files"]:
+            self._log(f"[性能分析] 结果已保存: {path}")
+    
+    def _toggle_log(self):
+        """切换日志显示"""
+        if self.log_expanded.get():
+            self.log_frame.pack_forget()
+            self.toggle_log_btn.config(text="▶ 显示数据日志")
+            self.log_expanded.set(False)
+        else:
+            self.log_frame.pack(fill=tk.X, pady=(5, 0))
+            self.toggle_log_btn.config(text="▼ 隐藏数据日志")
+            self.log_expanded.set(True)
+    
+    def _toggle_history(self):
+        """切换历史记录显示"""
+        if self.history_expanded.get():
+            self.history_frame.pack_forget()
+            self.toggle_history_btn.config(text="▶ 显示历史记录")
+            self.history_expanded.set(False)
+        else:
+            self.history_frame.pack(
+                fill=tk.BOTH,
+                expand=True,
+                pady=(0, 15),
+                before=self.trend_toggle_frame
+            )
+            self.toggle_history_btn.config(text="▼ 隐藏历史记录")
+            self.history_expanded.set(True)
+    
+    def _refresh_ports(self):
+        """刷新串口列表"""
+        ports = SerialConnection.get_port_info()
+        port_names = [p[0] for p in ports]
+        
+        self.port_combo['values'] = port_names
+        if port_names:
+            # 默认优先选择 COM3
+            default_port = 'COM3'
+            if default_port in port_names:
+                self.port_combo.set(default_port)
+            else:
+                self.port_combo.current(0)
+        
+        if ports:
+            self._log(f"检测到 {len(ports)} 个串口:")
+            for port, desc in ports:
+                self._log(f"  {port}: {desc}")
+        else:
+            self._log("未检测到串口设备")
+            if not serial_available():
+                self._log("提示: pyserial未安装，请使用模拟模式测试")
+    
+    def _toggle_connection(self):
+        """切换连接状态"""
+        if self.simulation_mode:
+            messagebox.showwarning("警告", "请先停止模拟模式")
+            return
+            
+        if self.serial_conn.is_connected:
+            self.serial_conn.disconnect()
+            self._update_connection_ui(False)
+        else:
+            port = self.port_var.get()
+            baudrate = int(self.baudrate_var.get())
+            
+            if not port:
+                messagebox.showwarning("警告", "请选择串口\n\n如果没有检测到串口，请：\n1. 检查USB线是否连接\n2. 检查设备管理器中是否有新的COM端口\n3. 可以先使用「模拟模式」测试程序")
+                return
+            
+            if self.serial_conn.connect(port, baudrate):
+                self._update_connection_ui(True)
+            else:
+                messagebox.showerror("连接失败", f"无法连接到 {port}\n\n可能的原因：\n1. 端口被其他程序占用\n2. 设备未正确连接\n3. 需要安装驱动程序")
+    
+    def _toggle_simulation(self):
+        """切换模拟模式"""
+        if self.serial_conn.is_connected:
+            messagebox.showwarning("警告", "请先断开串口连接")
+            return
+            
+        if self.simulation_mode:
+            self.simulator.stop()
+            self.simulation_mode = False
+            self.sim_btn.config(text="启动模拟模式", bg=self.COLORS['simulation'])
+            self._update_connection_ui(False)
+        else:
+            try:
+                interval = float(self.sim_interval_var.get())
+                if interval < 1:
+                    interval = 1
+                    self.sim_interval_var.set('1')
+            except ValueError:
+                interval = 5
+                self.sim_interval_var.set('5')
+            
+            self.simulator.start(interval)
+            self.simulation_mode = True
+            self.sim_btn.config(text="停止模拟模式", bg=self.COLORS['danger'])
+            self._update_connection_ui(True, is_simulation=True)
+    
+    def _update_connection_ui(self, connected: bool, is_simulation: bool = False):
+        """更新连接状态UI"""
+        if connected:
+            if is_simulation:
+                self.connect_btn.config(state='disabled')
+                self.summary_connect_btn.config(text="模拟中", bg=self.COLORS['simulation'], state='disabled')
+                self.summary_indicator.delete('all')
+                self.summary_indicator.create_oval(2, 2, 8, 8, fill=self.COLORS['simulation'], outline='')
+                self.status_indicator.delete('all')
+                self.status_indicator.create_oval(2, 2, 10, 10, fill=self.COLORS['simulation'], outline='')
+                self.status_label.config(text="模拟模式", fg=self.COLORS['simulation'])
+            else:
+                self.connect_btn.config(text="断开", bg=self.COLORS['danger'], state='normal')
+                self.summary_connect_btn.config(text="断开", bg=self.COLORS['danger'], state='normal')
+                self.summary_indicator.delete('all')
+                self.summary_indicator.create_oval(2, 2, 8, 8, fill=self.COLORS['success'], outline='')
+                self.sim_btn.config(state='disabled')
+                self.status_indicator.delete('all')
+                self.status_indicator.create_oval(2, 2, 10, 10, fill=self.COLORS['success'], outline='')
+                self.status_label.config(text="已连接", fg=self.COLORS['success'])
+        else:
+            self.connect_btn.config(text="连接", bg=self.COLORS['success'], state='normal')
+            self.summary_connect_btn.config(text="连接", bg=self.COLORS['success'], state='normal')
+            self.summary_indicator.delete('all')
+            self.summary_indicator.create_oval(2, 2, 8, 8, fill=self.COLORS['danger'], outline='')
+            self.sim_btn.config(state='normal')
+            self.status_indicator.delete('all')
+            self.status_indicator.create_oval(2, 2, 10, 10, fill=self.COLORS['danger'], outline='')
+            self.status_label.config(text="未连接", fg=self.COLORS['text_secondary'])
+    
+    def _on_data_received(self, reading: BloodPressureReading):
+        """处理接收到的血压数据"""
+        tracing.stamp(reading.trace, "queued")
+        self.data_queue.put(('reading', reading))
+        self._wake_ui()
+    
+    def _on_raw_data(self, data: bytes):
+        """处理原始数据"""
+        # 格式化在串口线程完成，界面线程只负责写入
+        self.data_queue.put(('raw', format_raw_log_line(data)))
+        self._wake_ui()
+    
+    def _on_status_change(self, status: str):
+        """处理状态变化"""
+        self.data_queue.put(('status', status))
+        self._wake_ui()
+    
+    def _wake_ui(self):
+        """后台线程放入数据后调用：已有未处理的唤醒请求时不再重复发送"""
+        if not self._threaded_tk or self._closing or self._drain_pending.is_set():
+            return
+        self._drain_pending.set()
+        try:
+            self.root.event_generate('<<DataQueued>>', when='tail')
+        except (RuntimeError, tk.TclError):
+            # 窗口正在关闭，或主循环尚未启动；交给兜底轮询
+            self._drain_pending.clear()
+
+    def _queue_safety_poll(self):
+        """兜底轮询：唤醒事件丢失或 Tcl 不支持多线程时仍能处理队列"""
+        if not self._drain_pending.is_set() and not self.data_queue.empty():
+            self._process_queue()
+        interval = self.QUEUE_SAFETY_POLL_MS if self._threaded_tk else self.QUEUE_FALLBACK_POLL_MS
+        self.root.after(interval, self._queue_safety_poll)
+
+    def _process_queue(self):
+        """
+        处理数据队列
+        每次最多占用 QUEUE_FRAME_BUDGET 秒，剩余的下一帧继续，数据洪水时界面仍可响应；
+        同一批中的多条读数全部记入历史，但只把最新一条读数/状态渲染到大字显示
+        """
+        # 先清除标记再取数据：之后放入的数据会重新发送唤醒事件
+        self._drain_pending.clear()
+        deadline = time.perf_counter() + self.QUEUE_FRAME_BUDGET
+        readings = []
+        status = None
+        more = False
+        while True:
+            try:
+                msg_type, data = self.data_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if msg_type == 'reading':
+                readings.append(data)
+            elif msg_type == 'raw':
+                self.log_panel.append(data)
+            elif msg_type == 'status':
+                status = data
+
+            if time.perf_counter() >= deadline:
+                more = True
+                break
+
+        for reading in readings[:-1]:
+            self._record_reading(reading)
+        if readings:
+            self._update_display(readings[-1])
+        if status is not None:
+            self.status_label.config(text=status)
+        # 本帧的原始数据日志一次写入
+        self.log_panel.flush()
+
+        if more:
+            # 让出界面线程处理重绘和用户操作，稍后继续
+            self._drain_pending.set()
+            self.root.after(1, self._process_queue)
+
+    def _record_reading(self, reading: BloodPressureReading):
+        """读数写入历史列表与趋势图（不更新大字显示；Web 数据由总线的 web 订阅者更新）"""
+        self.readings.insert(0, reading)
+        self.history_listbox.insert(0, str(reading))
+
+        if len(self.readings) > 100:
+            self.readings.pop()
+            self.history_listbox.delete(tk.END)
+
+        # 趋势图历史只加入内存，文件由总线的 history 订阅者写入（见 _persist_history）
+        self.history_store.append(reading, persist=False)
+        self.trend_chart.append_latest()
+
+    def _persist_history(self, readings: List[BloodPressureReading]):
+        """事件总线 history 订阅者（后台线程）：把一批读数写入历史文件，模拟数据只显示不写入文件"""
+        if not self.simulation_mode:
+            self.history_store.persist(readings)
+
+    def _update_display(self, reading: BloodPressureReading):
+        """更新显示"""
+        self._record_reading(reading)
+        self.sys_value.config(text=str(reading.systolic))
+        self.dia_value.config(text=str(reading.diastolic))
+        self.pr_value.config(text=str(reading.pulse))
+        
+        self.update_time_label.config(
+            text=f"最后更新: {reading.timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+        
+        sys_color = self._get_bp_color(reading.systolic, 'sys')
+        dia_color = self._get_bp_color(reading.diastolic, 'dia')
+        self.sys_value.config(fg=sys_color)
+        self.dia_value.config(fg=dia_color)
+        tracing.stamp(reading.trace, "rendered")
+
+    def _log_latency(self):
+        """有新读数时把各阶段延迟摘要写入日志（每 LATENCY_LOG_INTERVAL 秒）"""
+        stats = tracing.summary()
+        count = stats.get("published", {}).get("count", 0)
+        if count != self._latency_logged_count:
+            self._latency_logged_count = count
+            self._log(f"[延迟] {tracing.format_summary(stats)}")
+        self.root.after(int(config.LATENCY_LOG_INTERVAL * 1000), self._log_latency)
+    
+    def _get_bp_color(self, value: int, bp_type: str) -> str:
+        """根据血压值返回颜色"""
+        if bp_type == 'sys':
+            if value < 90:
+                return self.COLORS['warning']
+            elif value < 140:
+                return self.COLORS['success']
+            else:
+                return self.COLORS['warning']
+        else:
+            if value < 60:
+                return self.COLORS['warning']
+            elif value < 90:
+                return self.COLORS['success']
+            else:
+                return self.COLORS['warning']
+        # if bp_type == 'sys':
+        #     if value < 90:
+        #         return self.COLORS['warning']
+        #     elif value < 120:
+        #         return self.COLORS['success']
+        #     elif value < 140:
+        #         return self.COLORS['warning']
+        #     else:
+        #         return self.COLORS['danger']
+        # else:
+        #     if value < 60:
+        #         return self.COLORS['warning']
+        #     elif value < 80:
+        #         return self.COLORS['success']
+        #     elif value < 90:
+        #         return self.COLORS['warning']
+        #     else:
+        #         return self.COLORS['danger']
+    
+    def _clear_history(self):
+        """清空历史记录"""
+        self.readings.clear()
+        self.history_listbox.delete(0, tk.END)
+    
+    def _log(self, message: str):
+        """添加日志（空闲时统一写入文本框）"""
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        self.log_panel.append(f"[{timestamp}] {message}\n")
+        if not self._log_flush_scheduled:
+            self._log_flush_scheduled = True
+            self.root.after_idle(self._flush_log)
+
+    def _flush_log(self):
+        self._log_flush_scheduled = False
+        self.log_panel.flush()
+    
+    def _on_closing(self):
+        """关闭窗口"""
+        # 停止后台线程前先停止唤醒，避免后台线程等待已不再处理事件的界面线程
+        self._closing = True
+        if self.simulation_mode:
+            self.simulator.stop()
+        self.serial_conn.disconnect()
+        self.bus.close(timeout=0.5)
+        if self.web_server:
+            self.web_server.stop()
+        if self.multicast:
+            self.multicast.stop()
+        if self.discovery:
+            self.discovery.stop()
+        self.root.destroy()
+    
+    def run(self):
+        """运行应用"""
+        self.root.mainloop()
+
+
+# ============== 授权模块 ==============
+class LoginDialog:
+    """登录授权对话框"""
+    
+    # 授权密码
+    PASSWORD = ""
+    
+    # 颜色主题
+    COLORS = {
+        'bg_dark': '#1a1a2e',
+        'bg_medium': '#16213e',
+        'bg_light': '#0f3460',
+        'accent': '#e94560',
+        'text_primary': '#ffffff',
+        'text_secondary': '#a0a0a0',
+        'success': '#4ecca3',
+        'danger': '#ff6b6b',
+    }
+    
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.title("OMRON HBP-9030 - 授权验证")
+        self.root.geometry("400x280")
+        self.root.configure(bg=self.COLORS['bg_dark'])
+        self.root.resizable(False, False)
+        
+        # 居中显示
+        self.root.update_idletasks()
+        width = self.root.winfo_width()
+        height = self.root.winfo_height()
+        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.root.winfo_screenheight() // 2) - (height // 2)
+        self.root.geometry(f'{width}x{height}+{x}+{y}')
+        
+        self.authorized = False
+        self.attempts = 0
+        self.max_attempts = 5
+        
+        self._create_widgets()
+        
+        # 绑定回车键
+        self.root.bind('<Return>', lambda e: self._verify())
+        # 绑定关闭事件
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        # 聚焦到密码输入框
+        self.password_entry.focus_set()
+    
+    def _create_widgets(self):
+        """创建界面组件"""
+        main_frame = tk.Frame(self.root, bg=self.COLORS['bg_dark'])
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=30)
+        
+        # 标题
+        tk.Label(
+            main_frame,
+            text="🔒 授权验证",
+            font=PLATFORM.get_font(20, 'bold'),
+            fg=self.COLORS['text_primary'],
+            bg=self.COLORS['bg_dark']
+        ).pack(pady=(0, 10))
+        
+        # 副标题
+        tk.Label(
+            main_frame,
+            text="OMRON HBP-9030 血压监测程序",
+            font=PLATFORM.get_font(11),
+            fg=self.COLORS['text_secondary'],
+            bg=self.COLORS['bg_dark']
+        ).pack(pady=(0, 25))
+        
+        # 密码输入区
+        input_frame = tk.Frame(main_frame, bg=self.COLORS['bg_medium'], padx=20, pady=20)
+        input_frame.pack(fill=tk.X)
+        
+        tk.Label(
+            input_frame,
+            text="请输入授权密码：",
+            font=PLATFORM.get_font(11),
+            fg=self.COLORS['text_primary'],
+            bg=self.COLORS['bg_medium']
+        ).pack(anchor='w', pady=(0, 8))
+        
+        self.password_var = tk.StringVar()
+        self.password_entry = tk.Entry(
+            input_frame,
+            textvariable=self.password_var,
+            show="●",
+            font=PLATFORM.get_mono_font(14),
+            bg=self.COLORS['bg_light'],
+            fg=self.COLORS['text_primary'],
+            insertbackground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            width=25
+        )
+        self.password_entry.pack(fill=tk.X, ipady=8)
+        
+        # 错误提示
+        self.error_label = tk.Label(
+            input_frame,
+            text="",
+            font=PLATFORM.get_font(9),
+            fg=self.COLORS['danger'],
+            bg=self.COLORS['bg_medium']
+        )
+        self.error_label.pack(anchor='w', pady=(8, 0))
+        
+        # 按钮区
+        btn_frame = tk.Frame(main_frame, bg=self.COLORS['bg_dark'])
+        btn_frame.pack(fill=tk.X, pady=(20, 0))
+        
+        self.login_btn = tk.Button(
+            btn_frame,
+            text="验证并进入",
+            font=PLATFORM.get_font(11, 'bold'),
+            bg=self.COLORS['success'],
+            fg=self.COLORS['text_primary'],
+            activebackground=self.COLORS['accent'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            width=15,
+            command=self._verify
+        )
+        self.login_btn.pack(side=tk.LEFT, expand=True)
+        
+        tk.Button(
+            btn_frame,
+            text="退出",
+            font=PLATFORM.get_font(11),
+            bg=self.COLORS['bg_light'],
+            fg=self.COLORS['text_secondary'],
+            activebackground=self.COLORS['danger'],
+            activeforeground=self.COLORS['text_primary'],
+            relief=tk.FLAT,
+            cursor='hand2',
+            width=10,
+            command=self._on_close
+        ).pack(side=tk.RIGHT, expand=True)
+    
+    def _verify(self):
+        """验证密码"""
+        password = self.password_var.get()
+        
+        if password == self.PASSWORD:
+            self.authorized = True
+            logger.info("授权验证成功")
+            self.root.destroy()
+        else:
+            self.attempts += 1
+            remaining = self.max_attempts - self.attempts
+            
+            if remaining <= 0:
+                logger.warning("授权验证失败次数过多，程序退出")
+                messagebox.showerror("授权失败", "密码错误次数过多，程序将退出。")
+                self.root.destroy()
+            else:
+                self.error_label.config(text=f"密码错误！剩余尝试次数：{remaining}")
+                self.password_var.set("")
+                self.password_entry.focus_set()
+                logger.warning(f"授权验证失败，剩余尝试次数：{remaining}")
+    
+    def _on_close(self):
+        """关闭窗口"""
+        self.authorized = False
+        self.root.destroy()
+    
+    def run(self) -> bool:
+        """运行登录对话框，返回是否授权成功"""
+        self.root.mainloop()
+        return self.authorized
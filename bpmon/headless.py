@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""无界面模式（树莓派采集端 / systemd 服务），不导入 tkinter"""
+
+import os
+import threading
+import time
+from typing import List, Optional
+
+from . import config, tracing
+from .broadcast import DiscoveryResponder, MulticastPublisher
+from .bus import EventBus
+from .ingest import SerialConnection, Simulator, parse_line_endings, serial_available
+from .log import logger
+from .models import BloodPressureReading
+from .storage import HistoryStore, WebDataStore
+from .web import BPWebServer
+
+
+def load_settings(args) -> dict:
+    """
+    合并设置：bpmon/config.py 中的默认值 < 配置文件 < 命令行参数
+    配置文件为 INI 格式：
+        [serial]    port / baudrate
+        [simulator] enabled / interval / rate / line_endings / max_chunk / corrupt_ratio / devices
+        [web]       enabled / host / port / mode / max_connections / password / admin_password
+        [multicast] enabled
+        [discovery] enabled
+    """
+    settings = {
+        "serial_port": None,
+        "baudrate": 9600,
+        "simulate": False,
+        "sim_interval": 5.0,
+        "sim_rate": None,
+        "sim_line_endings": config.SIM_LINE_ENDINGS,
+        "sim_max_chunk": config.SIM_MAX_CHUNK,
+        "sim_corrupt_ratio": config.SIM_CORRUPT_RATIO,
+        "sim_devices": config.SIM_DEVICE_COUNT,
+        "web_enabled": config.WEB_SERVER_ENABLED,
+        "web_host": config.WEB_SERVER_HOST,
+        "web_port": config.WEB_SERVER_PORT,
+        "web_mode": config.WEB_SERVER_MODE,
+        "max_connections": config.WEB_MAX_CONNECTIONS,
+        "web_password": config.WEB_AUTH_PASSWORD if config.WEB_AUTH_ENABLED else None,
+        "admin_password": config.ADMIN_PASSWORD,
+        "multicast": config.MULTICAST_ENABLED,
+        "discovery": config.DISCOVERY_ENABLED,
+    }
+
+    if args.config:
+        import configparser
+        parser = configparser.ConfigParser()
+        if not parser.read(args.config, encoding="utf-8"):
+            raise SystemExit(f"无法读取配置文件: {args.config}")
+        options = (
+            ("serial", "port", "serial_port", parser.get),
+            ("serial", "baudrate", "baudrate", parser.getint),
+            ("simulator", "enabled", "simulate", parser.getboolean),
+            ("simulator", "interval", "sim_interval", parser.getfloat),
+            ("simulator", "rate", "sim_rate", parser.getfloat),
+            ("simulator", "line_endings", "sim_line_endings", lambda s, o: parse_line_endings(parser.get(s, o))),
+            ("simulator", "max_chunk", "sim_max_chunk", parser.getint),
+            ("simulator", "corrupt_ratio", "sim_corrupt_ratio", parser.getfloat),
+            ("simulator", "devices", "sim_devices", parser.getint),
+            ("web", "enabled", "web_enabled", parser.getboolean),
+            ("web", "host", "web_host", parser.get),
+            ("web", "port", "web_port", parser.getint),
+            ("web", "mode", "web_mode", parser.get),
+            ("web", "max_connections", "max_connections", parser.getint),
+            ("web", "password", "web_password", parser.get),
+            ("web", "admin_password", "admin_password", parser.get),
+            ("multicast", "enabled", "multicast", parser.getboolean),
+            ("discovery", "enabled", "discovery", parser.getboolean),
+        )
+        for section, option, key, getter in options:
+            if parser.has_option(section, option):
+                settings[key] = getter(section, option)
+
+    overrides = {
+        "serial_port": args.serial_port,
+        "baudrate": args.baudrate,
+        "sim_interval": args.sim_interval,
+        "sim_rate": args.sim_rate,
+        "sim_line_endings": args.sim_line_endings,
+        "sim_max_chunk": args.sim_max_chunk,
+        "sim_corrupt_ratio": args.sim_corrupt_ratio,
+        "sim_devices": args.sim_devices,
+        "web_host": args.web_host,
+        "web_port": args.web_port,
+        "web_mode": args.web_mode,
+        "max_connections": args.max_connections,
+        "web_password": args.web_password,
+    }
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    if args.simulate:
+        settings["simulate"] = True
+    if args.no_web:
+        settings["web_enabled"] = False
+    if args.multicast:
+        settings["multicast"] = True
+    if args.no_discovery:
+        settings["discovery"] = False
+    return settings
+
+
+class HeadlessRunner:
+    """
+    无界面运行：串口（或模拟器）-> 事件总线 -> WebDataStore / 读数历史 -> Web 服务、组播、自动发现
+    串口断开或打开失败时每 SERIAL_RETRY_INTERVAL 秒重试；收到 SIGTERM / SIGINT 后正常退出
+    """
+
+    def __init__(self, settings: dict):
+        self.settings = settings
+        self.data_store = WebDataStore()
+        self.history_store = HistoryStore(os.path.join(config.get_app_dir(), config.HISTORY_FILE))
+        self.web_server: Optional[BPWebServer] = None
+        self.multicast: Optional[MulticastPublisher] = None
+        self.discovery: Optional[DiscoveryResponder] = None
+        # Web 数据与读数历史（写文件）分别订阅，写文件慢时不影响 Web 数据更新；
+        # 读数历史不能丢，队列满时等待，积压的读数一次取走、合并写入，磁盘慢时发布者最多等一次写入
+        self.bus = EventBus()
+        self.bus.subscribe("web", {"reading": self.data_store.update_reading, "status": self._on_status_change})
+        self.bus.subscribe("history", {"reading": self._record_history}, overflow="block", batch=True)
+        self.serial_conn = SerialConnection(bus=self.bus)
+        self.simulator = Simulator(
+            line_endings=settings["sim_line_endings"],
+            max_chunk=settings["sim_max_chunk"],
+            corrupt_ratio=settings["sim_corrupt_ratio"],
+            device_count=settings["sim_devices"],
+            bus=self.bus,
+        )
+        self._stop_event = threading.Event()
+
+    def _record_history(self, readings: List[BloodPressureReading]):
+        if len(readings) == 1:
+            logger.info(f"收到读数: {readings[0]}")
+        else:
+            logger.info(f"收到读数 {len(readings)} 条，最新: {readings[-1]}")
+        self.history_store.append_many(readings, persist=not self.settings["simulate"])
+
+    def _on_status_change(self, status: str):
+        logger.info(f"状态: {status}")
+        self.data_store.set_status(status)
+
+    def stop(self, *_args):
+        self._stop_event.set()
+
+    def _start_network(self):
+        settings = self.settings
+        if settings["web_password"] is not None:
+            config.WEB_AUTH_ENABLED = True
+            config.WEB_AUTH_PASSWORD = settings["web_password"]
+        config.ADMIN_PASSWORD = settings["admin_password"]  # 非空时启用 /admin/profile
+
+        if settings["web_enabled"]:
+            self.web_server = BPWebServer(self.data_store, settings["web_host"], settings["web_port"],
+                                          mode=settings["web_mode"], max_connections=settings["max_connections"])
+            if self.web_server.start() and settings["discovery"]:
+                self.discovery = DiscoveryResponder(config.DISCOVERY_PORT, self.web_server.server_port)
+                self.discovery.start()
+
+        if settings["multicast"]:
+            self.multicast = MulticastPublisher(config.MULTICAST_GROUP, config.MULTICAST_PORT, config.MULTICAST_TTL, config.MULTICAST_HEARTBEAT)
+            if self.multicast.start():
+                self.data_store.add_listener(self.multicast.on_store_change)
+
+    def _ensure_serial(self):
+        """串口未连接或读取线程已因错误退出时重新连接"""
+        conn = self.serial_conn
+        if conn.is_connected and conn.read_thread and conn.read_thread.is_alive():
+            return
+        if conn.serial_port is not None:
+            conn.disconnect()
+        port = self.settings["serial_port"]
+        if not port:
+            ports = SerialConnection.list_ports()
+            if not ports:
+                self.data_store.set_status("未找到串口")
+                return
+            port = ports[0]
+        conn.connect(port, self.settings["baudrate"])
+
+    def run(self):
+        import signal
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        self._start_network()
+        if self.settings["simulate"]:
+            self.simulator.start(self.settings["sim_interval"], self.settings["sim_rate"])
+        elif not serial_available():
+            logger.error("pyserial库未安装，无界面模式需要串口或 --simulate")
+            self._stop_event.set()
+
+        latency_logged_at = time.monotonic()
+        latency_logged_count = 0
+        try:
+            while not self._stop_event.is_set():
+                if not self.settings["simulate"]:
+                    self._ensure_serial()
+                if config.LATENCY_LOG_INTERVAL > 0 and time.monotonic() - latency_logged_at >= config.LATENCY_LOG_INTERVAL:
+                    latency_logged_at = time.monotonic()
+                    stats = tracing.summary()
+                    count = stats.get("published", {}).get("count", 0)
+                    if count != latency_logged_count:
+                        latency_logged_count = count
+                        logger.info(f"[延迟] {tracing.format_summary(stats)}")
+                self._stop_event.wait(config.SERIAL_RETRY_INTERVAL)
+        finally:
+            logger.info("正在退出无界面模式...")
+            if self.settings["simulate"]:
+                self.simulator.stop()
+            self.serial_conn.disconnect()
+            if self.web_server:
+                self.web_server.stop()
+            if self.multicast:
+                self.multicast.stop()
+            if self.discovery:
+                self.discovery.stop()
+            self.bus.close()
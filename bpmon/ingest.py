@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+"""
+数据采集：串口连接与模拟器
+pyserial 在第一次使用串口时才导入（见 load_serial），解析器与 Web 服务单独使用时无需导入
+"""
+
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from . import config, tracing
+from .bus import EventBus
+from .log import logger
+from .metrics import METRICS
+from .models import BloodPressureReading
+from .parsing import DataParser, LineFramer, format_hbp9030_frame
+
+_serial = None
+
+
+def load_serial():
+    """按需导入 pyserial，未安装时返回 None"""
+    global _serial
+    if _serial is None:
+        try:
+            import serial
+            import serial.tools.list_ports
+            _serial = serial
+        except ImportError:
+            _serial = False
+    return _serial or None
+
+
+def serial_available() -> bool:
+    """是否已安装 pyserial"""
+    return load_serial() is not None
+
+
+class ByteStreamSource:
+    """
+    字节流数据源（串口 / 模拟器）的公共处理：
+    原始数据 -> LineFramer 分帧 -> DataParser 解析 -> 读数
+    原始数据、读数与状态发布到 bus（事件总线，各订阅者在自己的线程处理），
+    回调函数则直接在读取线程调用，只适合很快的处理（基准测试等）
+    """
+
+    def __init__(self, on_data_received: Callable[[BloodPressureReading], None] = None,
+                 on_raw_data: Callable[[bytes], None] = None,
+                 on_status_change: Callable[[str], None] = None,
+                 bus: Optional[EventBus] = None):
+        self.on_data_received = on_data_received
+        self.on_raw_data = on_raw_data
+        self.on_status_change = on_status_change
+        self.bus = bus
+        self.framer = LineFramer()
+
+    def _receive(self, data: bytes):
+        """处理一段收到的字节（可能包含多帧，也可能只是半帧）"""
+        read_at = time.perf_counter()
+        METRICS.inc("bp_serial_bytes_total", len(data))
+        if self.bus:
+            self.bus.publish("raw", data)
+        if self.on_raw_data:
+            self.on_raw_data(data)
+        # 第一帧可能从之前的数据段开始，其余的帧都在本段内开始
+        first_read_at = self.framer.pending_since or read_at
+        frames = self.framer.feed(data, read_at)
+        if frames:
+            framed_at = time.perf_counter()
+            for frame in frames:
+                self._process_data(frame, first_read_at, framed_at)
+                first_read_at = read_at
+
+    def _process_data(self, data: bytes, read_at: float = None, framed_at: float = None):
+        """处理一帧数据"""
+        reading = DataParser.parse(data)
+        if reading is None:
+            return
+        if read_at is not None:
+            reading.trace = {}
+            tracing.stamp(reading.trace, "read", read_at)
+            tracing.stamp(reading.trace, "framed", framed_at)
+            tracing.stamp(reading.trace, "parsed")
+        if self.bus:
+            self.bus.publish("reading", reading)
+        if self.on_data_received:
+            self.on_data_received(reading)
+
+    def _notify_status(self, status: str):
+        """通知状态变化"""
+        if self.bus:
+            self.bus.publish("status", status)
+        if self.on_status_change:
+            self.on_status_change(status)
+
+
+LINE_ENDINGS = {"crlf": b"\r\n", "cr": b"\r", "lf": b"\n"}
+
+
+def parse_line_endings(names: str) -> Tuple[bytes, ...]:
+    """把 "crlf,lf" 这样的配置转换为行结束符元组"""
+    try:
+        return tuple(LINE_ENDINGS[name.strip().lower()] for name in names.split(",") if name.strip())
+    except KeyError as e:
+        raise ValueError(f"未知的行结束符: {e.args[0]}（可选 crlf / cr / lf）") from None
+
+
+class Simulator(ByteStreamSource):
+    """
+    模拟血压计：按 data_format.md 生成 HBP-9030 格式 5 字节流，
+    经与串口相同的 LineFramer / DataParser 处理（不绕过解析）
+    可配置速率（每秒最多数千帧）、分段到达、行结束符、损坏帧比例和设备数量，用于压力测试
+    """
+
+    # 损坏帧类型：截断、数值中混入非数字、数值超范围、乱码行、丢失行结束符（与下一帧粘连）
+    CORRUPTIONS = ("truncate", "bad_digit", "out_of_range", "garbage", "missing_ending")
+    SUMMARY_INTERVAL = 10.0  # 速率高于每秒 1 帧时，每隔多少秒输出一次汇总日志
+    MIN_WAIT = 0.002         # 两批数据之间的最短等待（秒），高速率时按批生成
+    
+    def __init__(self, on_data_received: Callable[[BloodPressureReading], None] = None,
+                 on_raw_data: Callable[[bytes], None] = None,
+                 on_status_change: Callable[[str], None] = None,
+                 line_endings: Sequence[bytes] = None, max_chunk: int = None,
+                 corrupt_ratio: float = None, device_count: int = None, seed: int = None,
+                 bus: Optional[EventBus] = None):
+        super().__init__(on_data_received, on_raw_data, on_status_change, bus)
+        self.line_endings = tuple(line_endings or config.SIM_LINE_ENDINGS)
+        self.max_chunk = config.SIM_MAX_CHUNK if max_chunk is None else max_chunk
+        self.corrupt_ratio = config.SIM_CORRUPT_RATIO if corrupt_ratio is None else corrupt_ratio
+        device_count = config.SIM_DEVICE_COUNT if device_count is None else device_count
+        self.device_ids = [f"9030{index + 1:016d}" for index in range(max(1, device_count))]
+        self.random = random.Random(seed)
+        self.is_running = False
+        self.thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.interval = 5.0
+        self.rate = 1.0 / self.interval
+        self.frames_sent = 0
+        self.frames_corrupted = 0
+        
+    def start(self, interval: float = 5.0, rate: float = None):
+        """开始模拟（rate 为每秒帧数，未指定时每 interval 秒一帧）"""
+        if not self.is_running:
+            self.is_running = True
+            self.interval = interval
+            self.rate = rate if rate else 1.0 / interval
+            self._stop_event.clear()
+            self.thread = threading.Thread(target=self._simulate_loop, daemon=True)
+            self.thread.start()
+            self._notify_status("模拟模式运行中")
+            logger.info(f"模拟器已启动（{self.rate:g} 帧/秒）")
+    
+    def stop(self):
+        """停止模拟"""
+        self.is_running = False
+        self._stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        self.framer.reset()
+        self._notify_status("模拟模式已停止")
+        logger.info("模拟器已停止")
+
+    # ---------- 数据生成 ----------
+    def make_frame(self, timestamp: datetime) -> bytes:
+        """生成一帧（按 corrupt_ratio 随机损坏）"""
+        rnd = self.random
+        # 生成随机但合理的血压数据
+        sys_val = rnd.randint(100, 160)
+        dia_val = rnd.randint(60, 100)
+        pr_val = rnd.randint(55, 95)
+        
+        # 确保收缩压大于舒张压
+        if dia_val >= sys_val:
+            dia_val = sys_val - 20
+
+        frame = format_hbp9030_frame(
+            sys_val, dia_val, pr_val, timestamp,
+            device_id=rnd.choice(self.device_ids),
+            line_ending=rnd.choice(self.line_endings),
+        )
+        if self.corrupt_ratio and rnd.random() < self.corrupt_ratio:
+            self.frames_corrupted += 1
+            frame = self._corrupt(frame)
+        return frame
+
+    def _corrupt(self, frame: bytes) -> bytes:
+        rnd = self.random
+        body = frame.rstrip(b"\r\n")
+        ending = frame[len(body):]
+        kind = rnd.choice(self.CORRUPTIONS)
+        if kind == "truncate":
+            return body[:rnd.randint(1, len(body) - 1)] + ending
+        if kind == "garbage":
+            # 不用 Random.randbytes（Python 3.9+），保持 3.7 可用
+            noise = bytes(b for b in (rnd.getrandbits(8) for _ in range(rnd.randint(4, 60)))
+                          if b not in (0x0D, 0x0A))
+            return (noise or b"\x00") + ending
+        if kind == "missing_ending":
+            return body
+        parts = body.split(b",")
+        if kind == "bad_digit":
+            field = rnd.randint(7, 9)
+            value = bytearray(parts[field])
+            value[rnd.randrange(len(value))] = rnd.choice(b"X?O ")
+            parts[field] = bytes(value)
+        else:  # out_of_range
+            parts[rnd.randint(7, 9)] = b"999"
+        return b",".join(parts) + ending
+
+    def generate_stream(self, count: int, timestamp: datetime = None) -> bytes:
+        """生成 count 帧连续的字节流"""
+        timestamp = timestamp or datetime.now()
+        self.frames_sent += count
+        return b"".join([self.make_frame(timestamp) for _ in range(count)])
+
+    def fragment(self, stream: bytes) -> List[bytes]:
+        """按 max_chunk 把字节流随机切成多段，模拟串口每次 read 只拿到一部分数据"""
+        if self.max_chunk <= 0:
+            return [stream]
+        randint = self.random.randint
+        chunks = []
+        pos = 0
+        while pos < len(stream):
+            size = randint(1, self.max_chunk)
+            chunks.append(stream[pos:pos + size])
+            pos += size
+        return chunks
+
+    def feed(self, count: int, timestamp: datetime = None):
+        """同步生成 count 帧并送入分帧/解析流程（基准测试直接调用，不启动线程）"""
+        for chunk in self.fragment(self.generate_stream(count, timestamp)):
+            self._receive(chunk)
+    
+    def _simulate_loop(self):
+        """模拟数据生成循环：第 k 帧在启动后 k / rate 秒发送，落后时成批补发（最多补 1 秒）"""
+        rate = self.rate
+        max_batch = max(1, int(rate))
+        started = time.perf_counter()
+        sent = 0
+        summary_time, summary_sent, summary_corrupted = started, 0, 0
+        while self.is_running:
+            due = int((time.perf_counter() - started) * rate) + 1 - sent
+            if due > max_batch:
+                sent += due - max_batch
+                due = max_batch
+            if due > 0:
+                try:
+                    self.feed(due)
+                except Exception as e:
+                    logger.error(f"[模拟] 生成数据时出错: {e}")
+                sent += due
+                if rate <= 1:
+                    logger.info(f"[模拟] 发送 {due} 帧")
+
+            now = time.perf_counter()
+            if rate > 1 and now - summary_time >= self.SUMMARY_INTERVAL:
+                frames = self.frames_sent - summary_sent
+                corrupted = self.frames_corrupted - summary_corrupted
+                logger.info(f"[模拟] 最近 {now - summary_time:.0f} 秒发送 {frames} 帧"
+                            f"（{frames / (now - summary_time):.0f} 帧/秒，损坏 {corrupted} 帧）")
+                summary_time, summary_sent, summary_corrupted = now, self.frames_sent, self.frames_corrupted
+
+            self._stop_event.wait(max(sent / rate - (now - started), self.MIN_WAIT))
+    
+    @property
+    def is_connected(self) -> bool:
+        return self.is_running
+
+
+# ============== 串口连接 ==============
+class SerialConnection(ByteStreamSource):
+    """串口连接管理器"""
+    
+    def __init__(self, on_data_received: Callable[[BloodPressureReading], None] = None,
+                 on_raw_data: Callable[[bytes], None] = None,
+                 on_status_change: Callable[[str], None] = None,
+                 bus: Optional[EventBus] = None):
+        super().__init__(on_data_received, on_raw_data, on_status_change, bus)
+        self.serial_port = None
+        self.is_running = False
+        self.read_thread: Optional[threading.Thread] = None
+        
+    @staticmethod
+    def list_ports() -> List[str]:
+        """获取可用串口列表"""
+        serial = load_serial()
+        if serial is None:
+            return []
+        ports = serial.tools.list_ports.comports()
+        return [port.device for port in ports]
+    
+    @staticmethod
+    def get_port_info() -> List[tuple]:
+        """获取串口详细信息"""
+        serial = load_serial()
+        if serial is None:
+            return []
+        ports = serial.tools.list_ports.comports()
+        return [(port.device, port.description) for port in ports]
+    
+    def connect(self, port: str, baudrate: int = 9600, timeout: float = 1.0) -> bool:
+        """连接到串口"""
+        serial = load_serial()
+        if serial is None:
+            self._notify_status("错误: 未安装pyserial库")
+            return False
+            
+        try:
+            if self.serial_port and self.serial_port.is_open:
+                self.disconnect()
+            
+            self.serial_port = serial.Serial(
+                port=port,
+                baudrate=baudrate,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                timeout=timeout
+            )
+            
+            if self.serial_port.is_open:
+                logger.info(f"已连接到 {port}, 波特率: {baudrate}")
+                self._notify_status(f"已连接到 {port}")
+                self.start_reading()
+                return True
+            return False
+            
+        except serial.SerialException as e:
+            error_msg = str(e)
+            # 提供更友好的错误提示
+            if "PermissionError" in error_msg or "拒绝访问" in error_msg:
+                error_msg = f"{port} 被占用，请关闭其他使用该端口的程序"
+            elif "FileNotFoundError" in error_msg or "找不到" in error_msg:
+                error_msg = f"{port} 不存在，请检查设备连接"
+            
+            logger.error(f"连接失败: {error_msg}")
+            self._notify_status(f"连接失败: {error_msg}")
+            return False
+        except Exception as e:
+            logger.error(f"连接时发生未知错误: {e}")
+            self._notify_status(f"连接错误: {e}")
+            return False
+    
+    def disconnect(self):
+        """断开连接"""
+        self.stop_reading()
+        if self.serial_port and self.serial_port.is_open:
+            try:
+                self.serial_port.close()
+            except Exception as e:
+                logger.error(f"关闭串口时出错: {e}")
+            logger.info("已断开连接")
+            self._notify_status("已断开连接")
+    
+    def start_reading(self):
+        """开始读取数据"""
+        if not self.is_running:
+            self.is_running = True
+            self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
+            self.read_thread.start()
+    
+    def stop_reading(self):
+        """停止读取数据"""
+        self.is_running = False
+        if self.read_thread and self.read_thread.is_alive():
+            self.read_thread.join(timeout=2.0)
+    
+    def _read_loop(self):
+        """数据读取循环"""
+        serial = load_serial()
+        self.framer.reset()
+        last_status_time = time.time()
+        bytes_received_total = 0
+        
+        logger.info("开始监听串口数据...")
+        
+        while self.is_running and self.serial_port and self.serial_port.is_open:
+            try:
+                # 每10秒输出一次状态，帮助诊断
+                now = time.time()
+                if now - last_status_time >= 10:
+                    if bytes_received_total == 0:
+                        logger.warning("【诊断】已等待10秒，未收到任何数据。请检查：")
+                        logger.warning("  1. 血压计是否开启了USB输出功能（功能选择模式-项号32）")
+                        logger.warning("  2. 波特率是否正确（尝试9600/19200/38400/115200）")
+                        logger.warning("  3. USB线是否为数据线（非纯充电线）")
+                        logger.warning("  4. 血压计是否完成了一次测量")
+                    else:
+                        logger.info(f"【诊断】已接收 {bytes_received_total} 字节")
+                    last_status_time = now
+                
+                if self.serial_port.in_waiting > 0:
+                    data = self.serial_port.read(self.serial_port.in_waiting)
+                    bytes_received_total += len(data)
+                    
+                    logger.debug(f"收到 {len(data)} 字节: {data.hex()} | {data!r}")
+                    
+                    self._receive(data)
+                else:
+                    time.sleep(0.05)  # 避免CPU占用过高
+                        
+            except serial.SerialException as e:
+                logger.error(f"读取数据时出错: {e}")
+                self._notify_status(f"读取错误: {e}")
+                break
+            except Exception as e:
+                logger.error(f"处理数据时出错: {e}")
+    
+    @property
+    def is_connected(self) -> bool:
+        return self.serial_port is not None and self.serial_port.is_open
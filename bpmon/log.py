@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+日志配置
+导入时只创建 logger，不创建日志文件；由入口（bpmon.app.main）调用 setup_logging() 后才写入 bp_monitor.log
+"""
+
+import logging
+import os
+
+from . import config
+
+logger = logging.getLogger("bp_monitor")
+_configured = False
+
+
+def setup_logging():
+    """配置日志，处理打包后的路径问题（重复调用无副作用）"""
+    global _configured
+    if _configured:
+        return logger
+    _configured = True
+    log_file = os.path.join(config.get_app_dir(), 'bp_monitor.log')
+    
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+    return logger
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""运行指标（Prometheus 文本格式）"""
+
+import bisect
+import threading
+from typing import Callable, List, Optional, Tuple
+
+
+class MetricsRegistry:
+    """
+    轻量级指标收集，供 /metrics 接口输出
+    写入路径不加锁：每个线程写自己的分片（threading.local），
+    只有采集（/metrics 请求）时才汇总所有分片，不拖慢串口读取与 HTTP 处理
+    """
+
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+    MAX_LIVE_SHARDS = 64
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}  # 已退出线程的分片合并到这里
+        self._lock = threading.Lock()  # 仅在新线程首次写入与采集时使用
+        self._meta: dict = {}  # name -> (type, help, buckets)
+        self._gauges: dict = {}  # name -> 回调函数
+
+    # ---------- 声明 ----------
+    def counter(self, name: str, help_text: str):
+        self._meta[name] = ("counter", help_text, None)
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = None):
+        self._meta[name] = ("histogram", help_text, tuple(buckets or self.DEFAULT_BUCKETS))
+
+    def gauge(self, name: str, help_text: str, callback: Callable[[], Optional[float]]):
+        """
+        注册仪表盘指标，采集时调用 callback 取值（返回 None 则不输出）
+        带标签的指标由 callback 返回 {labels: 值}
+        """
+        self._meta[name] = ("gauge", help_text, None)
+        self._gauges[name] = callback
+
+    # ---------- 写入（热路径） ----------
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict = {}
+            with self._lock:
+                if len(self._shards) > self.MAX_LIVE_SHARDS:
+                    self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+            return shard
+
+    def inc(self, name: str, value: float = 1, labels: Tuple[Tuple[str, str], ...] = ()):
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Tuple[Tuple[str, str], ...] = ()):
+        shard = self._shard()
+        key = (name, labels)
+        hist = shard.get(key)
+        if hist is None:
+            buckets = self._meta[name][2]
+            hist = shard[key] = [0] * (len(buckets) + 1) + [0.0]  # 各桶计数 + (+Inf) + sum
+        hist[bisect.bisect_left(self._meta[name][2], value)] += 1
+        hist[-1] += value
+
+    # ---------- 采集 ----------
+    @staticmethod
+    def _merge(target: dict, shard: dict):
+        for key, value in shard.items():
+            if isinstance(value, list):
+                current = target.get(key)
+                if current is None:
+                    target[key] = list(value)
+                else:
+                    for i, v in enumerate(value):
+                        current[i] += v
+            else:
+                target[key] = target.get(key, 0) + value
+
+    def _retire_dead_shards(self):
+        """把已退出线程的分片合并进 _retired，避免每连接一个线程时分片无限增长（需持有 _lock）"""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._merge(self._retired, shard.copy())
+        self._shards = alive
+
+    def collect(self) -> dict:
+        """汇总所有分片，返回 {(name, labels): 值}"""
+        with self._lock:
+            self._retire_dead_shards()
+            totals: dict = {}
+            self._merge(totals, self._retired)
+            for _thread, shard in self._shards:
+                # dict.copy() 在 GIL 下是原子的，写入线程无需加锁
+                self._merge(totals, shard.copy())
+        return totals
+
+    def summarize(self, name: str) -> dict:
+        """
+        直方图摘要：{labels: {"count", "mean", "p50", "p95", "p99"}}
+        百分位在所在分桶内线性插值估算，落在 +Inf 桶时取最大的桶边界
+        """
+        buckets = self._meta[name][2]
+        result = {}
+        for (metric, labels), value in self.collect().items():
+            if metric != name:
+                continue
+            count = sum(value[:-1])
+            if not count:
+                continue
+            entry = {"count": count, "mean": value[-1] / count}
+            for key, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+                rank = q * count
+                cumulative = 0
+                lower = 0.0
+                estimate = buckets[-1]
+                for bound, n in zip(buckets, value):
+                    if n and cumulative + n >= rank:
+                        estimate = lower + (bound - lower) * (rank - cumulative) / n
+                        break
+                    cumulative += n
+                    lower = bound
+                entry[key] = estimate
+            result[labels] = entry
+        return result
+
+    @staticmethod
+    def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        parts = []
+        for key, value in labels + extra:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            parts.append(f'{key}="{value}"')
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        """生成 Prometheus 文本格式"""
+        totals = self.collect()
+        by_name: dict = {}
+        for (name, labels), value in totals.items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name, (kind, help_text, buckets) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "gauge":
+                try:
+                    value = self._gauges[name]()
+                except Exception:
+                    value = None
+                if isinstance(value, dict):
+                    for labels, labeled_value in sorted(value.items()):
+                        lines.append(f"{name}{self._format_labels(labels)} {labeled_value}")
+                elif value is not None:
+                    lines.append(f"{name} {value}")
+                continue
+            samples = by_name.get(name)
+            if not samples and kind == "counter":
+                lines.append(f"{name} 0")
+                continue
+            for labels, value in sorted(samples or [], key=lambda item: item[0]):
+                if kind == "counter":
+                    lines.append(f"{name}{self._format_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + ("+Inf",), value):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{self._format_labels(labels, (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {value[-1]}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+METRICS.counter("bp_serial_bytes_total", "串口接收的字节数")
+METRICS.counter("bp_serial_frames_total", "串口按 CR/LF 切分出的数据帧数")
+METRICS.counter("bp_serial_overflow_flushes_total", "缓冲区超过 256 字节仍无换行而被强制处理的次数")
+METRICS.counter("bp_frames_parsed_total", "解析成功的血压数据帧数")
+METRICS.counter("bp_frames_rejected_total", "被 DataParser 拒绝的数据帧数（按原因）")
+METRICS.counter("bp_http_requests_total", "HTTP 请求数（按路径与状态码）")
+METRICS.histogram("bp_http_request_duration_seconds", "HTTP 请求处理耗时（按路径）")
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""数据类"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass
+class BloodPressureReading:
+    """血压读数数据类"""
+    systolic: int           # 收缩压 (mmHg)
+    diastolic: int          # 舒张压 (mmHg)
+    pulse: int              # 心率 (bpm)
+    timestamp: datetime     # 测量时间
+    raw_data: str = ""      # 原始数据（用于调试）
+    device_id: str = ""     # 血压计 ID（数据帧第 6 项）
+    # 各处理阶段的 time.perf_counter() 时间戳（见 tracing.py），只有串口/模拟器产生的读数才有
+    trace: dict = field(default=None, repr=False, compare=False)
+    
+    def __str__(self):
+        return f"{self.timestamp.strftime('%Y-%m-%d %H:%M')}  {self.systolic}/{self.diastolic}  {self.pulse} bpm"
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""血压计数据帧解析"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from .log import logger
+from .metrics import METRICS
+from .models import BloodPressureReading
+
+
+class DataParser:
+    """
+    HBP-9030 数据解析器
+    固定格式: YYYY.MM.DD.HH.MM.ID(20).e(1).SYS(3).DIA(3).PR(3).MOTION+CR+LF
+    """
+
+    @staticmethod
+    def _reject(reason: str) -> None:
+        """记录被拒绝的数据帧（按原因计数），返回 None 便于直接 return"""
+        METRICS.inc("bp_frames_rejected_total", labels=(("reason", reason),))
+        return None
+    
+    @staticmethod
+    def parse(data: bytes) -> Optional[BloodPressureReading]:
+        """
+        尝试解析血压数据
+        仅支持 data_format.md 指定的固定格式
+        """
+        try:
+            if not data:
+                return DataParser._reject("empty")
+
+            # 尝试不同的编码方式解码，保证不抛异常
+            text = ""
+            for encoding in ['ascii', 'utf-8', 'latin-1', 'gbk']:
+                try:
+                    text = data.decode(encoding, errors='ignore').strip()
+                    if text:
+                        break
+                except (UnicodeDecodeError, LookupError):
+                    continue
+
+            if not text:
+                return DataParser._reject("empty")
+
+            logger.debug(f"接收原始数据: {repr(text)}")
+            # logger.debug(f"十六进制: {data.hex()}")
+
+            result = DataParser._parse_format_hbp9030(text)
+            if result:
+                METRICS.inc("bp_frames_parsed_total")
+                result.raw_data = text
+                logger.info(f"解析成功: SYS={result.systolic}, DIA={result.diastolic}, PR={result.pulse}")
+            else:
+                logger.debug("解析失败: 未匹配固定格式")
+
+            return result
+
+        except Exception as e:
+            logger.error(f"解析数据时出错: {e}", exc_info=True)
+            return DataParser._reject("error")
+    
+    @staticmethod
+    def _parse_format_hbp9030(text: str) -> Optional[BloodPressureReading]:
+        """
+        HBP-9030 专用格式解析
+        固定格式: YYYY,MM,DD,HH,MM,ID(20),e(1),SYS(3),DIA(3),PR(3),MOTION+CR+LF
+        """
+        try:
+            # clean = text.strip().replace("\x00", "")
+            # parts = [p.strip() for p in clean.split(',') if p.strip() != ""]
+            parts = text.strip().split(",")
+            if len(parts) < 11:
+                return DataParser._reject("field_count")
+
+            if len(parts) > 11:
+                parts = parts[:11]
+
+            year_s, mon_s, day_s, hour_s, min_s, device_id, err_s, sys_s, dia_s, pr_s, motion_s = parts
+
+            if not (year_s.isdigit() and len(year_s) == 4):
+                return DataParser._reject("datetime_field")
+            if not (mon_s.isdigit() and len(mon_s) == 2):
+                return DataParser._reject("datetime_field")
+            if not (day_s.isdigit() and len(day_s) == 2):
+                return DataParser._reject("datetime_field")
+            if not (hour_s.isdigit() and len(hour_s) == 2):
+                return DataParser._reject("datetime_field")
+            if not (min_s.isdigit() and len(min_s) == 2):
+                return DataParser._reject("datetime_field")
+            # if not (device_id.isdigit() and len(device_id) == 20):
+            #     return None
+
+            try:
+                sys_val = int(sys_s)
+                dia_val = int(dia_s)
+                pr_val = int(pr_s)
+            except ValueError:
+                return DataParser._reject("number")
+
+            if not (60 <= sys_val <= 300 and 30 <= dia_val <= 200 and 30 <= pr_val <= 200):
+                return DataParser._reject("out_of_range")
+            if sys_val <= dia_val:
+                return DataParser._reject("sys_le_dia")
+
+            try:
+                timestamp = datetime(
+                    int(year_s), int(mon_s), int(day_s),
+                    int(hour_s), int(min_s)
+                )
+            except ValueError:
+                timestamp = datetime.now()
+
+            return BloodPressureReading(
+                systolic=sys_val,
+                diastolic=dia_val,
+                pulse=pr_val,
+                timestamp=timestamp,
+                device_id=device_id.strip()
+            )
+        except Exception as e:
+            logger.debug(f"HBP-9030格式解析失败: {e}")
+        return DataParser._reject("error")
+
+
+def format_hbp9030_frame(systolic: int, diastolic: int, pulse: int, timestamp: datetime,
+                         device_id: str = "0" * 20, error_code: int = 0, motion: int = 0,
+                         line_ending: bytes = b"\r\n") -> bytes:
+    """按 data_format.md 生成一帧 HBP-9030 数据（DataParser.parse 的逆过程，供模拟器使用）"""
+    return (
+        f"{timestamp:%Y,%m,%d,%H,%M},{device_id:0>20.20},{error_code:1d},"
+        f"{systolic:03d},{diastolic:03d},{pulse:03d},{motion:1d}"
+    ).encode("ascii") + line_ending
+
+
+class LineFramer:
+    """
+    把串口分段到达的字节流切分成数据帧（CR、LF、CRLF 均视为帧结束，空行忽略）
+    缓冲区超过 MAX_BUFFER 字节仍没有换行时，把已有内容当作一帧强制处理，避免无限增长
+    pending_since 为缓冲区中未完成部分第一段字节的到达时间（延迟追踪的 read 阶段）
+    """
+
+    MAX_BUFFER = 256
+
+    def __init__(self):
+        self._buffer = b""
+        self.pending_since: Optional[float] = None
+
+    def feed(self, data: bytes, now: float = None) -> List[bytes]:
+        """追加一段数据（now 为到达时间），返回其中已完整的帧（不含行结束符）"""
+        buffer = self._buffer + data
+        frames: List[bytes] = []
+        if b"\r" in data or b"\n" in data:
+            lines = buffer.replace(b"\r", b"\n").split(b"\n")
+            buffer = lines.pop()
+            frames = [line for line in lines if line.strip()]
+            if frames:
+                METRICS.inc("bp_serial_frames_total", len(frames))
+            # 剩下的只可能是本段数据的结尾
+            self.pending_since = now if buffer else None
+        elif self.pending_since is None:
+            self.pending_since = now
+        if len(buffer) > self.MAX_BUFFER:
+            METRICS.inc("bp_serial_overflow_flushes_total")
+            frames.append(buffer)
+            buffer = b""
+            self.pending_since = None
+        self._buffer = buffer
+        return frames
+
+    def reset(self):
+        """丢弃未完成的数据（重新连接时调用）"""
+        self._buffer = b""
+        self.pending_since = None
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""平台检测与适配（字体、窗口尺寸、树莓派全屏）"""
+
+import platform
+from typing import Optional
+
+
+class PlatformConfig:
+    """跨平台配置"""
+    
+    def __init__(self):
+        self.system = platform.system()  # 'Windows', 'Linux', 'Darwin'
+        self.machine = platform.machine()  # 'x86_64', 'armv7l', 'aarch64'
+        self.is_windows = self.system == 'Windows'
+        self.is_linux = self.system == 'Linux'
+        self.is_mac = self.system == 'Darwin'
+        self.is_raspberry_pi = self._detect_raspberry_pi()
+        
+        # 根据平台设置字体
+        if self.is_windows:
+            self.font_family = 'Microsoft YaHei UI'
+            self.font_mono = 'Consolas'
+        elif self.is_mac:
+            self.font_family = 'PingFang SC'
+            self.font_mono = 'Menlo'
+        else:  # Linux / 树莓派
+            self.font_family = 'Noto Sans CJK SC'  # 或 'WenQuanYi Micro Hei'
+            self.font_mono = 'DejaVu Sans Mono'
+        
+        # 根据平台设置窗口尺寸
+        if self.is_raspberry_pi:
+            # 树莓派通常使用小屏幕（如7寸800x480）
+            self.window_size = "800x480"
+            self.window_min = (750, 450)
+            self.font_scale = 0.85  # 字体缩小
+            self.fullscreen = True  # 默认全屏
+        else:
+            self.window_size = "500x400"
+            self.window_min = (200, 100)
+            self.font_scale = 1
+            self.fullscreen = False
+        
+        # 串口路径前缀
+        if self.is_windows:
+            self.serial_prefix = "COM"
+        else:
+            self.serial_prefix = "/dev/tty"
+    
+    def _detect_raspberry_pi(self) -> bool:
+        """检测是否为树莓派"""
+        if not self.is_linux:
+            return False
+        try:
+            with open('/proc/cpuinfo', 'r') as f:
+                cpuinfo = f.read()
+                return 'Raspberry Pi' in cpuinfo or 'BCM' in cpuinfo
+        except Exception:
+            pass
+        # 检查是否是ARM架构的Linux
+        return self.machine in ('armv7l', 'armv6l', 'aarch64')
+    
+    def get_font(self, size: int, weight: str = 'normal') -> tuple:
+        """获取适配平台的字体"""
+        scaled_size = int(size * self.font_scale)
+        return (self.font_family, scaled_size, weight)
+    
+    def get_mono_font(self, size: int) -> tuple:
+        """获取等宽字体"""
+        scaled_size = int(size * self.font_scale)
+        return (self.font_mono, scaled_size)
+    
+    def __str__(self):
+        return f"Platform: {self.system} ({self.machine}), RaspberryPi: {self.is_raspberry_pi}"
+
+
+_platform: Optional[PlatformConfig] = None
+
+
+def get_platform() -> PlatformConfig:
+    """全局平台配置，第一次调用时才检测（读取 /proc/cpuinfo），只有图形界面需要"""
+    global _platform
+    if _platform is None:
+        _platform = PlatformConfig()
+    return _platform
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+现场性能分析（管理员功能）：不重启程序、不接调试器，在固定时间窗口内
+- 按 PROFILE_SAMPLE_INTERVAL 对所有线程的调用栈采样（cProfile 只能分析启用它的那个线程，
+  串口、Web、界面各在不同线程，所以用 sys._current_frames() 采样），结果写成 pstats 兼容文件
+- 用 tracemalloc 记录窗口开始与结束时的内存快照，输出占用最多与增长最多的分配位置
+结果保存在程序目录（bp_monitor.log 旁）：
+    bp_profile_<时间>.pstats   python -m pstats 或 snakeviz 等工具打开
+    bp_profile_<时间>.txt      按累计时间 / 自身时间排序的报告与各线程采样数
+    bp_memory_<时间>.txt       内存分配报告
+由 Web 接口 /admin/profile 或图形界面日志区的右键菜单控制，均需要 ADMIN_PASSWORD
+"""
+
+import io
+import marshal
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from . import config
+from .log import logger
+
+Func = Tuple[str, int, str]  # pstats 的函数标识：(文件, 首行号, 函数名)
+
+
+class StackSampler:
+    """对所有线程（除自身外）的调用栈计数，按墙钟时间加权，可转换为 pstats 统计"""
+
+    def __init__(self):
+        self.samples = 0
+        self.thread_samples: Dict[str, int] = {}
+        self._self_time: Dict[Func, float] = {}
+        self._total_time: Dict[Func, float] = {}
+        self._hits: Dict[Func, int] = {}
+        self._edges: Dict[Tuple[Func, Func], List[float]] = {}  # (调用者, 被调用者) -> [次数, 自身时间, 累计时间]
+
+    def sample(self, weight: float, skip_ident: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip_ident:
+                continue
+            name = names.get(ident, str(ident))
+            self.thread_samples[name] = self.thread_samples.get(name, 0) + 1
+            stack: List[Func] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self._add(stack, weight)
+        self.samples += 1
+
+    def _add(self, stack: List[Func], weight: float):
+        """stack 从最内层（正在执行）到最外层"""
+        leaf = stack[0]
+        self._self_time[leaf] = self._self_time.get(leaf, 0.0) + weight
+        seen = set()
+        for index, func in enumerate(stack):
+            if func in seen:  # 递归只计一次累计时间
+                continue
+            seen.add(func)
+            self._total_time[func] = self._total_time.get(func, 0.0) + weight
+            self._hits[func] = self._hits.get(func, 0) + 1
+            if index + 1 < len(stack):
+                edge = self._edges.setdefault((stack[index + 1], func), [0, 0.0, 0.0])
+                edge[0] += 1
+                edge[1] += weight if index == 0 else 0.0
+                edge[2] += weight
+
+    def pstats_dict(self) -> dict:
+        """转换为 pstats.Stats 使用的格式；调用次数为函数出现在栈中的采样数"""
+        callers: Dict[Func, dict] = {}
+        for (caller, callee), (count, self_time, total_time) in self._edges.items():
+            callers.setdefault(callee, {})[caller] = (count, count, self_time, total_time)
+        return {
+            func: (hits, hits, self._self_time.get(func, 0.0), self._total_time[func], callers.get(func, {}))
+            for func, hits in self._hits.items()
+        }
+
+
+class ProfileSession:
+    """
+    一次性能分析：start() 后在后台线程采样，到时或 stop() 后由该线程写出结果文件
+    start() / stop() 都不等待（Web 的 asyncio 模式下在事件循环线程调用），内存快照与写文件都在后台线程完成
+    """
+
+    def __init__(self, seconds: float, cpu: bool = True, memory: bool = True,
+                 interval: float = None, out_dir: str = None):
+        self.seconds = seconds
+        self.cpu = cpu
+        self.memory = memory
+        self.interval = interval or config.PROFILE_SAMPLE_INTERVAL
+        self.out_dir = out_dir or config.get_app_dir()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.files: List[str] = []
+        self.error: Optional[str] = None
+        self.sampler = StackSampler()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+        self._memory_start = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def stopping(self) -> bool:
+        """已请求提前结束，结果文件尚未写完"""
+        return self._stop_event.is_set() and self.running
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="bp-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """请求提前结束，立即返回；结果文件由后台线程写出（见 status()["files"]）"""
+        self._stop_event.set()
+
+    def _start_memory_tracing(self):
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self._memory_start = tracemalloc.take_snapshot()
+
+    def _run(self):
+        me = threading.get_ident()
+        try:
+            if self.memory:
+                self._start_memory_tracing()
+            deadline = time.perf_counter() + self.seconds
+            last = time.perf_counter()
+            while self.cpu and not self._stop_event.wait(self.interval):
+                now = time.perf_counter()
+                self.sampler.sample(now - last, me)
+                last = now
+                if now >= deadline:
+                    break
+            if not self.cpu:
+                self._stop_event.wait(self.seconds)
+            self._write_results(self._take_memory_snapshot())
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"性能分析出错: {e}", exc_info=True)
+        finally:
+            if self._started_tracemalloc:
+                import tracemalloc
+                tracemalloc.stop()
+            self.finished_at = time.time()
+
+    def _take_memory_snapshot(self):
+        """窗口结束时的内存快照（在生成报告之前取，报告本身的分配不计入）"""
+        if not self.memory:
+            return None
+        import tracemalloc
+        return tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()
+
+    def _write_results(self, memory_snapshot):
+        stamp = datetime.fromtimestamp(self.started_at).strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.out_dir, f"bp_profile_{stamp}")
+        if self.cpu and self.sampler.samples:
+            with open(base + ".pstats", "wb") as f:
+                marshal.dump(self.sampler.pstats_dict(), f)
+            self.files.append(base + ".pstats")
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(self._cpu_report(base + ".pstats"))
+            self.files.append(base + ".txt")
+        if memory_snapshot is not None:
+            path = os.path.join(self.out_dir, f"bp_memory_{stamp}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self._memory_report(*memory_snapshot))
+            self.files.append(path)
+        logger.info(f"性能分析结果已保存: {', '.join(self.files) or '无'}")
+
+    def _cpu_report(self, pstats_path: str) -> str:
+        import pstats
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        out = io.StringIO()
+        out.write(f"栈采样：{self.sampler.samples} 次，间隔 {self.interval * 1000:.1f} ms，窗口 {elapsed:.1f} 秒\n")
+        out.write("时间为墙钟时间：等待中的线程（串口轮询、select、条件变量）也会计入\n\n各线程采样数：\n")
+        for name, count in sorted(self.sampler.thread_samples.items(), key=lambda item: -item[1]):
+            out.write(f"  {count:>8}  {name}\n")
+        stats = pstats.Stats(pstats_path, stream=out)
+        stats.strip_dirs()
+        out.write("\n==== 按累计时间 ====\n")
+        stats.sort_stats("cumulative").print_stats(config.PROFILE_REPORT_LINES)
+        out.write("\n==== 按自身时间 ====\n")
+        stats.sort_stats("tottime").print_stats(config.PROFILE_REPORT_LINES)
+        return out.getvalue()
+
+    def _memory_report(self, snapshot, traced: Tuple[int, int]) -> str:
+        import tracemalloc
+        current, peak = traced
+        filters = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+        snapshot = snapshot.filter_traces(filters)
+        top = config.PROFILE_TOP_ALLOCATIONS
+        out = io.StringIO()
+        out.write(f"tracemalloc：当前 {current / 1024:.1f} KiB，峰值 {peak / 1024:.1f} KiB"
+                  f"（只统计开始跟踪之后的分配）\n")
+        out.write(f"\n==== 占用最多的 {top} 个位置 ====\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            out.write(f"{stat}\n")
+        if self._memory_start is not None:
+            out.write(f"\n==== 窗口内增长最多的 {top} 个位置 ====\n")
+            diff = snapshot.compare_to(self._memory_start.filter_traces(filters), "lineno")
+            for stat in diff[:top]:
+                out.write(f"{stat}\n")
+        out.write(f"\n==== 占用最多的 {min(top, 10)} 个调用栈 ====\n")
+        for stat in snapshot.statistics("traceback")[:min(top, 10)]:
+            out.write(f"{stat.count} 个内存块，{stat.size / 1024:.1f} KiB\n")
+            for line in stat.traceback.format():
+                out.write(f"{line}\n")
+        return out.getvalue()
+
+    def status(self) -> dict:
+        remaining = None
+        if self.running:
+            remaining = max(0.0, self.started_at + self.seconds - time.time())
+        return {
+            "running": self.running,
+            "stopping": self.stopping,
+            "started": datetime.fromtimestamp(self.started_at).strftime("%Y-%m-%d %H:%M:%S") if self.started_at else None,
+            "seconds": self.seconds,
+            "remaining": None if remaining is None else round(remaining, 1),
+            "cpu": self.cpu,
+            "memory": self.memory,
+            "samples": self.sampler.samples,
+            "files": self.files,
+            "error": self.error,
+        }
+
+
+class Profiler:
+    """同一时间只允许一个性能分析窗口（Web 接口与图形界面共用 PROFILER）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.session: Optional[ProfileSession] = None
+
+    @staticmethod
+    def enabled() -> bool:
+        """未设置管理员密码时禁用"""
+        return bool(config.ADMIN_PASSWORD)
+
+    @staticmethod
+    def check_password(password: str) -> bool:
+        import hmac
+        return Profiler.enabled() and hmac.compare_digest(
+            password.encode("utf-8"), config.ADMIN_PASSWORD.encode("utf-8"))
+
+    def start(self, seconds: float = None, cpu: bool = True, memory: bool = True) -> bool:
+        """开始一个窗口，已在运行时返回 False"""
+        seconds = min(max(seconds or config.PROFILE_DEFAULT_SECONDS, 1.0), config.PROFILE_MAX_SECONDS)
+        with self._lock:
+            if self.session is not None and self.session.running:
+                return False
+            self.session = ProfileSession(seconds, cpu=cpu, memory=memory)
+            self.session.start()
+        logger.info(f"开始性能分析：{seconds:g} 秒（CPU 采样: {cpu}，内存跟踪: {memory}）")
+        return True
+
+    def stop(self) -> bool:
+        """请求提前结束当前窗口（不等待结果写完），没有运行中的窗口时返回 False"""
+        with self._lock:
+            session = self.session
+        if session is None or not session.running:
+            return False
+        session.stop()
+        return True
+
+    def status(self) -> dict:
+        session = self.session
+        if session is None:
+            return {"running": False, "stopping": False, "files": []}
+        return session.status()
+
+
+PROFILER = Profiler()
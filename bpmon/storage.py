@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+数据存储：
+- WebDataStore：最新读数与状态（供 Web 接口、组播使用）
+- HistoryStore：读数历史文件（趋势图）
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from . import config, tracing
+from .log import logger
+from .models import BloodPressureReading
+
+
+@dataclass(frozen=True)
+class StoreSnapshot:
+    """
+    WebDataStore 某一 version 的完整数据，发布后不再修改
+    /data 的响应体与 SSE 消息在发布时编码一次，所有请求共用
+    """
+    version: int
+    reading_seq: int
+    data: dict     # 与其它线程共享，只读
+    body: bytes    # /data 的 JSON 响应体
+    etag: str
+    sse: bytes     # SSE 消息 "id: <version>\ndata: <json>\n\n"
+
+
+class WebDataStore:
+    """
+    保存最新血压值，供 Web 接口读取
+    每次变化（新读数/状态变化）version 加 1，推送接口据此判断客户端是否已是最新
+    每条读数另有递增的 reading_seq，并保留最近 history_size 条，B端据此只补取断线期间缺失的读数
+
+    写入时生成新的不可变 StoreSnapshot，用一次引用赋值发布；读取（current / snapshot / version）
+    只取当前引用，不加锁、不复制。_lock 只用于写入者之间互斥、读数历史与长轮询等待
+    """
+
+    def __init__(self, history_size: int = config.WEB_HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # 每次启动不同，避免A端重启后 version 从 0 重新计数导致客户端的 ETag 误命中
+        self._boot = os.urandom(4).hex()
+        self._history = deque(maxlen=history_size)
+        self._last_update: Optional[float] = None
+        # 最新读数的延迟追踪信息，第一次发给 Web 客户端后清空（见 mark_served）
+        self._trace: Optional[dict] = None
+        self._trace_seq = 0
+        self._listeners: List[Callable[[str, dict], None]] = []
+        self._current = self._build({
+            "sys": None,
+            "dia": None,
+            "pulse": None,
+            "timestamp": None,
+            "status": "未连接",
+            "version": 0,
+            "reading_seq": 0,
+        })
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    def etag(self, version: int) -> str:
+        """指定 version 对应的 ETag"""
+        return f'"{self._boot}-{version}"'
+
+    def add_listener(self, callback: Callable[[str, dict], None]):
+        """注册变化监听，callback(event, snapshot)，event 为 "reading" 或 "status"，snapshot 为只读字典"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, dict], None]):
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def wait_for_change(self, version: int, timeout: float) -> bool:
+        """阻塞直到 version 变化或超时，返回是否已变化（线程模式的长轮询/SSE 使用）"""
+        with self._changed:
+            return self._changed.wait_for(lambda: self._current.version != version, timeout)
+
+    def _notify(self, event: str, snapshot: dict):
+        for callback in self._listeners:
+            try:
+                callback(event, snapshot)
+            except Exception as e:
+                logger.debug(f"WebDataStore 监听回调出错: {e}")
+
+    def _build(self, data: dict) -> StoreSnapshot:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        version = data["version"]
+        return StoreSnapshot(version, data["reading_seq"], data, body, self.etag(version),
+                             b"id: %d\ndata: %s\n\n" % (version, body))
+
+    def _publish(self, data: dict) -> StoreSnapshot:
+        """发布新快照并唤醒长轮询（需持有 _lock）"""
+        snapshot = self._current = self._build(data)
+        self._changed.notify_all()
+        return snapshot
+
+    def update_reading(self, reading: BloodPressureReading):
+        with self._lock:
+            self._last_update = time.monotonic()
+            previous = self._current.data
+            entry = {
+                "seq": previous["reading_seq"] + 1,
+                "sys": reading.systolic,
+                "dia": reading.diastolic,
+                "pulse": reading.pulse,
+                "timestamp": reading.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            self._history.append(entry)
+            data = dict(previous)
+            data.update(
+                {
+                    "sys": entry["sys"],
+                    "dia": entry["dia"],
+                    "pulse": entry["pulse"],
+                    "timestamp": entry["timestamp"],
+                    "version": previous["version"] + 1,
+                    "reading_seq": entry["seq"],
+                }
+            )
+            # 发布前记录，Web 线程拿到新快照时即可标记 served
+            self._trace, self._trace_seq = reading.trace, entry["seq"]
+            tracing.stamp(reading.trace, "published")
+            snapshot = self._publish(data)
+        self._notify("reading", snapshot.data)
+
+    def mark_served(self, reading_seq: int):
+        """Web 接口把 reading_seq 对应的数据发给客户端时调用，第一次发送最新读数时记录 served 阶段"""
+        trace = self._trace
+        if trace is not None and reading_seq == self._trace_seq:
+            self._trace = None
+            tracing.stamp(trace, "served")
+
+    def set_status(self, status: str):
+        with self._lock:
+            previous = self._current.data
+            if previous["status"] == status:
+                return
+            data = dict(previous)
+            data["status"] = status
+            data["version"] = previous["version"] + 1
+            snapshot = self._publish(data)
+        self._notify("status", snapshot.data)
+
+    def current(self) -> StoreSnapshot:
+        """当前快照（不加锁）"""
+        return self._current
+
+    def snapshot(self) -> dict:
+        """当前数据（不加锁、不复制），返回的字典与其它线程共享，不要修改"""
+        return self._current.data
+
+    def history_since(self, seq: int, boot: Optional[str] = None) -> dict:
+        """
+        reading_seq 大于 seq 的读数（最多 history_size 条）
+        boot 与本次启动不同时（A端已重启，序号重新计数）忽略 seq，返回全部保留的读数
+        """
+        if boot is not None and boot != self._boot:
+            seq = 0
+        with self._lock:
+            readings = [entry for entry in self._history if entry["seq"] > seq]
+            latest = self._current.reading_seq
+        return {"boot": self._boot, "seq": latest, "readings": readings}
+
+    def seconds_since_update(self) -> Optional[float]:
+        """距上一次收到读数的秒数，尚无读数时返回 None"""
+        last = self._last_update
+        return None if last is None else round(time.monotonic() - last, 3)
+
+
+# ============== 读数历史（趋势图数据） ==============
+class HistoryStore:
+    """
+    读数历史：追加写入 CSV，重启后趋势图仍可回看以前的数据
+    内存中按时间顺序保存为几列数组（不放入界面控件），按时间范围查询用二分查找
+    文件在第一次需要时才读取（load），之前的新读数只写文件
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.times: List[float] = []   # epoch 秒
+        self.sys: List[int] = []
+        self.dia: List[int] = []
+        self.pulse: List[int] = []
+        self.loaded = False
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        hour_starts = {}  # "YYYY-MM-DD HH" -> 该小时起点的 epoch 秒
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ts, sys_val, dia_val, pulse = line.rstrip("\n").split(",")
+                        # 按固定格式切片解析，每小时只做一次 mktime，比逐行 strptime 快得多（一年约几万行）
+                        hour_start = hour_starts.get(ts[:13])
+                        if hour_start is None:
+                            hour_start = hour_starts[ts[:13]] = time.mktime(
+                                (int(ts[0:4]), int(ts[5:7]), int(ts[8:10]), int(ts[11:13]), 0, 0, 0, 0, -1))
+                        t = hour_start + int(ts[14:16]) * 60 + int(ts[17:19])
+                        self._add(t, int(sys_val), int(dia_val), int(pulse))
+                    except (ValueError, OverflowError):
+                        continue
+        except OSError:
+            pass
+        logger.info(f"读数历史已加载: {len(self.times)} 条")
+
+    def _add(self, t: float, sys_val: int, dia_val: int, pulse: int):
+        if self.times and t < self.times[-1]:
+            # 系统时间被调回等情况下保持有序
+            index = bisect.bisect_right(self.times, t)
+            self.times.insert(index, t)
+            self.sys.insert(index, sys_val)
+            self.dia.insert(index, dia_val)
+            self.pulse.insert(index, pulse)
+            return
+        self.times.append(t)
+        self.sys.append(sys_val)
+        self.dia.append(dia_val)
+        self.pulse.append(pulse)
+
+    def append(self, reading: BloodPressureReading, persist: bool = True):
+        """persist=False 时只加入内存（模拟数据不写入历史文件）"""
+        self.append_many((reading,), persist)
+
+    def append_many(self, readings: Sequence[BloodPressureReading], persist: bool = True):
+        """一次写入多条读数：只打开文件、写入一次"""
+        if persist:
+            self.persist(readings)
+        if self.loaded:
+            for r in readings:
+                self._add(r.timestamp.timestamp(), r.systolic, r.diastolic, r.pulse)
+
+    def persist(self, readings: Sequence[BloodPressureReading]):
+        """只追加写入文件、不加入内存（图形界面在后台线程写文件，内存中的数据由界面线程添加）"""
+        if not readings:
+            return
+        lines = "".join(f"{r.timestamp.strftime('%Y-%m-%d %H:%M:%S')},{r.systolic},{r.diastolic},{r.pulse}\n"
+                        for r in readings)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.error(f"写入读数历史失败: {e}")
+
+    def range_indexes(self, t0: float, t1: float) -> Tuple[int, int]:
+        """时间范围 [t0, t1] 对应的下标区间 [lo, hi)，两端各多带一个点，折线可画到边界之外"""
+        lo = max(0, bisect.bisect_left(self.times, t0) - 1)
+        hi = min(len(self.times), bisect.bisect_right(self.times, t1) + 1)
+        return lo, hi
+
+
+def downsample_minmax(xs: List[float], ys: List[int], lo: int, hi: int,
+                      x0: float, x1: float, buckets: int) -> List[Tuple[float, int]]:
+    """
+    min/max 分桶降采样：把 [x0, x1] 分为 buckets 个桶（约每像素一个），每桶只保留最小值和最大值两点，
+    一年的读数也只需画约 2×宽度 个点，且不会丢失单次异常高/低的读数
+    点数本来就不多时原样返回
+    """
+    if hi - lo <= buckets * 2:
+        return [(xs[i], ys[i]) for i in range(lo, hi)]
+    width = (x1 - x0) / buckets
+    points: List[Tuple[float, int]] = []
+    bucket = None
+    min_i = max_i = lo
+    for i in range(lo, hi):
+        b = int((xs[i] - x0) // width)
+        if b != bucket:
+            if bucket is not None:
+                for j in sorted({min_i, max_i}):
+                    points.append((xs[j], ys[j]))
+            bucket = b
+            min_i = max_i = i
+        elif ys[i] < ys[min_i]:
+            min_i = i
+        elif ys[i] > ys[max_i]:
+            max_i = i
+    for j in sorted({min_i, max_i}):
+        points.append((xs[j], ys[j]))
+    return points
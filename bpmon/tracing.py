@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+读数的端到端延迟追踪：从串口读到字节到 Web 客户端拿到数据，每个阶段记录一个 time.perf_counter() 时间戳，
+并按阶段累计两个直方图（/metrics、/latency 与 GUI 日志输出）：
+    bp_reading_stage_seconds    与上一阶段的间隔
+    bp_reading_latency_seconds  从 read 起的累计耗时
+"""
+
+import time
+from typing import Dict, Optional
+
+from .metrics import METRICS
+
+# 阶段（按先后顺序）：
+#   read       读到该帧第一段字节（SerialConnection._read_loop / 模拟器）
+#   framed     LineFramer 切出完整的帧
+#   parsed     DataParser 解析完成
+#   queued     放入 GUI 的 data_queue（无界面模式没有这一阶段）
+#   published  写入 WebDataStore（事件总线 web 订阅者，与 queued 并行）
+#   rendered   GUI _update_display 显示完成
+#   served     第一次作为 /data、长轮询或 SSE 响应发给 Web 客户端（响应已生成，尚未写出）
+STAGES = ("read", "framed", "parsed", "queued", "published", "rendered", "served")
+STAGE_NAMES = {
+    "read": "读取", "framed": "分帧", "parsed": "解析", "queued": "入队",
+    "published": "发布", "rendered": "显示", "served": "发送",
+}
+
+# 每个阶段的上一阶段（按顺序取第一个存在的）；queued → rendered（界面）与 published → served（Web）
+# 是 parsed 之后由事件总线不同订阅者并行处理的两个分支
+PREDECESSORS = {
+    "framed": ("read",),
+    "parsed": ("framed", "read"),
+    "queued": ("parsed",),
+    "published": ("parsed",),
+    "rendered": ("queued",),
+    "served": ("published",),
+}
+
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+METRICS.histogram("bp_reading_stage_seconds", "读数各阶段与上一阶段的间隔（按阶段）", BUCKETS)
+METRICS.histogram("bp_reading_latency_seconds", "读数从串口读到字节到各阶段的累计耗时（按阶段）", BUCKETS)
+
+
+def stamp(trace: Optional[dict], stage: str, now: float = None):
+    """记录阶段时间戳并更新直方图；同一阶段只记录第一次，没有追踪信息（trace 为 None）时忽略"""
+    if trace is None or stage in trace:
+        return
+    if now is None:
+        now = time.perf_counter()
+    trace[stage] = now
+    labels = (("stage", stage),)
+    for previous in PREDECESSORS.get(stage, ()):
+        if previous in trace:
+            METRICS.observe("bp_reading_stage_seconds", now - trace[previous], labels)
+            break
+    start = trace.get("read")
+    if start is not None and stage != "read":
+        METRICS.observe("bp_reading_latency_seconds", now - start, labels)
+
+
+def summary() -> Dict[str, dict]:
+    """
+    各阶段延迟摘要（毫秒）：
+        {阶段: {"count", "stage_mean", "stage_p50", "stage_p95", "total_p50", "total_p95", "total_p99"}}
+    百分位由直方图分桶估算
+    """
+    stage_hist = METRICS.summarize("bp_reading_stage_seconds")
+    total_hist = METRICS.summarize("bp_reading_latency_seconds")
+    result = {}
+    for stage in STAGES[1:]:
+        labels = (("stage", stage),)
+        step = stage_hist.get(labels)
+        total = total_hist.get(labels)
+        if not step and not total:
+            continue
+        entry = {"count": (step or total)["count"]}
+        if step:
+            entry.update(stage_mean=round(step["mean"] * 1000, 3), stage_p50=round(step["p50"] * 1000, 3),
+                         stage_p95=round(step["p95"] * 1000, 3))
+        if total:
+            entry.update(total_p50=round(total["p50"] * 1000, 3), total_p95=round(total["p95"] * 1000, 3),
+                         total_p99=round(total["p99"] * 1000, 3))
+        result[stage] = entry
+    return result
+
+
+def format_summary(stats: Dict[str, dict]) -> str:
+    """一行文字的延迟摘要（GUI 日志 / 无界面模式日志）"""
+    parts = []
+    for stage, entry in stats.items():
+        if "stage_p50" in entry:
+            parts.append(f"{STAGE_NAMES[stage]} {entry['stage_p50']:.2f}/{entry['stage_p95']:.2f}")
+    text = "各阶段 p50/p95 (ms): " + "  ".join(parts)
+    for stage in ("rendered", "served"):
+        entry = stats.get(stage)
+        if entry and "total_p50" in entry:
+            text += (f"  | 读取→{STAGE_NAMES[stage]} p50 {entry['total_p50']:.1f}ms"
+                     f" p95 {entry['total_p95']:.1f}ms")
+    return text
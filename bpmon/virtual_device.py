@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+虚拟 HBP-9030（Linux / macOS）：创建一对伪终端（pty），在设备端发送模拟、脚本或录制的数据，
+程序端像打开 /dev/ttyUSB0 一样用 SerialConnection 打开从设备（如 /dev/pts/3），
+不需要血压计即可做 串口 -> DataParser -> WebDataStore -> HTTP 的端到端测试与基准测试
+
+    python -m bpmon.virtual_device --rate 100 --link /tmp/ttyHBP
+    python bp_monitor.py --headless --serial-port /tmp/ttyHBP
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .ingest import Simulator
+from .log import logger
+
+# 发送计划：(距开始发送的秒数, 字节)
+Traffic = Iterable[Tuple[float, bytes]]
+
+# bp_monitor.log 中 SerialConnection 记录的原始数据（DEBUG 级别）
+CAPTURE_LINE = re.compile(
+    r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) - DEBUG - 收到 \d+ 字节: ([0-9a-f]*) \|"
+)
+
+
+def simulated_traffic(rate: float, count: int = None, simulator: Simulator = None) -> Iterator[Tuple[float, bytes]]:
+    """
+    模拟器生成的数据：每秒 rate 帧，count 为 None 时不停发送
+    分段、行结束符、损坏帧等由 simulator 的设置决定
+    """
+    simulator = simulator or Simulator()
+    index = 0
+    while count is None or index < count:
+        frame = simulator.generate_stream(1)
+        for chunk in simulator.fragment(frame):
+            yield index / rate, chunk
+        index += 1
+
+
+def script_traffic(path: str) -> List[Tuple[float, bytes]]:
+    """
+    脚本文件（UTF-8 文本），每行一条：
+        2026,10,19,08,30,...     数据帧，自动加 CR LF 发送
+        sleep 1.5                等待（秒）
+        raw 32303236 2c          按十六进制发送原始字节（可含空格，不加行结束符）
+        # 注释 / 空行             忽略
+    """
+    traffic = []
+    offset = 0.0
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            command, _, argument = line.partition(" ")
+            try:
+                if command == "sleep":
+                    offset += float(argument)
+                elif command == "raw":
+                    traffic.append((offset, bytes.fromhex(argument)))
+                else:
+                    traffic.append((offset, line.encode("ascii") + b"\r\n"))
+            except ValueError as e:
+                raise ValueError(f"{path} 第 {number} 行无效: {e}") from None
+    return traffic
+
+
+def capture_traffic(path: str, speed: float = 1.0) -> List[Tuple[float, bytes]]:
+    """
+    从 bp_monitor.log 中提取串口收到的原始数据（需要 DEBUG 级别日志），按原来的时间间隔回放
+    speed > 1 时加快回放
+    """
+    traffic = []
+    first = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = CAPTURE_LINE.match(line)
+            if not match:
+                continue
+            when = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S,%f").timestamp()
+            if first is None:
+                first = when
+            traffic.append(((when - first) / speed, bytes.fromhex(match.group(2))))
+    if not traffic:
+        raise ValueError(f"{path} 中没有找到串口原始数据记录（需要 DEBUG 级别日志）")
+    return traffic
+
+
+class VirtualHBP9030:
+    """
+    伪终端上的虚拟血压计
+    open() 后 port 为程序端要打开的设备路径；play() 在后台线程按计划写入设备端
+    baudrate > 0 时按 10 位/字节限制发送速度（模拟真实串口线速），0 表示不限速
+    """
+
+    def __init__(self, link: str = None, baudrate: int = 0,
+                 on_write: Callable[[bytes, float], None] = None):
+        self.link = link
+        self.baudrate = baudrate
+        self.on_write = on_write  # 每写入一段后调用 (数据, time.perf_counter())
+        self.port: Optional[str] = None
+        self.master_fd: Optional[int] = None
+        self.slave_fd: Optional[int] = None
+        self.bytes_written = 0
+        self.thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def open(self) -> str:
+        """创建伪终端，返回从设备路径（指定了 link 时为符号链接路径）"""
+        import tty
+        self.master_fd, self.slave_fd = os.openpty()
+        # 关闭行规程的换行转换与回显，CR/LF 原样到达程序端；
+        # 设备端一直持有从设备，程序端断开重连时不会出现 EIO
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        if self.link:
+            if os.path.islink(self.link):
+                os.unlink(self.link)
+            os.symlink(self.port, self.link)
+            logger.info(f"虚拟血压计: {self.link} -> {self.port}")
+            return self.link
+        logger.info(f"虚拟血压计: {self.port}")
+        return self.port
+
+    def close(self):
+        self.stop()
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                os.close(fd)
+        self.master_fd = self.slave_fd = None
+        if self.link and os.path.islink(self.link):
+            os.unlink(self.link)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def play(self, traffic: Traffic):
+        """在后台线程发送数据，发送完毕后线程结束（见 wait）"""
+        self.stop()
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._play, args=(traffic,), daemon=True)
+        self.thread.start()
+
+    def wait(self, timeout: float = None) -> bool:
+        """等待发送完毕，返回是否已结束"""
+        if self.thread:
+            self.thread.join(timeout)
+            return not self.thread.is_alive()
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+
+    def _play(self, traffic: Traffic):
+        started = time.perf_counter()
+        wire_free = started
+        try:
+            for offset, data in traffic:
+                delay = max(started + offset, wire_free) - time.perf_counter()
+                if delay > 0 and self._stop_event.wait(delay):
+                    return
+                if self._stop_event.is_set() or not self._write(data):
+                    return
+                now = time.perf_counter()
+                if self.baudrate:
+                    wire_free = now + len(data) * 10 / self.baudrate
+                if self.on_write:
+                    self.on_write(data, now)
+        except OSError as e:
+            logger.error(f"虚拟血压计写入失败: {e}")
+
+    def _write(self, data: bytes) -> bool:
+        """写入设备端；程序端读得慢、缓冲区满时等待（可被 stop 打断）"""
+        import select
+        view = memoryview(data)
+        while view:
+            _, writable, _ = select.select([], [self.master_fd], [], 0.2)
+            if self._stop_event.is_set():
+                return False
+            if writable:
+                view = view[os.write(self.master_fd, view):]
+        self.bytes_written += len(data)
+        return True
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口：python -m bpmon.virtual_device --help"""
+    import argparse
+    from .app import _line_endings
+    from .log import setup_logging
+
+    parser = argparse.ArgumentParser(description="伪终端上的虚拟 HBP-9030（Linux / macOS）")
+    parser.add_argument("--link", help="在该路径创建指向从设备的符号链接，如 /tmp/ttyHBP")
+    parser.add_argument("--baudrate", type=int, default=0, help="按该波特率限制发送速度，默认不限速")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--script", help="按脚本文件发送（格式见 script_traffic）")
+    source.add_argument("--replay", help="回放 bp_monitor.log 中记录的串口原始数据（DEBUG 级别）")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放速度倍数")
+    parser.add_argument("--rate", type=float, default=1.0, help="模拟数据速率（帧/秒）")
+    parser.add_argument("--count", type=int, help="模拟数据帧数，默认不停发送")
+    parser.add_argument("--max-chunk", type=int, default=0, help="随机切成不超过该长度的分段")
+    parser.add_argument("--line-endings", type=_line_endings, help="行结束符：crlf,cr,lf")
+    parser.add_argument("--corrupt-ratio", type=float, default=0.0, help="损坏帧比例（0~1）")
+    parser.add_argument("--devices", type=int, default=1, help="设备 ID 数量")
+    parser.add_argument("--loop", action="store_true", help="脚本 / 回放结束后从头重复")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    if args.script or args.replay:
+        traffic = script_traffic(args.script) if args.script else capture_traffic(args.replay, args.speed)
+        if args.loop:
+            traffic = _repeat(traffic, traffic[-1][0] + 1.0)
+    else:
+        simulator = Simulator(line_endings=args.line_endings, max_chunk=args.max_chunk,
+                              corrupt_ratio=args.corrupt_ratio, device_count=args.devices)
+        traffic = simulated_traffic(args.rate, args.count, simulator)
+
+    with VirtualHBP9030(link=args.link, baudrate=args.baudrate) as device:
+        import signal
+        signal.signal(signal.SIGTERM, lambda *_args: device.stop())
+        print(f"PORT {device.link or device.port}", flush=True)
+        device.play(traffic)
+        try:
+            while not device.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+        logger.info(f"虚拟血压计已停止，共发送 {device.bytes_written} 字节")
+
+
+def _repeat(traffic: List[Tuple[float, bytes]], period: float) -> Iterator[Tuple[float, bytes]]:
+    rounds = 0
+    while True:
+        for offset, data in traffic:
+            yield rounds * period + offset, data
+        rounds += 1
+
+
+if __name__ == "__main__":
+    main()
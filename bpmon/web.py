@@ -0,0 +1,735 @@
+# -*- coding: utf-8 -*-
+"""
+内网 Web 展示服务（标准库实现，无需 Flask）
+高并发模式（WEB_SERVER_MODE = "async"）的 AsyncHTTPServer 在 web_async 中，启动时才导入 asyncio
+"""
+
+import base64
+import hashlib
+import hmac
+import http.server
+import json
+import os
+import socket
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from . import config, tracing
+from .log import logger
+from .metrics import METRICS
+from .storage import WebDataStore
+
+if TYPE_CHECKING:
+    # web_async 导入了本模块，运行时导入会循环
+    from .web_async import AsyncHTTPServer
+
+
+def has_header(headers: List[Tuple[str, str]], name: str) -> bool:
+    """响应头列表中是否已有 name（不区分大小写）"""
+    name = name.lower()
+    return any(header.lower() == name for header, _ in headers)
+
+
+class SessionTokenManager:
+    """
+    签发与校验会话令牌（HMAC-SHA256 签名，带过期时间）
+    令牌格式: <过期时间戳>.<随机数>.<签名>；密钥每次启动随机生成，重启后旧令牌自动失效
+    已校验通过的令牌缓存在内存中，高频轮询时只需一次字典查找
+    """
+
+    CACHE_SIZE = 1024
+
+    def __init__(self, ttl: float, secret: bytes = None):
+        self.ttl = ttl
+        self._secret = secret or os.urandom(32)
+        self._verified: dict = {}  # token -> 过期时间戳
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._secret, payload.encode("ascii"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+    def issue(self) -> str:
+        """签发新令牌"""
+        expires = int(time.time() + self.ttl)
+        payload = f"{expires}.{os.urandom(9).hex()}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token: str) -> bool:
+        """校验令牌签名与有效期（常量时间比较签名）"""
+        now = time.time()
+        expires = self._verified.get(token)
+        if expires is not None:
+            if expires > now:
+                return True
+            self._verified.pop(token, None)
+            return False
+
+        if not token.isascii():
+            # 令牌来自请求头 / Cookie，非 ASCII 字符无法参与签名计算，直接拒绝
+            return False
+        payload, sep, signature = token.rpartition(".")
+        if not sep:
+            return False
+        if not hmac.compare_digest(signature.encode("ascii"), self._sign(payload).encode("ascii")):
+            return False
+        try:
+            expires = int(payload.split(".", 1)[0])
+        except ValueError:
+            return False
+        if expires <= now:
+            return False
+
+        if len(self._verified) >= self.CACHE_SIZE:
+            # 缓存满时清空即可，下次请求重新计算一次 HMAC
+            self._verified.clear()
+        self._verified[token] = expires
+        return True
+
+
+class BPWebServer:
+    """内网 Web 展示服务（标准库实现，无需 Flask）"""
+
+    HTML_TEMPLATE = """
+<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1" />
+  <title>血压实时监控</title>
+  <style>
+    /* 基础样式：取消滚动条，背景深色 */
+    body { 
+        font-family: Arial, sans-serif; 
+        background:#0b1020; 
+        color:#fff; 
+        margin:0; 
+        overflow: hidden; /* 防止出现滚动条 */
+    }
+    
+    /* 容器：针对 500x400 视窗优化，减小边距 */
+    .wrap { 
+        width: 100%; 
+        box-sizing: border-box; /* 确保padding不撑大宽度 */
+        padding: 20px; 
+    }
+
+    /* 标题与状态栏：字体调小，节省垂直空间 */
+    .header-row {
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        margin-bottom: 15px;
+    }
+    .title { font-size: 16px; opacity: .9; font-weight: bold; }
+    .status-line { font-size: 12px; opacity: .6; text-align: right; }
+
+    /* 网格布局：3列等宽 */
+    .grid { 
+        display: grid; 
+        grid-template-columns: repeat(3, 1fr); 
+        gap: 10px; 
+    }
+
+    /* 卡片样式：紧凑型 */
+    .card { 
+        background:#16213e; 
+        border-radius: 8px; 
+        padding: 12px 5px; 
+        text-align: center; 
+        display: flex;
+        flex-direction: column;
+        justify-content: center;
+    }
+
+    /* 标签：小字体 */
+    .label { font-size: 12px; opacity: .6; margin-bottom: 5px; text-transform: uppercase; }
+
+    /* 数值：大字体但适中，确保一行放下 */
+    .val { 
+        font-size: 42px; 
+        font-weight: 700; 
+        line-height: 1.1;
+    }
+
+    /* 页脚：极小 */
+    .footer { margin-top: 15px; font-size: 10px; opacity: .4; text-align: center; }
+  </style>
+  <script>
+    function render(d) {
+        document.getElementById('sys').innerText = d.sys ?? '--';
+        document.getElementById('dia').innerText = d.dia ?? '--';
+        document.getElementById('pulse').innerText = d.pulse ?? '--';
+        
+        // 更新时间与状态
+        document.getElementById('ts').innerText = d.timestamp ? d.timestamp.split(' ')[1] : '--:--'; // 只显示时分秒
+        
+        const statusElem = document.getElementById('status');
+        statusElem.innerText = d.status ?? '未知';
+        statusElem.style.color = d.status === '已连接' ? '#4ecca3' : '#ff6b6b';
+    }
+
+    function showOffline() {
+        document.getElementById('status').innerText = '断开';
+        document.getElementById('status').style.color = '#ff6b6b';
+    }
+
+    async function refresh() {
+      try {
+        const r = await fetch('/data', {cache: 'no-store'});
+        render(await r.json());
+      } catch (e) {
+        showOffline();
+      }
+    }
+
+    // 优先使用服务端推送（SSE），浏览器不支持时退回每秒轮询
+    window.addEventListener('load', function () {
+      if (window.EventSource) {
+        const es = new EventSource('/events');
+        es.onmessage = function (e) { render(JSON.parse(e.data)); };
+        es.onerror = showOffline;  // EventSource 会自动重连
+      } else {
+        refresh();
+        setInterval(refresh, 1000);
+      }
+    });
+  </script>
+</head>
+<body>
+  <div class="wrap">
+    
+    <!-- 顶部标题栏 -->
+    <div class="header-row">
+        <div class="title">HBP-9030</div>
+        <div class="status-line">
+            <span id="status">连接中...</span> <br>
+            <span id="ts">--:--:--</span>
+        </div>
+    </div>
+
+    <!-- 数据展示区：三列并排 -->
+    <div class="grid">
+      <!-- 收缩压 -->
+      <div class="card">
+        <div class="label">SYS</div>
+        <div class="val" style="color:#e94560;"><span id="sys">--</span></div>
+      </div>
+      
+      <!-- 舒张压 -->
+      <div class="card">
+        <div class="label">DIA</div>
+        <div class="val" style="color:#ff6b6b;"><span id="dia">--</span></div>
+      </div>
+      
+      <!-- 心率 -->
+      <div class="card">
+        <div class="label">PULSE</div>
+        <div class="val" style="color:#4ecca3;"><span id="pulse">--</span></div>
+      </div>
+    </div>
+
+    <div class="footer">IP: <script>document.write(location.hostname)</script></div>
+  </div>
+</body>
+</html>
+""".strip()
+
+    def __init__(self, data_store: WebDataStore, host: str, port: int,
+                 mode: str = None, max_connections: int = None, keepalive_timeout: float = None):
+        self.data_store = data_store
+        self.host = host
+        self.port = port
+        self.mode = mode or config.WEB_SERVER_MODE
+        self.max_connections = max_connections or config.WEB_MAX_CONNECTIONS
+        self.keepalive_timeout = keepalive_timeout or config.WEB_KEEPALIVE_TIMEOUT
+        self._httpd = None
+        self._async_server: Optional["AsyncHTTPServer"] = None
+        self._thread: Optional[threading.Thread] = None
+        self.sessions = SessionTokenManager(config.WEB_SESSION_TTL)
+        self._basic_verified: dict = {}  # 已校验通过的 Basic 认证头 -> 当时的密码
+        self.is_running = False
+
+        METRICS.gauge("bp_http_active_connections", "当前活动的 HTTP 连接数", self.active_connections)
+        METRICS.gauge("bp_seconds_since_last_reading", "距上一次收到血压读数的秒数",
+                      self.data_store.seconds_since_update)
+
+    @staticmethod
+    def _best_effort_local_ip() -> str:
+        """尝试获取本机内网IP（用于日志提示），失败则返回127.0.0.1"""
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.connect(("8.8.8.8", 80))
+            ip = s.getsockname()[0]
+            s.close()
+            return ip
+        except Exception:
+            return "127.0.0.1"
+
+    @property
+    def server_port(self) -> int:
+        """实际监听的端口（port=0 时由系统分配）"""
+        if self._httpd:
+            return self._httpd.server_address[1]
+        if self._async_server:
+            return self._async_server.port
+        return self.port
+
+    def active_connections(self) -> Optional[int]:
+        """当前活动连接数"""
+        if self._httpd:
+            return self._httpd.active_connections
+        if self._async_server:
+            return self._async_server.active_connections
+        return None
+
+    def start(self) -> bool:
+        """启动 Web 服务（后台线程）"""
+        try:
+            if self.mode == "async":
+                from .web_async import AsyncHTTPServer
+                self._async_server = AsyncHTTPServer(
+                    self, self.host, self.port, self.max_connections, self.keepalive_timeout
+                )
+                self._async_server.start()
+            else:
+                Handler = self._make_handler()
+                self._httpd = LimitedThreadingHTTPServer(
+                    (self.host, self.port), Handler, max_connections=self.max_connections
+                )
+                self._httpd.data_store = self.data_store  # type: ignore[attr-defined]
+
+                self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+                self._thread.start()
+
+            self.is_running = True
+            ip = self._best_effort_local_ip()
+            logger.info(f"Web服务已启动: http://{ip}:{self.server_port}/ （院内网可访问，模式: {self.mode}）")
+            logger.info("若无法访问，请检查 Windows 防火墙是否允许该端口入站。")
+            return True
+        except OSError as e:
+            logger.warning(f"Web服务启动失败（端口可能被占用/无权限）: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Web服务启动失败: {e}", exc_info=True)
+            return False
+
+    def stop(self):
+        """停止 Web 服务"""
+        self.is_running = False
+        try:
+            if self._async_server:
+                self._async_server.stop()
+            if self._httpd:
+                self._httpd.shutdown()
+                self._httpd.server_close()
+            if self._thread and self._thread.is_alive():
+                self._thread.join(timeout=2.0)
+        except Exception as e:
+            logger.debug(f"停止Web服务时出错: {e}")
+
+    # ---------- 与服务器实现无关的请求处理 ----------
+    @staticmethod
+    def _check_password(password: str) -> bool:
+        """常量时间比较密码，避免时序泄露"""
+        return hmac.compare_digest(password.encode("utf-8"), config.WEB_AUTH_PASSWORD.encode("utf-8"))
+
+    @classmethod
+    def _basic_auth_password(cls, headers) -> Optional[str]:
+        """从 Basic 认证头中取出密码，格式不正确返回 None"""
+        auth = headers.get("Authorization", "")
+        if not auth.startswith("Basic "):
+            return None
+        try:
+            raw = base64.b64decode(auth.split(" ", 1)[1].strip()).decode("utf-8", errors="ignore")
+            # raw format: username:password
+            if ":" not in raw:
+                return None
+            return raw.split(":", 1)[1]
+        except Exception:
+            return None
+
+    def _session_token(self, headers) -> Optional[str]:
+        """从 Bearer 认证头或 Cookie 中取出会话令牌"""
+        auth = headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            return auth[7:].strip()
+        cookie_header = headers.get("Cookie")
+        if cookie_header and config.WEB_SESSION_COOKIE in cookie_header:
+            try:
+                morsel = SimpleCookie(cookie_header).get(config.WEB_SESSION_COOKIE)
+            except Exception:
+                return None
+            if morsel:
+                return morsel.value
+        return None
+
+    def _authorize(self, headers) -> Tuple[bool, Optional[str]]:
+        """
+        校验请求，返回 (是否通过, 需要下发的新会话令牌)
+        优先校验会话令牌（HMAC + 缓存，开销极小），其次才解码 Basic 认证
+        只在请求没有携带有效会话、且 Basic 认证头第一次校验通过时签发新令牌
+        """
+        if not config.WEB_AUTH_ENABLED:
+            return True, None
+        token = self._session_token(headers)
+        if token and self.sessions.verify(token):
+            return True, None
+        auth = headers.get("Authorization", "")
+        if auth and self._basic_verified.get(auth) == config.WEB_AUTH_PASSWORD:
+            # 不保存 Cookie 的客户端每次都带同一个 Basic 认证头：只需一次字典查找，不再签发令牌
+            return True, None
+        password = self._basic_auth_password(headers)
+        if password is not None and self._check_password(password):
+            if len(self._basic_verified) >= SessionTokenManager.CACHE_SIZE:
+                self._basic_verified.clear()
+            self._basic_verified[auth] = config.WEB_AUTH_PASSWORD
+            # 请求中没有有效会话：下发 Cookie，浏览器后续请求只需校验令牌
+            return True, self.sessions.issue()
+        return False, None
+
+    def _session_cookie(self, token: str) -> Tuple[str, str]:
+        return (
+            "Set-Cookie",
+            f"{config.WEB_SESSION_COOKIE}={token}; Max-Age={int(self.sessions.ttl)}; Path=/; HttpOnly; SameSite=Strict",
+        )
+
+    def _handle_login(self, headers, body: bytes) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """
+        POST /login：校验密码并签发会话令牌
+        密码可通过 Basic 认证头、JSON {"password": ...} 或表单 password=... 提交
+        """
+        password = self._basic_auth_password(headers)
+        if password is None and body:
+            content_type = headers.get("Content-Type", "")
+            try:
+                if content_type.startswith("application/json"):
+                    password = str(json.loads(body.decode("utf-8")).get("password", ""))
+                else:
+                    password = parse_qs(body.decode("utf-8")).get("password", [""])[0]
+            except (ValueError, AttributeError):
+                password = None
+
+        if config.WEB_AUTH_ENABLED and (password is None or not self._check_password(password)):
+            return 401, [("Content-Type", "application/json; charset=utf-8")], b'{"error": "invalid password"}'
+
+        token = self.sessions.issue()
+        payload = {"token": token, "expires_in": int(self.sessions.ttl)}
+        return (
+            200,
+            [("Content-Type", "application/json; charset=utf-8"), self._session_cookie(token)],
+            json.dumps(payload).encode("utf-8"),
+        )
+
+    def _handle_profile(self, method: str, path: str, headers) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """
+        /admin/profile：现场性能分析（见 profiling.py），使用单独的管理员密码（Basic 认证，用户名任意）
+            GET                                                   当前状态与结果文件
+            POST ?action=start[&seconds=30][&cpu=1][&memory=1]    开始一个窗口
+            POST ?action=stop                                     提前结束，结果由后台线程写出
+        POST 只通知分析线程、立即返回 202（asyncio 模式下在事件循环线程处理，不能等待），之后 GET 查看结果文件
+        未设置 ADMIN_PASSWORD 时返回 404
+        """
+        from .profiling import PROFILER
+        json_header = ("Content-Type", "application/json; charset=utf-8")
+        if not PROFILER.enabled():
+            return 404, [("Content-Type", "text/plain; charset=utf-8")], b"Not Found"
+        password = self._basic_auth_password(headers)
+        if password is None or not PROFILER.check_password(password):
+            return (
+                401,
+                [("WWW-Authenticate", 'Basic realm="BP Monitor Admin"'), ("Content-Type", "text/plain; charset=utf-8")],
+                b"Unauthorized",
+            )
+
+        code = 200
+        if method == "POST":
+            code = 202
+            params = parse_qs(path.partition("?")[2])
+            action = params.get("action", [""])[0]
+            if action == "start":
+                try:
+                    seconds = float(params.get("seconds", ["0"])[0])
+                except ValueError:
+                    return 400, [json_header], b'{"error": "invalid seconds"}'
+                cpu = params.get("cpu", ["1"])[0] not in ("0", "false", "no")
+                memory = params.get("memory", ["1"])[0] not in ("0", "false", "no")
+                if not (cpu or memory):
+                    return 400, [json_header], b'{"error": "nothing to profile"}'
+                if not PROFILER.start(seconds, cpu=cpu, memory=memory):
+                    return 409, [json_header], b'{"error": "already running"}'
+            elif action == "stop":
+                if not PROFILER.stop():
+                    return 409, [json_header], b'{"error": "not running"}'
+            else:
+                return 400, [json_header], b'{"error": "action must be start or stop"}'
+        elif method != "GET":
+            return 405, [("Allow", "GET, POST"), ("Content-Type", "text/plain; charset=utf-8")], b"Method Not Allowed"
+
+        body = json.dumps(PROFILER.status(), ensure_ascii=False).encode("utf-8")
+        return code, [json_header, ("Cache-Control", "no-store")], body
+
+    # 指标中的 path 标签只使用已知路径，避免任意 URL 造成标签数量无限增长
+    METRIC_PATHS = ("/", "/admin/profile", "/data", "/events", "/history", "/latency", "/login", "/metrics")
+
+    def handle_request(self, method: str, path: str, headers,
+                       body: bytes = b"") -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """
+        处理一个请求，返回 (状态码, 响应头列表, 响应体)
+        线程模式与 asyncio 模式共用此方法，保证两种模式行为一致
+        """
+        started = time.perf_counter()
+        code, resp_headers, resp_body = self._handle_request(method, path, headers, body)
+
+        route = path.split("?", 1)[0]
+        if route not in self.METRIC_PATHS:
+            route = "other"
+        METRICS.inc("bp_http_requests_total", labels=(("path", route), ("code", str(code))))
+        METRICS.observe("bp_http_request_duration_seconds", time.perf_counter() - started,
+                        labels=(("path", route),))
+        return code, resp_headers, resp_body
+
+    def _handle_request(self, method: str, path: str, headers,
+                        body: bytes) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        route = path.split("?", 1)[0]
+        if route == "/admin/profile":
+            return self._handle_profile(method, path, headers)
+
+        if route == "/login":
+            if method != "POST":
+                return 405, [("Allow", "POST"), ("Content-Type", "text/plain; charset=utf-8")], b"Method Not Allowed"
+            return self._handle_login(headers, body)
+
+        authorized, new_token = self._authorize(headers)
+        if not authorized:
+            return (
+                401,
+                [
+                    ("WWW-Authenticate", 'Basic realm="BP Monitor"'),
+                    ("Content-Type", "text/plain; charset=utf-8"),
+                ],
+                "Unauthorized".encode("utf-8"),
+            )
+
+        code, resp_headers, resp_body = self._route(method, path, headers)
+        if new_token:
+            resp_headers = resp_headers + [self._session_cookie(new_token)]
+        return code, resp_headers, resp_body
+
+    def _route(self, method: str, path: str, headers) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """已通过认证的请求分发（按去掉查询参数后的路径匹配）"""
+        if method != "GET":
+            return 405, [("Allow", "GET"), ("Content-Type", "text/plain; charset=utf-8")], b"Method Not Allowed"
+
+        route = path.split("?", 1)[0]
+
+        if route == "/":
+            body = BPWebServer.HTML_TEMPLATE.encode("utf-8")
+            return 200, [("Content-Type", "text/html; charset=utf-8")], body
+
+        if route == "/data":
+            # 响应体在 WebDataStore 发布时已编码，这里不加锁、不复制、不编码
+            snapshot = self.data_store.current()
+            # 客户端已有最新数据时返回 304，不传输响应体
+            if headers.get("If-None-Match") == snapshot.etag:
+                return 304, [("ETag", snapshot.etag)], b""
+            self.data_store.mark_served(snapshot.reading_seq)
+            return 200, [("Content-Type", "application/json; charset=utf-8"), ("ETag", snapshot.etag)], snapshot.body
+
+        if route == "/history":
+            # GET /history?since=<reading_seq>[&boot=<启动标识>]
+            params = parse_qs(path.partition("?")[2])
+            try:
+                since = int(params.get("since", ["0"])[0])
+            except ValueError:
+                since = 0
+            history = self.data_store.history_since(since, params.get("boot", [None])[0])
+            body = json.dumps(history, ensure_ascii=False).encode("utf-8")
+            return 200, [("Content-Type", "application/json; charset=utf-8"), ("Cache-Control", "no-store")], body
+
+        if route == "/metrics":
+            body = METRICS.render().encode("utf-8")
+            return 200, [("Content-Type", "text/plain; version=0.0.4; charset=utf-8")], body
+
+        if route == "/latency":
+            # 读数各阶段延迟摘要（毫秒），见 tracing.py
+            body = json.dumps(tracing.summary(), ensure_ascii=False).encode("utf-8")
+            return 200, [("Content-Type", "application/json; charset=utf-8")], body
+
+        return 404, [("Content-Type", "text/plain; charset=utf-8")], b"Not Found"
+
+    # ---------- 推送（长轮询 / SSE） ----------
+    def push_request(self, method: str, path: str, headers) -> Optional[Tuple[str, int, float]]:
+        """
+        判断是否为推送请求，返回 (类型, 客户端已有的 version, 等待秒数)，否则返回 None
+            GET /data?wait=<version>[&timeout=<秒>]  长轮询：version 未变化时挂起，变化后立即返回 /data
+            GET /events                              SSE：每次变化推送一条 data: <json>
+        未通过认证的请求返回 None，交由 handle_request 返回 401
+        """
+        if method != "GET":
+            return None
+        route, _, query = path.partition("?")
+        if route == "/events":
+            kind = "sse"
+        elif route == "/data" and "wait=" in query:
+            kind = "longpoll"
+        else:
+            return None
+        if not self._authorize(headers)[0]:
+            return None
+
+        params = parse_qs(query)
+        try:
+            version = int(params.get("wait", ["-1"])[0])
+        except ValueError:
+            version = -1
+        if kind == "sse":
+            last_id = headers.get("Last-Event-ID")
+            version = int(last_id) if last_id and last_id.isdigit() else -1
+            return kind, version, config.WEB_SSE_PING_INTERVAL
+        try:
+            timeout = float(params.get("timeout", [str(config.WEB_LONG_POLL_MAX)])[0])
+        except ValueError:
+            timeout = config.WEB_LONG_POLL_MAX
+        return kind, version, max(0.0, min(timeout, config.WEB_LONG_POLL_MAX))
+
+    def sse_event(self) -> Tuple[int, bytes]:
+        """生成一条 SSE 消息，返回 (version, 消息字节)"""
+        snapshot = self.data_store.current()
+        self.data_store.mark_served(snapshot.reading_seq)
+        return snapshot.version, snapshot.sse
+
+    SSE_HEADERS = [
+        ("Content-Type", "text/event-stream; charset=utf-8"),
+        ("Cache-Control", "no-store"),
+        ("X-Accel-Buffering", "no"),
+    ]
+
+    def _make_handler(self):
+        web_server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            # HTTP/1.1 默认保持连接，轮询客户端无需每次重新建立 TCP 连接
+            protocol_version = "HTTP/1.1"
+            # 空闲连接超时，超时后 handle_one_request 会关闭连接并释放线程
+            timeout = web_server.keepalive_timeout
+            # 响应头与响应体分两次写出，关闭 Nagle 以免 keep-alive 下出现 40ms 延迟确认等待
+            disable_nagle_algorithm = True
+
+            def log_message(self, _format, *_args):
+                return
+
+            def _send(self, code: int, headers: List[Tuple[str, str]], body: bytes):
+                self.send_response(code)
+                for name, value in headers:
+                    self.send_header(name, value)
+                if not has_header(headers, "Cache-Control"):
+                    self.send_header("Cache-Control", "no-store")
+                if code != 304:  # 304 不带响应体
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_events(self, version: int, ping_interval: float):
+                """SSE：占用本连接线程持续推送，连接断开后结束"""
+                self.close_connection = True
+                self.send_response(200)
+                for name, value in BPWebServer.SSE_HEADERS:
+                    self.send_header(name, value)
+                self.send_header("Connection", "close")
+                self.end_headers()
+                store = web_server.data_store
+                try:
+                    while web_server.is_running:
+                        if store.version != version:
+                            version, message = web_server.sse_event()
+                            self.wfile.write(message)
+                        elif not store.wait_for_change(version, ping_interval):
+                            self.wfile.write(b": ping\n\n")
+                        self.wfile.flush()
+                except OSError:
+                    pass
+
+            def _dispatch(self, method: str):
+                push = web_server.push_request(method, self.path, self.headers)
+                if push:
+                    kind, version, wait = push
+                    if kind == "sse":
+                        self._stream_events(version, wait)
+                        return
+                    if web_server.data_store.version == version:
+                        web_server.data_store.wait_for_change(version, wait)
+
+                body = b""
+                length = self.headers.get("Content-Length")
+                if length:
+                    try:
+                        size = int(length)
+                    except ValueError:
+                        size = -1
+                    if not 0 <= size <= MAX_REQUEST_BODY:
+                        self.close_connection = True
+                        self._send(413, [("Content-Type", "text/plain; charset=utf-8")], b"Payload Too Large")
+                        return
+                    body = self.rfile.read(size)
+                code, headers, resp_body = web_server.handle_request(method, self.path, self.headers, body)
+                self._send(code, headers, resp_body)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+        return Handler
+
+
+class LimitedThreadingHTTPServer(http.server.ThreadingHTTPServer):
+    """限制最大并发连接数的 ThreadingHTTPServer，超出时返回 503 并关闭连接"""
+
+    def __init__(self, server_address, handler_class, max_connections: int):
+        self.max_connections = max_connections
+        self._active = 0
+        self._active_lock = threading.Lock()
+        super().__init__(server_address, handler_class)
+
+    @property
+    def active_connections(self) -> int:
+        return self._active
+
+    def verify_request(self, request, client_address) -> bool:
+        with self._active_lock:
+            if self._active >= self.max_connections:
+                over_limit = True
+            else:
+                self._active += 1
+                over_limit = False
+        if over_limit:
+            try:
+                request.sendall(SERVICE_UNAVAILABLE_RESPONSE)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            with self._active_lock:
+                self._active -= 1
+
+
+MAX_REQUEST_BODY = 4096  # 请求体上限（仅 /login 使用）
+
+SERVICE_UNAVAILABLE_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Type: text/plain; charset=utf-8\r\n"
+    b"Content-Length: 19\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"\r\n"
+    b"Service Unavailable"
+)
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""基于 asyncio 的 HTTP/1.1 服务（高并发模式），只在 WEB_SERVER_MODE = "async" 时导入"""
+
+import asyncio
+import http.client
+import http.server
+import io
+import os
+import socket
+import threading
+from typing import List, Optional, Tuple
+
+from .log import logger
+from .web import BPWebServer, MAX_REQUEST_BODY, SERVICE_UNAVAILABLE_RESPONSE, has_header
+
+
+class AsyncHTTPServer:
+    """
+    基于 asyncio 的 HTTP/1.1 服务（高并发模式）
+    所有连接由同一个事件循环线程处理，空闲的 keep-alive 连接不占用线程；
+    支持最大连接数与空闲超时，请求处理复用 BPWebServer.handle_request
+    """
+
+    MAX_HEADER_BYTES = 16 * 1024
+
+    def __init__(self, app: "BPWebServer", host: str, port: int,
+                 max_connections: int, idle_timeout: float):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.active_connections = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._change_event: Optional[asyncio.Event] = None
+
+    def _on_store_change(self, _event: str, _snapshot: dict):
+        """WebDataStore 监听回调（任意线程），转到事件循环中唤醒所有等待者"""
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self._wake_waiters)
+
+    def _wake_waiters(self):
+        event, self._change_event = self._change_event, asyncio.Event()
+        event.set()
+
+    async def _wait_for_change(self, version: int, timeout: float) -> bool:
+        """等待 version 变化或超时，不占用线程"""
+        if self.app.data_store.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._change_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.app.data_store.version != version
+
+    async def _stream_events(self, writer: asyncio.StreamWriter, version: int, ping_interval: float):
+        head = ["HTTP/1.1 200 OK"] + [f"{name}: {value}" for name, value in BPWebServer.SSE_HEADERS]
+        head.append("Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        while True:
+            if await self._wait_for_change(version, ping_interval):
+                version, message = self.app.sse_event()
+                writer.write(message)
+            else:
+                writer.write(b": ping\n\n")
+            await writer.drain()
+
+    def _listen_socket(self) -> socket.socket:
+        """创建监听套接字（socket.create_server 需要 Python 3.8+，这里手动 bind / listen）"""
+        family, type_, proto, _, address = socket.getaddrinfo(
+            self.host or None, self.port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)[0]
+        sock = socket.socket(family, type_, proto)
+        try:
+            if os.name == "posix":
+                # 与 socket.create_server 相同：重启后可立即重新绑定处于 TIME_WAIT 的端口（Windows 上该选项含义不同，不设置）
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(address)
+            sock.listen(1024)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def start(self):
+        """在后台线程中启动事件循环；端口绑定失败时在调用线程抛出 OSError"""
+        sock = self._listen_socket()
+        sock.setblocking(False)
+        self.port = sock.getsockname()[1]
+
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._change_event = asyncio.Event()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, sock=sock, limit=self.MAX_HEADER_BYTES)
+            )
+            ready.set()
+            try:
+                self._loop.run_forever()
+            finally:
+                self._server.close()
+                # 取消仍在等待中的 keep-alive 连接
+                pending = asyncio.all_tasks(self._loop)
+                for task in pending:
+                    task.cancel()
+                self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait(timeout=5.0)
+        self.app.data_store.add_listener(self._on_store_change)
+
+    def stop(self):
+        self.app.data_store.remove_listener(self._on_store_change)
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.active_connections >= self.max_connections:
+            try:
+                writer.write(SERVICE_UNAVAILABLE_RESPONSE)
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+            return
+
+        self.active_connections += 1
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+
+                request_line, _, header_block = head.partition(b"\r\n")
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+                    writer.write(self._build_response(400, [("Content-Type", "text/plain; charset=utf-8")],
+                                                      b"Bad Request", keep_alive=False))
+                    await writer.drain()
+                    break
+                method, path, http_version = parts
+                headers = http.client.parse_headers(io.BytesIO(header_block))
+
+                connection = headers.get("Connection", "").lower()
+                if http_version == "HTTP/1.1":
+                    keep_alive = connection != "close"
+                else:
+                    keep_alive = connection == "keep-alive"
+
+                push = self.app.push_request(method, path, headers)
+                if push:
+                    kind, push_version, wait = push
+                    if kind == "sse":
+                        await self._stream_events(writer, push_version, wait)
+                        break
+                    await self._wait_for_change(push_version, wait)
+
+                body = b""
+                length = headers.get("Content-Length")
+                if length:
+                    try:
+                        size = int(length)
+                    except ValueError:
+                        size = -1
+                    if not 0 <= size <= MAX_REQUEST_BODY:
+                        writer.write(self._build_response(413, [("Content-Type", "text/plain; charset=utf-8")],
+                                                          b"Payload Too Large", keep_alive=False))
+                        await writer.drain()
+                        break
+                    body = await asyncio.wait_for(reader.readexactly(size), self.idle_timeout)
+
+                code, resp_headers, resp_body = self.app.handle_request(method, path, headers, body)
+                writer.write(self._build_response(code, resp_headers, resp_body, keep_alive))
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError: 服务停止时取消空闲连接，正常结束即可
+            pass
+        except Exception as e:
+            logger.debug(f"Web连接处理出错: {e}")
+        finally:
+            self.active_connections -= 1
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _build_response(code: int, headers: List[Tuple[str, str]], body: bytes, keep_alive: bool) -> bytes:
+        reason = http.server.BaseHTTPRequestHandler.responses.get(code, ("",))[0]
+        lines = [f"HTTP/1.1 {code} {reason}"]
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        if not has_header(headers, "Cache-Control"):
+            lines.append("Cache-Control: no-store")
+        if code != 304:  # 304 不带响应体
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
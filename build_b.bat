@@ -17,10 +17,10 @@ if errorlevel 1 (
 echo [1/4] 检测到Python环境
 python --version
 
-:: 安装依赖（B版本需要requests）
+:: 安装依赖（B版本只用标准库，仅需打包工具）
 echo.
 echo [2/4] 安装依赖包...
-pip install requests pyinstaller -q
+pip install pyinstaller -q
 
 if errorlevel 1 (
     echo [错误] 安装依赖失败
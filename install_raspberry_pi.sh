@@ -40,7 +40,7 @@ usermod -a -G dialout $ACTUAL_USER
 echo "[6/6] 创建桌面快捷方式..."
 # 创建安装目录
 mkdir -p "$INSTALL_DIR"
-cp bp_monitor.py "$INSTALL_DIR/"
+cp -r bp_monitor.py bpmon "$INSTALL_DIR/"
 
 # 创建桌面快捷方式
 DESKTOP_FILE="/home/$ACTUAL_USER/Desktop/血压监测程序.desktop"
@@ -74,5 +74,7 @@ echo "3. 双击桌面上的「血压监测程序」图标启动"
 echo ""
 echo "手动运行方式:"
 echo "  python3 $INSTALL_DIR/bp_monitor.py"
+echo "无界面运行（采集端 / systemd 服务）:"
+echo "  python3 $INSTALL_DIR/bp_monitor.py --headless --serial-port /dev/ttyUSB0"
 echo ""
 
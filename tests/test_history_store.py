@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""读数历史：append_many / persist 一次写入整批读数，persist 只写文件、不加入内存"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bpmon.models import BloodPressureReading  # noqa: E402
+from bpmon.storage import HistoryStore  # noqa: E402
+
+
+def reading(minute: int, sys_val: int = 120) -> BloodPressureReading:
+    return BloodPressureReading(sys_val, 80, 70, datetime(2024, 5, 1, 9, minute, 0))
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        self.store = HistoryStore(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def lines(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_persist_writes_file_only(self):
+        self.store.load()
+        self.store.persist([reading(0), reading(1, 130)])
+        self.assertEqual(self.lines(), ["2024-05-01 09:00:00,120,80,70", "2024-05-01 09:01:00,130,80,70"])
+        self.assertEqual(self.store.times, [])
+
+    def test_append_many_writes_and_adds_when_loaded(self):
+        self.store.load()
+        self.store.append_many([reading(0), reading(1), reading(2)])
+        self.assertEqual(len(self.lines()), 3)
+        self.assertEqual(len(self.store.times), 3)
+
+    def test_append_without_persist(self):
+        self.store.load()
+        self.store.append(reading(0), persist=False)
+        self.assertEqual(self.lines(), [])
+        self.assertEqual(self.store.sys, [120])
+
+    def test_persisted_readings_load_back(self):
+        self.store.persist([reading(5), reading(6)])
+        store = HistoryStore(self.path)
+        store.load()
+        self.assertEqual(store.sys, [120, 120])
+        self.assertEqual(store.times[1] - store.times[0], 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
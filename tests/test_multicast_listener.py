@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""B端组播接收：套接字创建失败要报告给界面，任意数据报都不能让接收线程退出"""
+
+import json
+import os
+import queue
+import socket
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bp_monitor_b  # noqa: E402
+
+
+def free_udp_port() -> int:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class MulticastListenerTest(unittest.TestCase):
+    def start_listener(self, group: str, port: int):
+        results = queue.Queue()
+        listener = bp_monitor_b.MulticastListener(group, port, results)
+        listener.start()
+        self.addCleanup(listener.join, 2.0)
+        self.addCleanup(listener.stop)
+        return listener, results
+
+    def test_socket_setup_failure_is_reported(self):
+        listener, results = self.start_listener("not-a-group", free_udp_port())
+        key, kind, error = results.get(timeout=2.0)
+        self.assertEqual((key, kind), (0, "error"))
+        self.assertIsInstance(error, OSError)
+        listener.stop()
+        listener.join(2.0)
+        self.assertFalse(listener.is_alive())
+
+    def test_non_object_datagrams_are_ignored(self):
+        port = free_udp_port()
+        listener, results = self.start_listener("239.255.90.30", port)
+        time.sleep(0.2)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(sender.close)
+        valid = {"status": "已连接", "seq": 1, "boot": "b", "type": "status"}
+        for payload in (b"5", b'"x"', b"[1]", b"\xff", b'{"status": "x", "seq": "a"}', json.dumps(valid).encode()):
+            sender.sendto(payload, ("127.0.0.1", port))
+        self.assertEqual(results.get(timeout=2.0), (0, "data", valid))
+        self.assertTrue(listener.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""会话令牌与 Web 认证：令牌来自请求头 / Cookie，任意内容都只能返回 False / 401，不能抛出异常"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bpmon import config  # noqa: E402
+from bpmon.storage import WebDataStore  # noqa: E402
+from bpmon.web import BPWebServer, SessionTokenManager  # noqa: E402
+
+
+class SessionTokenManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.sessions = SessionTokenManager(60)
+
+    def test_issued_token_verifies(self):
+        self.assertTrue(self.sessions.verify(self.sessions.issue()))
+
+    def test_non_ascii_token_rejected(self):
+        for token in ("1.é.abc", "é", "9999999999.abc.签名", self.sessions.issue() + "é"):
+            with self.subTest(token=token):
+                self.assertFalse(self.sessions.verify(token))
+
+    def test_malformed_token_rejected(self):
+        for token in ("", ".", "abc", "x.y.z", "1.abc." + "A" * 43):
+            with self.subTest(token=token):
+                self.assertFalse(self.sessions.verify(token))
+
+    def test_token_from_other_secret_rejected(self):
+        self.assertFalse(self.sessions.verify(SessionTokenManager(60).issue()))
+
+
+class AuthorizeTest(unittest.TestCase):
+    def setUp(self):
+        self._saved = config.WEB_AUTH_ENABLED, config.WEB_AUTH_PASSWORD
+        config.WEB_AUTH_ENABLED, config.WEB_AUTH_PASSWORD = True, "pw"
+        self.server = BPWebServer(WebDataStore(), "127.0.0.1", 0)
+
+    def tearDown(self):
+        config.WEB_AUTH_ENABLED, config.WEB_AUTH_PASSWORD = self._saved
+
+    def test_non_ascii_bearer_returns_401(self):
+        code, _, _ = self.server.handle_request("GET", "/data", {"Authorization": "Bearer 1.é.abc"})
+        self.assertEqual(code, 401)
+
+    def test_non_ascii_cookie_returns_401(self):
+        headers = {"Cookie": f"{config.WEB_SESSION_COOKIE}=1.é.abc"}
+        self.assertEqual(self.server.handle_request("GET", "/data", headers)[0], 401)
+
+
+if __name__ == "__main__":
+    unittest.main()